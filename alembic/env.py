@@ -22,6 +22,13 @@ if config.config_file_name is not None:
 # Target metadata for 'autogenerate' support
 target_metadata = Base.metadata
 
+# PostgreSQL-only indexes created by hand-written migrations rather than the models
+MIGRATION_ONLY_INDEXES = {'ix_bitcoin_prices_date_covering'}
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Keep autogenerate from dropping the migration-only indexes."""
+    return not (type_ == "index" and name in MIGRATION_ONLY_INDEXES)
+
 def get_url():
     """Retrieve the database URL from environment variable or config."""
     return os.getenv('DATABASE_URL', config.get_main_option("sqlalchemy.url"))
@@ -32,6 +39,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -51,6 +59,7 @@ def run_migrations_online() -> None:
         context.configure(
             connection=connection,
             target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
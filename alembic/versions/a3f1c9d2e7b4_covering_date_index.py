@@ -0,0 +1,46 @@
+"""Covering index on date for range scans
+
+Revision ID: a3f1c9d2e7b4
+Revises: 5151766ce094
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f1c9d2e7b4'
+down_revision: Union[str, None] = '5151766ce094'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX_NAME = 'ix_bitcoin_prices_date_covering'
+
+# Only the columns chart clients project (fields=close,volume); including every column
+# would make the index a second copy of the table
+INCLUDED_COLUMNS = ['close', 'volume']
+
+
+def upgrade() -> None:
+    # PostgreSQL only: elsewhere there is no INCLUDE, and a plain index on date would just
+    # duplicate the primary key. INCLUDE makes /api/prices?start=&end=&fields=close,volume
+    # an index-only range scan; the index is built concurrently so the table stays writable.
+    if op.get_context().dialect.name != 'postgresql':
+        return
+    with op.get_context().autocommit_block():
+        op.create_index(
+            INDEX_NAME,
+            'bitcoin_prices',
+            ['date'],
+            unique=False,
+            postgresql_include=INCLUDED_COLUMNS,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name != 'postgresql':
+        return
+    with op.get_context().autocommit_block():
+        op.drop_index(INDEX_NAME, table_name='bitcoin_prices', postgresql_concurrently=True)
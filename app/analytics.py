@@ -0,0 +1,265 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.events import EventRegistry
+from app.stats import TRADING_DAYS_PER_YEAR
+from app.store import PriceColumns, to_day
+
+# Days after each halving at which cycle returns are reported
+CYCLE_CHECKPOINTS = (30, 90, 180, 365, 730, 1095)
+
+
+def _float(value: Any) -> Optional[float]:
+    value = float(value)
+    return None if not np.isfinite(value) else value
+
+
+def _none_if_nan(values: np.ndarray) -> List[Optional[float]]:
+    return [None if v != v else v for v in values.tolist()]
+
+
+def percentage_changes(values: np.ndarray, periods: int = 1) -> np.ndarray:
+    """
+    Vectorized ``utils.calculate_percentage_change`` between each value and the one periods earlier.
+
+    The first periods entries, and changes from zero, are NaN.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    result = np.full(len(values), np.nan)
+    if periods < len(values):
+        previous = values[:-periods]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result[periods:] = np.where(previous == 0, np.nan, (values[periods:] - previous) / previous * 100)
+    return result
+
+
+def simple_returns(close: np.ndarray) -> np.ndarray:
+    """Daily returns as fractions; the first day has none (NaN)."""
+    return np.r_[np.nan, close[1:] / close[:-1] - 1]
+
+
+def log_returns(close: np.ndarray) -> np.ndarray:
+    """Daily log returns; the first day has none (NaN)."""
+    return np.r_[np.nan, np.diff(np.log(close))]
+
+
+def drawdowns(close: np.ndarray) -> np.ndarray:
+    """Fall from the running peak at every day, in O(n) with a cumulative max."""
+    return close / np.maximum.accumulate(close) - 1
+
+
+def max_drawdown(close: np.ndarray) -> Optional[Dict[str, Any]]:
+    """
+    Deepest peak-to-trough fall as positions into close.
+
+    recovery is the first later position closing at or above the peak, or
+    None if the peak has not been regained.
+    """
+    if len(close) == 0:
+        return None
+    depths = drawdowns(close)
+    trough = int(depths.argmin())
+    peak = int(close[:trough + 1].argmax())
+    regained = np.flatnonzero(close[trough:] >= close[peak])
+    recovery = trough + int(regained[0]) if len(regained) and trough > peak else None
+    return {"depth": float(depths[trough]), "peak": peak, "trough": trough, "recovery": recovery}
+
+
+def rolling_mean_std(values: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Rolling mean and sample standard deviation from cumulative sums, O(n) in any window.
+
+    Windows containing NaN yield NaN, as do the first window - 1 positions.
+    """
+    mean = np.full(len(values), np.nan)
+    std = np.full(len(values), np.nan)
+    if window > len(values):
+        return mean, std
+    invalid = np.isnan(values)
+    # Centre the values first to limit cancellation in the sum of squares
+    centre = 0.0 if invalid.all() else float(values[~invalid].mean())
+    filled = np.where(invalid, 0.0, values - centre)
+    sums = np.cumsum(np.r_[0.0, filled])
+    squares = np.cumsum(np.r_[0.0, filled * filled])
+    gaps = np.cumsum(np.r_[0, invalid])
+    window_sum = sums[window:] - sums[:-window]
+    window_squares = squares[window:] - squares[:-window]
+    variance = np.clip((window_squares - window_sum * window_sum / window) / (window - 1), 0, None)
+    complete = gaps[window:] == gaps[:-window]
+    mean[window - 1:] = np.where(complete, window_sum / window + centre, np.nan)
+    std[window - 1:] = np.where(complete, np.sqrt(variance), np.nan)
+    return mean, std
+
+
+def rolling_sharpe(close: np.ndarray, window: int, risk_free_rate: float = 0.0) -> np.ndarray:
+    """Annualized Sharpe ratio of daily log returns over a trailing window, net of an annual risk-free rate."""
+    excess = log_returns(close) - risk_free_rate / TRADING_DAYS_PER_YEAR
+    mean, std = rolling_mean_std(excess, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(std > 0, mean / std * np.sqrt(TRADING_DAYS_PER_YEAR), np.nan)
+
+
+def performance(data: PriceColumns, lo: int, hi: int, risk_free_rate: float = 0.0) -> Dict[str, Any]:
+    """Total and annualized return, volatility, Sharpe ratio and max drawdown of rows [lo, hi), memoized."""
+    def compute() -> Dict[str, Any]:
+        close = data.columns["close"][lo:hi]
+        result: Dict[str, Any] = {
+            "start_date": None, "end_date": None, "days": int(hi - lo), "total_return": None, "cagr": None,
+            "annualized_volatility": None, "sharpe_ratio": None, "max_drawdown": None,
+        }
+        if hi - lo < 2:
+            return result
+        returns = np.diff(np.log(close))
+        years = (data.days[hi - 1] - data.days[lo]) / TRADING_DAYS_PER_YEAR
+        volatility = returns.std(ddof=1) * np.sqrt(TRADING_DAYS_PER_YEAR) if len(returns) > 1 else np.nan
+        excess = returns.mean() * TRADING_DAYS_PER_YEAR - risk_free_rate
+        worst = max_drawdown(close)
+        result.update(
+            start_date=data.date_strings[lo],
+            end_date=data.date_strings[hi - 1],
+            total_return=float(close[-1] / close[0] - 1),
+            cagr=_float((close[-1] / close[0]) ** (1 / years) - 1) if years > 0 else None,
+            annualized_volatility=_float(volatility),
+            sharpe_ratio=_float(excess / volatility) if volatility > 0 else None,
+            max_drawdown={
+                "depth": worst["depth"],
+                "peak_date": data.date_strings[lo + worst["peak"]],
+                "trough_date": data.date_strings[lo + worst["trough"]],
+                "recovery_date": data.date_strings[lo + worst["recovery"]] if worst["recovery"] is not None else None,
+            },
+        )
+        return result
+
+    return data.memoize(("performance", lo, hi, risk_free_rate), compute)
+
+
+def return_rows(data: PriceColumns, lo: int, hi: int, method: str = "simple") -> List[Dict[str, Any]]:
+    """
+    Daily, cumulative and drawdown series for rows [lo, hi), memoized.
+
+    The daily return of the first row is measured against the previous day
+    when the range does not start at the beginning of the snapshot.
+    """
+    def build() -> List[Dict[str, Any]]:
+        start = max(lo - 1, 0)
+        window = data.columns["close"][start:hi]
+        daily = (log_returns if method == "log" else simple_returns)(window)[lo - start:]
+        close = window[lo - start:]
+        cumulative = np.log(close / close[0]) if method == "log" else close / close[0] - 1
+        columns = zip(
+            data.date_strings[lo:hi], close.tolist(), _none_if_nan(daily), cumulative.tolist(), drawdowns(close).tolist()
+        )
+        return [
+            {"date": day, "close": c, "return": r, "cumulative_return": cr, "drawdown": dd}
+            for day, c, r, cr, dd in columns
+        ]
+
+    if hi <= lo:
+        return []
+    return data.memoize(("return_rows", method, lo, hi), build)
+
+
+def sharpe_rows(data: PriceColumns, lo: int, hi: int, window: int, risk_free_rate: float = 0.0) -> List[Dict[str, Any]]:
+    """Rolling Sharpe ratios for rows [lo, hi), computed over the whole snapshot so the range is warmed up."""
+    def build() -> List[Dict[str, Any]]:
+        series = data.memoize(
+            ("rolling_sharpe", window, risk_free_rate),
+            lambda: rolling_sharpe(data.columns["close"], window, risk_free_rate),
+        )
+        return [
+            {"date": day, "close": close, "sharpe_ratio": value}
+            for day, close, value in zip(
+                data.date_strings[lo:hi], data.columns["close"][lo:hi].tolist(), _none_if_nan(series[lo:hi])
+            )
+        ]
+
+    return data.memoize(("sharpe_rows", window, risk_free_rate, lo, hi), build)
+
+
+def correlations(data: PriceColumns, lo: int, hi: int) -> Dict[str, Any]:
+    """
+    Pearson correlations between daily log return, log volume change and intraday range in rows [lo, hi).
+
+    Days where any of the three is undefined (first day, zero volume) are left out.
+    """
+    def compute() -> Dict[str, Any]:
+        start = max(lo - 1, 0)
+        columns = data.columns
+        close = columns["close"][start:hi]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            series = {
+                "return": log_returns(close),
+                "volume_change": np.r_[np.nan, np.diff(np.log(columns["volume"][start:hi].astype(np.float64)))],
+                "range": (columns["high"][start:hi] - columns["low"][start:hi]) / close,
+            }
+        names = list(series)
+        stacked = np.vstack([series[name][lo - start:] for name in names])
+        stacked = stacked[:, np.isfinite(stacked).all(axis=0)]
+        matrix = np.full((len(names), len(names)), np.nan)
+        if stacked.shape[1] > 2:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                matrix = np.corrcoef(stacked)
+        return {
+            "observations": int(stacked.shape[1]),
+            "matrix": {a: {b: _float(matrix[i, j]) for j, b in enumerate(names)} for i, a in enumerate(names)},
+        }
+
+    return data.memoize(("correlations", lo, hi), compute)
+
+
+def halving_cycles(data: PriceColumns, registry: EventRegistry, days: int = 1460) -> Dict[str, Any]:
+    """
+    Performance over the days after every halving, aligned on the halving-day close.
+
+    Each cycle reports its return at fixed checkpoints, its peak and max
+    drawdown; the correlation matrix compares the cycles' log-price paths over
+    the days they have in common. Memoized per snapshot and horizon.
+    """
+    def compute() -> Dict[str, Any]:
+        close = data.columns["close"]
+        cycles: List[Dict[str, Any]] = []
+        paths: Dict[str, np.ndarray] = {}
+        for event in registry.list("halving"):
+            # Halvings before the first or after the last stored day have no cycle to report
+            if len(data) == 0 or data.days[-1] < to_day(event.date):
+                continue
+            pivot = int(np.searchsorted(data.days, to_day(event.date), side="right")) - 1
+            if pivot < 0:
+                continue
+            end = int(np.searchsorted(data.days, data.days[pivot] + days, side="right"))
+            window = close[pivot:end]
+            offsets = data.days[pivot:end] - data.days[pivot]
+            path = window / window[0] - 1
+            peak = int(path.argmax())
+            worst = max_drawdown(window)
+            checkpoints = {}
+            for checkpoint in CYCLE_CHECKPOINTS:
+                if checkpoint > days:
+                    continue
+                position = int(np.searchsorted(offsets, checkpoint, side="right")) - 1
+                checkpoints[str(checkpoint)] = float(path[position]) if offsets[-1] >= checkpoint else None
+            cycles.append({
+                "halving_number": event.number,
+                "date": event.date.isoformat(),
+                "pivot_date": data.date_strings[pivot],
+                "pivot_close": float(window[0]),
+                "days_available": int(offsets[-1]),
+                "return": float(path[-1]),
+                "returns_at": checkpoints,
+                "peak_return": float(path[peak]),
+                "peak_day": int(offsets[peak]),
+                "max_drawdown": worst["depth"],
+            })
+            paths[event.name] = np.log(window)
+
+        correlation: Dict[str, Dict[str, Optional[float]]] = {}
+        for a, path_a in paths.items():
+            correlation[a] = {}
+            for b, path_b in paths.items():
+                length = min(len(path_a), len(path_b))
+                value = np.corrcoef(path_a[:length], path_b[:length])[0, 1] if length > 2 else np.nan
+                correlation[a][b] = _float(value)
+        return {"days": days, "cycles": cycles, "correlation": correlation}
+
+    return data.memoize(("halving_cycles", days), compute)
@@ -0,0 +1,101 @@
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from app.downsample import downsample_slice
+from app.events import MarketEvent, event_returns, get_events, window_indices
+from app.schema import BatchQuery
+from app.serialization import dumps, encode_rows
+from app.stats import price_statistics
+from app.store import PriceColumns
+
+Bounds = Tuple[Optional[date], Optional[date]]
+
+
+class BatchQueryError(LookupError):
+    """A batch query that cannot be answered, e.g. an unknown halving; reported under its key."""
+
+
+def resolve_event(query: BatchQuery) -> Optional[MarketEvent]:
+    """The market event a halving or event query refers to; None for other query types."""
+    if query.type == "halving":
+        event = get_events().halving(query.number)
+        if event is None:
+            raise BatchQueryError("Halving event not found")
+        return event
+    if query.type == "event":
+        event = get_events().get(query.name)
+        if event is None:
+            raise BatchQueryError("Market event not found")
+        return event
+    return None
+
+
+def query_bounds(query: BatchQuery, event: Optional[MarketEvent]) -> Bounds:
+    """The inclusive date range a query reads; None means unbounded on that side."""
+    if event is not None:
+        return event.window(query.days_before, query.days_after)
+    if query.type == "year":
+        return date(query.year, 1, 1), date(query.year, 12, 31)
+    return query.start, query.end
+
+
+def covering_bounds(bounds: List[Bounds]) -> Bounds:
+    """The smallest range containing every query's range, so one load answers them all."""
+    starts = [start for start, _ in bounds]
+    ends = [end for _, end in bounds]
+    return (
+        None if None in starts else min(starts),
+        None if None in ends else max(ends),
+    )
+
+
+def encode_result(data: PriceColumns, query: BatchQuery, event: Optional[MarketEvent], bounds: Bounds) -> bytes:
+    """Encode one query's answer from the shared columns, reusing the memoized row bytes."""
+    if event is not None:
+        lo, hi = window_indices(data, event, query.days_before, query.days_after)
+    else:
+        lo, hi = data.range_indices(*bounds)
+    if query.type == "statistics":
+        return dumps(price_statistics(data, lo, hi, query.group_by))
+
+    if query.type == "halving":
+        envelope = {"halving_number": query.number}
+    elif query.type == "event":
+        envelope = {"event": event.to_dict()}
+    else:
+        envelope = {"start": bounds[0].isoformat() if bounds[0] else None, "end": bounds[1].isoformat() if bounds[1] else None}
+    # The comparison always uses the full-resolution rows
+    comparison = event_returns(data, event, query.days_before, query.days_after) if query.compare and event else None
+    data, lo, hi = downsample_slice(data, lo, hi, query.max_points, query.downsample)
+    body = dumps(envelope)[:-1] + b',"prices":' + encode_rows(data, lo, hi)
+    if comparison is not None:
+        body += b',"comparison":' + dumps(comparison)
+    return body + b"}"
+
+
+def plan_batch(queries: Dict[str, BatchQuery]) -> Tuple[Dict[str, Tuple[Optional[MarketEvent], Bounds]], Dict[str, str]]:
+    """Resolve every query's event and date range; unanswerable queries are returned as errors."""
+    plans: Dict[str, Tuple[Optional[MarketEvent], Bounds]] = {}
+    errors: Dict[str, str] = {}
+    for key, query in queries.items():
+        try:
+            event = resolve_event(query)
+        except BatchQueryError as e:
+            errors[key] = str(e)
+            continue
+        plans[key] = (event, query_bounds(query, event))
+    return plans, errors
+
+
+def encode_batch(
+    data: PriceColumns,
+    queries: Dict[str, BatchQuery],
+    plans: Dict[str, Tuple[Optional[MarketEvent], Bounds]],
+    errors: Dict[str, str],
+) -> bytes:
+    """Answer every planned query from one set of columns as {"results": {key: ...}, "errors": {key: detail}}."""
+    results = [
+        dumps(key) + b":" + encode_result(data, queries[key], event, bounds)
+        for key, (event, bounds) in plans.items()
+    ]
+    return b'{"results":{' + b",".join(results) + b'},"errors":' + dumps(errors) + b"}"
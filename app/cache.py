@@ -0,0 +1,258 @@
+import asyncio
+import fnmatch
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+# redis is an optional dependency, only needed for CACHE_BACKEND=redis
+try:
+    import redis.asyncio as redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+CACHE_BACKENDS = ("memory", "redis", "local-redis")
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    fetched_at: float  # wall-clock time, so entries written by another process age correctly
+
+
+class CacheBackend(ABC):
+    """
+    Where cache entries are stored.
+
+    The in-process default keeps them per worker; a shared backend lets every
+    worker process serve an entry fetched by any of them.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, entry: CacheEntry, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    async def clear(self) -> None:
+        ...
+
+    def reset(self) -> None:
+        """Forget process-local entries; shared stores are left to expire."""
+
+    def size(self) -> Optional[int]:
+        """Number of entries when cheaply known."""
+        return None
+
+
+class MemoryBackend(CacheBackend):
+    """Entries in a dict owned by this process."""
+
+    def __init__(self):
+        self._entries: Dict[str, CacheEntry] = {}
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        return self._entries.get(key)
+
+    async def set(self, key: str, entry: CacheEntry, ttl: float) -> None:
+        self._entries[key] = entry
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+    def reset(self) -> None:
+        self._entries.clear()
+
+    def size(self) -> Optional[int]:
+        return len(self._entries)
+
+
+class LocalRedis:
+    """
+    In-process stand-in for the part of ``redis.asyncio.Redis`` that RedisBackend uses.
+
+    Values are stored as bytes with millisecond expiry, so the Redis code path
+    can run in development and tests without a server.
+    """
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[bytes, Optional[float]]] = {}
+
+    def _live(self, key: str) -> Optional[bytes]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at is not None and time.monotonic() >= expires_at:
+            del self._data[key]
+            return None
+        return value
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._live(key)
+
+    async def set(self, key: str, value: Any, px: Optional[int] = None) -> bool:
+        data = value if isinstance(value, bytes) else str(value).encode()
+        self._data[key] = (data, time.monotonic() + px / 1000 if px else None)
+        return True
+
+    async def delete(self, *keys: str) -> int:
+        return sum(self._data.pop(key, None) is not None for key in keys)
+
+    async def scan_iter(self, match: Optional[str] = None) -> AsyncIterator[str]:
+        for key in list(self._data):
+            if self._live(key) is not None and (match is None or fnmatch.fnmatchcase(key, match)):
+                yield key
+
+
+class RedisBackend(CacheBackend):
+    """Entries stored as JSON in Redis (or LocalRedis), expiring with the cache's TTL."""
+
+    def __init__(self, client: Any, prefix: str = "bitcoin-api:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        raw = await self.client.get(self.prefix + key)
+        if raw is None:
+            return None
+        payload = json.loads(raw)
+        return CacheEntry(payload["value"], payload["fetched_at"])
+
+    async def set(self, key: str, entry: CacheEntry, ttl: float) -> None:
+        payload = json.dumps({"value": entry.value, "fetched_at": entry.fetched_at}, separators=(",", ":"))
+        await self.client.set(self.prefix + key, payload.encode(), px=max(int(ttl * 1000), 1))
+
+    async def delete(self, key: str) -> None:
+        await self.client.delete(self.prefix + key)
+
+    async def clear(self) -> None:
+        keys = [key async for key in self.client.scan_iter(match=self.prefix + "*")]
+        if keys:
+            await self.client.delete(*keys)
+
+
+def make_backend(name: str = "memory", redis_url: str = "", prefix: str = "bitcoin-api:") -> CacheBackend:
+    """Build the backend named by CACHE_BACKEND: memory, redis (needs the redis package) or local-redis."""
+    if name == "memory":
+        return MemoryBackend()
+    if name == "local-redis":
+        return RedisBackend(LocalRedis(), prefix)
+    if name == "redis":
+        if redis is None:
+            raise RuntimeError("CACHE_BACKEND=redis requires the redis package to be installed")
+        return RedisBackend(redis.from_url(redis_url), prefix)
+    raise ValueError(f"Unknown cache backend: {name}. Expected one of: {', '.join(CACHE_BACKENDS)}")
+
+
+class QuoteCache:
+    """
+    Async TTL cache with stale-while-revalidate and request coalescing.
+
+    Fresh entries are served directly. Entries older than ``ttl`` but younger
+    than ``ttl + stale_ttl`` are served while a single background refresh runs.
+    Concurrent misses for the same key share one in-flight fetch. Entries
+    live in the given backend, so a shared one lets worker processes reuse each
+    other's fetches; coalescing and counters stay per process. A failing
+    backend degrades to fetching rather than failing the request.
+    """
+
+    def __init__(self, ttl: float, stale_ttl: float = 0.0, backend: Optional[CacheBackend] = None):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.backend = backend or MemoryBackend()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.counters = {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0, "errors": 0}
+
+    def _start_fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> asyncio.Future:
+        async def run() -> Any:
+            try:
+                value = await fetch()
+            except Exception:
+                self.counters["errors"] += 1
+                raise
+            try:
+                await self.backend.set(key, CacheEntry(value, time.time()), self.ttl + self.stale_ttl)
+            except Exception as e:
+                logger.warning(f"Could not store {key} in the cache backend: {e}")
+            return value
+
+        task = asyncio.ensure_future(run())
+        self._inflight[key] = task
+
+        def done(finished: asyncio.Future) -> None:
+            if self._inflight.get(key) is finished:
+                del self._inflight[key]
+            # Retrieve the exception so background refreshes that fail are not reported as unhandled
+            if not finished.cancelled() and finished.exception() is not None:
+                logger.debug(f"Fetch for {key} failed: {finished.exception()}")
+
+        task.add_done_callback(done)
+        return task
+
+    async def _lookup(self, key: str) -> Optional[CacheEntry]:
+        try:
+            return await self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"Cache backend lookup for {key} failed: {e}")
+            return None
+
+    async def get(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        entry = await self._lookup(key)
+        if entry is not None:
+            age = time.time() - entry.fetched_at
+            if age < self.ttl:
+                self.counters["hits"] += 1
+                return entry.value
+            if age < self.ttl + self.stale_ttl:
+                self.counters["stale_hits"] += 1
+                if key not in self._inflight:
+                    self._start_fetch(key, fetch)
+                return entry.value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.counters["coalesced"] += 1
+        else:
+            self.counters["misses"] += 1
+            inflight = self._start_fetch(key, fetch)
+        # Shield the shared fetch so one caller timing out does not cancel it for the others
+        return await asyncio.shield(inflight)
+
+    async def invalidate(self, key: Optional[str] = None) -> None:
+        if key is None:
+            await self.backend.clear()
+        else:
+            await self.backend.delete(key)
+
+    def reset(self) -> None:
+        """Drop process-local entries, in-flight fetches and counters."""
+        self.backend.reset()
+        self._inflight.clear()
+        self.counters = dict.fromkeys(self.counters, 0)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = sum(self.counters[name] for name in ("hits", "stale_hits", "misses", "coalesced"))
+        served = self.counters["hits"] + self.counters["stale_hits"] + self.counters["coalesced"]
+        return {
+            **self.counters,
+            "hit_ratio": served / lookups if lookups else None,
+            "entries": self.backend.size(),
+            "inflight": len(self._inflight),
+            "ttl": self.ttl,
+            "stale_ttl": self.stale_ttl,
+        }
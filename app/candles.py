@@ -0,0 +1,117 @@
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.store import PriceColumns
+
+INTERVALS = ("week", "month", "quarter", "year")
+
+
+def period_starts(days: np.ndarray, interval: str) -> np.ndarray:
+    """Label each day (int days since the epoch) with the first day of its candle."""
+    if interval == "week":
+        # 1970-01-01 was a Thursday, so (days + 3) % 7 is the offset from Monday
+        return days - (days + 3) % 7
+    dates = days.astype("datetime64[D]")
+    if interval == "month":
+        return dates.astype("datetime64[M]").astype("datetime64[D]").astype(np.int64)
+    if interval == "quarter":
+        months = dates.astype("datetime64[M]").astype(np.int64)
+        return (months - months % 3).astype("datetime64[M]").astype("datetime64[D]").astype(np.int64)
+    if interval == "year":
+        return dates.astype("datetime64[Y]").astype("datetime64[D]").astype(np.int64)
+    raise ValueError(f"Unsupported interval: {interval}")
+
+
+class CandleRollup:
+    """
+    OHLCV candles for one interval, kept in memory and maintained incrementally.
+
+    When a new store snapshot only appends days to the one the rollup was built
+    from, just the last (possibly partial) candle and the new days are
+    aggregated; anything else triggers a full rebuild.
+    """
+
+    def __init__(self, interval: str):
+        if interval not in INTERVALS:
+            raise ValueError(f"Unsupported interval: {interval}")
+        self.interval = interval
+        self._source: Optional[PriceColumns] = None
+        self._lock = threading.Lock()
+        self.rebuilds = 0
+        self.incremental_updates = 0
+        self._reset()
+
+    def _reset(self) -> None:
+        self.keys = np.empty(0, dtype=np.int64)
+        self.first_row = np.empty(0, dtype=np.int64)  # index of each candle's first daily row
+        self.open = np.empty(0)
+        self.high = np.empty(0)
+        self.low = np.empty(0)
+        self.close = np.empty(0)
+        self.volume = np.empty(0, dtype=np.int64)
+        self.days = np.empty(0, dtype=np.int64)  # number of daily rows in each candle
+
+    def _aggregate_from(self, data: PriceColumns, row: int) -> None:
+        """Append candles built from daily rows [row, len(data))."""
+        keys = period_starts(data.days[row:], self.interval)
+        if len(keys) == 0:
+            return
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        ends = np.r_[starts[1:], len(keys)]
+        columns = {name: data.columns[name][row:] for name in ("open", "high", "low", "close", "volume")}
+        self.keys = np.concatenate([self.keys, keys[starts]])
+        self.first_row = np.concatenate([self.first_row, starts + row])
+        self.open = np.concatenate([self.open, columns["open"][starts]])
+        self.high = np.concatenate([self.high, np.maximum.reduceat(columns["high"], starts)])
+        self.low = np.concatenate([self.low, np.minimum.reduceat(columns["low"], starts)])
+        self.close = np.concatenate([self.close, columns["close"][ends - 1]])
+        self.volume = np.concatenate([self.volume, np.add.reduceat(columns["volume"], starts)])
+        self.days = np.concatenate([self.days, ends - starts])
+
+    def _drop_last(self) -> int:
+        """Remove the last candle and return the daily row it started at."""
+        row = int(self.first_row[-1])
+        for name in ("keys", "first_row", "open", "high", "low", "close", "volume", "days"):
+            setattr(self, name, getattr(self, name)[:-1])
+        return row
+
+    def sync(self, data: PriceColumns) -> None:
+        with self._lock:
+            if data is self._source:
+                return
+            if self._source is not None and len(self.keys) and data.extends(self._source):
+                # Re-aggregate the last candle, which may have been partial, plus the new days
+                self._aggregate_from(data, self._drop_last())
+                self.incremental_updates += 1
+            else:
+                self._reset()
+                self._aggregate_from(data, 0)
+                self.rebuilds += 1
+            self._source = data
+
+    def to_dicts(self, start_day: Optional[int] = None, end_day: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Candles whose period starts within [start_day, end_day]."""
+        with self._lock:
+            return self._to_dicts(start_day, end_day)
+
+    def _to_dicts(self, start_day: Optional[int], end_day: Optional[int]) -> List[Dict[str, Any]]:
+        lo = 0 if start_day is None else int(np.searchsorted(self.keys, start_day, side="left"))
+        hi = len(self.keys) if end_day is None else int(np.searchsorted(self.keys, end_day, side="right"))
+        periods = np.datetime_as_string(self.keys[lo:hi].astype("datetime64[D]")).tolist()
+        return [
+            {"period_start": p, "open": o, "high": h, "low": l, "close": c, "volume": v, "days": d}
+            for p, o, h, l, c, v, d in zip(
+                periods,
+                self.open[lo:hi].tolist(),
+                self.high[lo:hi].tolist(),
+                self.low[lo:hi].tolist(),
+                self.close[lo:hi].tolist(),
+                self.volume[lo:hi].tolist(),
+                self.days[lo:hi].tolist(),
+            )
+        ]
+
+
+rollups: Dict[str, CandleRollup] = {interval: CandleRollup(interval) for interval in INTERVALS}
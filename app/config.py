@@ -1,15 +1,152 @@
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
-import os
-
-load_dotenv()  # Load environment variables from .env file
+from functools import lru_cache
+from typing import Any, Callable, Optional
 
 class Settings(BaseSettings):
-    database_username: str
-    database_password: str
-    database_hostname: str
-    database_port: int
-    database_name: str
-
-settings = Settings()
-print(os.getenv("DATABASE_USERNAME"))
+    # Either a full DATABASE_URL or the individual PostgreSQL connection settings
+    database_url: Optional[str] = None
+    database_username: Optional[str] = None
+    database_password: Optional[str] = None
+    database_hostname: Optional[str] = None
+    database_port: Optional[int] = None
+    database_name: Optional[str] = None
+
+    # Engine and connection pool tuning
+    database_echo: bool = False  # log every SQL statement; keep off outside debugging
+    database_pool_size: int = 5
+    database_max_overflow: int = 10
+    database_pool_timeout: float = 30.0
+    database_pool_recycle: int = 1800  # seconds before a pooled connection is replaced
+    database_pool_pre_ping: bool = True
+
+    # Optional asyncio engine (asyncpg) used by the historical endpoints instead of worker threads
+    database_async: bool = False
+    database_async_url: Optional[str] = None  # defaults to database_url with the asyncpg driver
+
+    @property
+    def sqlalchemy_database_url(self) -> str:
+        if self.database_url:
+            return self.database_url
+        missing = [
+            name for name in ("database_username", "database_password", "database_hostname", "database_port", "database_name")
+            if getattr(self, name) is None
+        ]
+        if missing:
+            raise ValueError(f"Set DATABASE_URL or all of: {', '.join(name.upper() for name in missing)}")
+        return (
+            f"postgresql://{self.database_username}:{self.database_password}@"
+            f"{self.database_hostname}:{self.database_port}/{self.database_name}"
+        )
+
+    @property
+    def sqlalchemy_async_database_url(self) -> str:
+        if self.database_async_url:
+            return self.database_async_url
+        url = self.sqlalchemy_database_url
+        for prefix in ("postgresql+psycopg2://", "postgresql://"):
+            if url.startswith(prefix):
+                return "postgresql+asyncpg://" + url[len(prefix):]
+        return url
+
+    # In-memory columnar copy of bitcoin_prices used by the historical router
+    price_store_enabled: bool = True
+    price_store_max_age: int = 300  # seconds between checks for new rows (reloading on change); 0 disables them
+
+    # JSON list of named market events (halvings and others); empty uses data/market_events.json
+    market_events_path: str = ""
+
+    # Incremental ingestion of missing days: "exchange" (Binance daily klines) or "csv" (drop directory)
+    ingest_source: str = "exchange"
+    ingest_drop_dir: str = ""  # empty uses data/incoming
+    ingest_interval: float = 0.0  # seconds between runs, e.g. 86400 for nightly; 0 disables the job
+
+    # Real-time exchange sources queried by /api/aggregate (comma-separated names)
+    exchange_sources: str = "coingecko,coincap,binance,kraken,bybit,coinbase,kucoin"
+    exchange_timeout: float = 2.0  # per-source deadline in seconds
+    exchange_retries: int = 2  # retries on connection errors, 429 and 5xx responses
+    exchange_backoff: float = 0.1  # base delay in seconds, doubled on each retry
+
+    # Per-source quote cache: fresh for quote_cache_ttl seconds, then served stale while refreshing
+    quote_cache_ttl: float = 2.0
+    quote_cache_stale_ttl: float = 10.0
+
+    # Where cached quotes live: "memory" (per process), "redis" (shared by every worker) or
+    # "local-redis" (an in-process stand-in for Redis, for development and tests)
+    cache_backend: str = "memory"
+    cache_redis_url: str = "redis://localhost:6379/0"
+    cache_key_prefix: str = "bitcoin-api:"
+
+    # Token-bucket rate limiting of /api requests per client address, or per API key listed in
+    # rate_limit_api_keys ("key" or "key=rate/burst", comma-separated). Buckets hold up to
+    # rate_limit_burst tokens refilled at rate_limit_rate per second; most requests take one
+    rate_limit_enabled: bool = True
+    rate_limit_rate: float = 10.0
+    rate_limit_burst: float = 100.0
+    rate_limit_full_history_cost: float = 10.0  # the whole history; narrower spans pay their share, at least 1
+    rate_limit_batch_cost: float = 5.0
+    rate_limit_aggregate_cost: float = 3.0  # queries every exchange
+    rate_limit_api_keys: str = ""
+    # Proxies in front of the app that append to X-Forwarded-For; 0 uses the connecting address
+    rate_limit_trusted_proxies: int = 0
+    # "memory" (per process, at most rate_limit_max_buckets clients), "redis" (shared by every
+    # worker, using cache_redis_url) or "local-redis"
+    rate_limit_backend: str = "memory"
+    rate_limit_max_buckets: int = 100_000
+
+    # Production launcher (python -m app.serve): worker processes, 0 sizes the pool to the CPU count
+    web_workers: int = 0
+    web_graceful_timeout: int = 30  # seconds workers get to finish in-flight requests on shutdown
+
+    # Background poller pushing live prices over WebSocket/SSE; off (0) by default so tests and
+    # tools never poll the exchanges; single-worker deployments set e.g. LIVE_POLL_INTERVAL=5
+    live_poll_interval: float = 0.0
+    live_history_size: int = 720  # ticks kept in the ring buffer
+    live_subscriber_queue_size: int = 16
+
+    # HTTP caching of historical responses (seconds) and minimum body size to compress (bytes)
+    http_cache_closed_max_age: int = 86400
+    http_cache_open_max_age: int = 60
+    http_compression_min_size: int = 1024
+
+    # Shared keep-alive connection pool used for every exchange request
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry: float = 30.0
+
+@lru_cache
+def get_settings() -> Settings:
+    """Read the environment (and .env) once, on first use rather than at import."""
+    load_dotenv()  # Load environment variables from .env file
+    return Settings()
+
+
+class Lazy:
+    """
+    Stands in for the object factory() returns, creating it on first use.
+
+    Module-level singletons configured from settings are wrapped in it, so
+    importing the app neither reads the environment nor builds them.
+    """
+
+    def __init__(self, factory: Callable[[], Any]):
+        object.__setattr__(self, "_factory", lru_cache(factory))
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._factory(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._factory(), name, value)
+
+    def __delattr__(self, name: str) -> None:
+        delattr(self._factory(), name)
+
+    # Implicit special method lookups bypass __getattr__
+    def __len__(self) -> int:
+        return len(self._factory())
+
+    def __bool__(self) -> bool:
+        return bool(self._factory())
+
+
+settings = Lazy(get_settings)
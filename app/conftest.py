@@ -0,0 +1,73 @@
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base, Database, get_database, get_db, get_session_factory
+from app.main import app
+from app.models.bitcoin_price import BitcoinPrice
+from app.ratelimit import rate_limiter
+from app.store import price_store
+
+# Daily series used by the tests: 2012-01-01 .. 2024-12-31 with a simple rising close
+START_DATE = date(2012, 1, 1)
+END_DATE = date(2024, 12, 31)
+
+
+def make_price(day: date, index: int) -> BitcoinPrice:
+    close = 100.0 + index
+    return BitcoinPrice(
+        date=day,
+        open=close - 1,
+        high=close + 2,
+        low=close - 3,
+        close=close,
+        adj_close=close,
+        volume=1000 + index,
+    )
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with factory() as db:
+        days = (END_DATE - START_DATE).days + 1
+        db.add_all(make_price(START_DATE + timedelta(days=i), i) for i in range(days))
+        db.commit()
+    price_store.invalidate()
+    yield factory
+    price_store.invalidate()
+    engine.dispose()
+
+
+@pytest.fixture
+def db(session_factory):
+    with session_factory() as session:
+        yield session
+
+
+@pytest.fixture
+def client(session_factory):
+    def override_get_db():
+        session = session_factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: session_factory
+    app.dependency_overrides[get_database] = lambda: Database(session_factory)
+    # Every test starts with full rate limit buckets
+    rate_limiter.reset()
+    yield TestClient(app)
+    app.dependency_overrides.clear()
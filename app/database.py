@@ -1,26 +1,148 @@
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from starlette.concurrency import run_in_threadpool
+
 from app.config import settings  # Import settings to use the configuration
 
-# Database configuration using settings
-SQLALCHEMY_DATABASE_URL = (
-    f"postgresql://{settings.database_username}:{settings.database_password}@"
-    f"{settings.database_hostname}:{settings.database_port}/{settings.database_name}"
-)
+T = TypeVar("T")
+
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """Pool and logging options from Settings; SQLite's single-connection pools take no sizing."""
+    options: Dict[str, Any] = {"echo": settings.database_echo, "pool_pre_ping": settings.database_pool_pre_ping}
+    if make_url(url).get_backend_name() != "sqlite":
+        options.update(
+            pool_size=settings.database_pool_size,
+            max_overflow=settings.database_max_overflow,
+            pool_timeout=settings.database_pool_timeout,
+            pool_recycle=settings.database_pool_recycle,
+        )
+    return options
+
+
+# The engines and session factories are created on first use, so importing the app needs
+# neither database settings nor a reachable database
+@lru_cache
+def get_engine() -> Engine:
+    """The SQLAlchemy engine shared by the whole application (DATABASE_URL wins over the individual fields)."""
+    url = settings.sqlalchemy_database_url
+    return create_engine(url, **engine_options(url))
+
+
+@lru_cache
+def get_sessionmaker() -> sessionmaker:
+    return sessionmaker(autocommit=False, autoflush=False, bind=get_engine())
 
-# Create the SQLAlchemy engine
-engine = create_engine(SQLALCHEMY_DATABASE_URL, echo=True)
 
-# Create a configured "Session" class for the database connection
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+@lru_cache
+def get_async_engine() -> Optional[Any]:
+    """The asyncio engine, only when DATABASE_ASYNC is enabled."""
+    if not settings.database_async:
+        return None
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    url = settings.sqlalchemy_async_database_url
+    return create_async_engine(url, **engine_options(url))
+
+
+@lru_cache
+def get_async_sessionmaker() -> Optional[Any]:
+    async_engine = get_async_engine()
+    if async_engine is None:
+        return None
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    return async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+def created_engines() -> List[Tuple[str, Engine]]:
+    """The engines created so far, as (name, sync engine); never creates one."""
+    engines = []
+    if get_engine.cache_info().currsize:
+        engines.append(("sync", get_engine()))
+    if get_async_engine.cache_info().currsize and get_async_engine() is not None:
+        engines.append(("async", get_async_engine().sync_engine))
+    return engines
 
 # Create a base class for all models to inherit from
 Base = declarative_base()
 
+
+class Database:
+    """
+    Runs ORM work from async handlers without blocking the event loop.
+
+    With an async session factory the work runs on the asyncio driver through
+    ``AsyncSession.run_sync``; otherwise it runs on a sync session in a worker
+    thread.
+    """
+
+    def __init__(self, session_factory: Optional[sessionmaker] = None, async_session_factory: Optional[Any] = None):
+        # Without a session factory the configured engines are used, created on the first query
+        self._configured = session_factory is None
+        self._session_factory = session_factory
+        self._async_session_factory = async_session_factory
+
+    @property
+    def session_factory(self) -> sessionmaker:
+        return get_sessionmaker() if self._configured else self._session_factory
+
+    @property
+    def async_session_factory(self) -> Optional[Any]:
+        return get_async_sessionmaker() if self._configured else self._async_session_factory
+
+    def _run_sync(self, fn: Callable[[Session], T]) -> T:
+        with self.session_factory() as session:
+            return fn(session)
+
+    async def run(self, fn: Callable[[Session], T]) -> T:
+        if self.async_session_factory is not None:
+            async with self.async_session_factory() as session:
+                return await session.run_sync(fn)
+        return await run_in_threadpool(self._run_sync, fn)
+
+
+database = Database()
+
 # Dependency for getting the database session
 def get_db():
-    db = SessionLocal()
+    db = get_sessionmaker()()
     try:
         yield db
     finally:
         db.close()
+
+# Dependency for handlers that manage their own session lifetime, such as
+# streaming responses whose body is produced after get_db has closed its session
+def get_session_factory():
+    return get_sessionmaker()
+
+# Dependency for async handlers
+def get_database() -> Database:
+    return database
+
+async def dispose_engines() -> None:
+    """Close the pools of the engines created so far."""
+    if get_engine.cache_info().currsize:
+        get_engine().dispose()
+    if get_async_engine.cache_info().currsize and get_async_engine() is not None:
+        await get_async_engine().dispose()
+
+
+# Names that used to be created at import time, now resolved on first access
+_LAZY_ATTRIBUTES = {
+    "engine": get_engine,
+    "SessionLocal": get_sessionmaker,
+    "async_engine": get_async_engine,
+    "AsyncSessionLocal": get_async_sessionmaker,
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,96 @@
+from typing import Optional, Tuple
+
+import numpy as np
+
+from app.store import PRICE_COLUMNS, PriceColumns
+
+METHODS = ("lttb", "ohlc")
+MIN_POINTS = 3
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n: int) -> np.ndarray:
+    """
+    Indices of the n points kept by largest-triangle-three-buckets.
+
+    The first and last points are always kept; every bucket in between keeps
+    the point forming the largest triangle with the previously kept point and
+    the average of the next bucket. Bucket averages are computed in one
+    vectorized pass; only the choice of each bucket's point is sequential.
+    """
+    length = len(y)
+    if n >= length or n < MIN_POINTS:
+        return np.arange(length)
+    x = x.astype(np.float64)
+    y = y.astype(np.float64)
+    # n - 2 buckets over the interior points 1 .. length - 2
+    edges = np.linspace(1, length - 1, n - 1).astype(np.int64)
+    counts = np.diff(edges)
+    avg_x = np.add.reduceat(x[:length - 1], edges[:-1]) / counts
+    avg_y = np.add.reduceat(y[:length - 1], edges[:-1]) / counts
+    # The point after the last bucket is the final row itself
+    next_x = np.r_[avg_x[1:], x[-1]]
+    next_y = np.r_[avg_y[1:], y[-1]]
+
+    selected = np.empty(n, dtype=np.int64)
+    selected[0], selected[-1] = 0, length - 1
+    a = 0
+    for bucket, (start, end) in enumerate(zip(edges[:-1].tolist(), edges[1:].tolist())):
+        area = np.abs(
+            (x[a] - next_x[bucket]) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (next_y[bucket] - y[a])
+        )
+        a = start + int(area.argmax())
+        selected[bucket + 1] = a
+    return selected
+
+
+def _lttb(data: PriceColumns, lo: int, hi: int, n: int) -> PriceColumns:
+    """Keep the full rows of the days LTTB selects on the close price."""
+    indices = lo + lttb_indices(data.days[lo:hi], data.columns["close"][lo:hi], n)
+    return PriceColumns.from_arrays(data.days[indices], {name: data.columns[name][indices] for name in PRICE_COLUMNS})
+
+
+def _ohlc(data: PriceColumns, lo: int, hi: int, n: int) -> PriceColumns:
+    """
+    Merge consecutive days into n buckets of (nearly) equal length.
+
+    Each bucket is dated by its first day and keeps the first open, highest
+    high, lowest low, last close and summed volume, so no extreme is lost.
+    """
+    edges = lo + np.linspace(0, hi - lo, n + 1).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+    columns = data.columns
+    return PriceColumns.from_arrays(
+        data.days[starts],
+        {
+            "open": columns["open"][starts],
+            "high": np.maximum.reduceat(columns["high"][lo:hi], starts - lo),
+            "low": np.minimum.reduceat(columns["low"][lo:hi], starts - lo),
+            "close": columns["close"][ends - 1],
+            "adj_close": columns["adj_close"][ends - 1],
+            "volume": np.add.reduceat(columns["volume"][lo:hi], starts - lo),
+        },
+    )
+
+
+def downsample(data: PriceColumns, lo: int, hi: int, max_points: int, method: str = "lttb") -> Optional[PriceColumns]:
+    """
+    At most max_points rows summarizing [lo, hi), memoized per snapshot.
+
+    Returns None when the slice already fits, so callers serve it unchanged.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unsupported downsampling method: {method}")
+    if hi - lo <= max_points:
+        return None
+    build = _lttb if method == "lttb" else _ohlc
+    return data.memoize(("downsample", method, lo, hi, max_points), lambda: build(data, lo, hi, max_points))
+
+
+def downsample_slice(
+    data: PriceColumns, lo: int, hi: int, max_points: Optional[int], method: str = "lttb"
+) -> Tuple[PriceColumns, int, int]:
+    """Swap rows [lo, hi) for the downsampled snapshot when max_points is set and exceeded."""
+    if max_points is None:
+        return data, lo, hi
+    reduced = downsample(data, lo, hi, max_points, method)
+    return (data, lo, hi) if reduced is None else (reduced, 0, len(reduced))
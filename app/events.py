@@ -0,0 +1,154 @@
+import json
+import logging
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.serialization import encode_rows
+from app.stats import TRADING_DAYS_PER_YEAR
+from app.store import PriceColumns, to_day
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EVENTS_PATH = Path(__file__).resolve().parent.parent / "data" / "market_events.json"
+MAX_OFFSET_DAYS = 3650
+
+
+@dataclass(frozen=True)
+class MarketEvent:
+    """A dated market event (halving or otherwise) and the default window of days around it."""
+    name: str
+    kind: str
+    date: date
+    days_before: int
+    days_after: int
+    number: Optional[int] = None
+    description: str = ""
+
+    def offsets(self, days_before: Optional[int] = None, days_after: Optional[int] = None) -> Tuple[int, int]:
+        return (
+            self.days_before if days_before is None else days_before,
+            self.days_after if days_after is None else days_after,
+        )
+
+    def window(self, days_before: Optional[int] = None, days_after: Optional[int] = None) -> Tuple[date, date]:
+        before, after = self.offsets(days_before, days_after)
+        return self.date - timedelta(days=before), self.date + timedelta(days=after)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "date": self.date.isoformat()}
+
+
+class EventRegistry:
+    """Named market events sorted by date, with halvings also addressable by number."""
+
+    def __init__(self, events: List[MarketEvent]):
+        self.events: Dict[str, MarketEvent] = {event.name: event for event in sorted(events, key=lambda e: e.date)}
+        self.halvings: Dict[int, MarketEvent] = {
+            event.number: event for event in self.events.values() if event.kind == "halving" and event.number is not None
+        }
+
+    def get(self, name: str) -> Optional[MarketEvent]:
+        return self.events.get(name)
+
+    def halving(self, number: int) -> Optional[MarketEvent]:
+        return self.halvings.get(number)
+
+    def list(self, kind: Optional[str] = None) -> List[MarketEvent]:
+        return [event for event in self.events.values() if kind is None or event.kind == kind]
+
+
+def parse_event(raw: Dict[str, Any]) -> MarketEvent:
+    return MarketEvent(
+        name=raw["name"],
+        kind=raw.get("kind", "market"),
+        date=date.fromisoformat(raw["date"]),
+        days_before=int(raw.get("days_before", 30)),
+        days_after=int(raw.get("days_after", 30)),
+        number=raw.get("number"),
+        description=raw.get("description", ""),
+    )
+
+
+@lru_cache(maxsize=None)
+def load_events(path: str) -> EventRegistry:
+    """Read the event registry once per path; dates are parsed here rather than per request."""
+    with open(path, encoding="utf-8") as f:
+        registry = EventRegistry([parse_event(raw) for raw in json.load(f)])
+    logger.info(f"Loaded {len(registry.events)} market events from {path}.")
+    return registry
+
+
+def get_events() -> EventRegistry:
+    return load_events(settings.market_events_path or str(DEFAULT_EVENTS_PATH))
+
+
+def window_indices(
+    data: PriceColumns, event: MarketEvent, days_before: Optional[int] = None, days_after: Optional[int] = None
+) -> Tuple[int, int]:
+    """The [lo, hi) rows of the event window, memoized per snapshot and offsets."""
+    before, after = event.offsets(days_before, days_after)
+    return data.memoize(("event_window", event.name, before, after), lambda: data.range_indices(*event.window(before, after)))
+
+
+def _leg(data: PriceColumns, lo: int, hi: int) -> Optional[Dict[str, Any]]:
+    """Return, annualized volatility and max drawdown of the closes in rows [lo, hi)."""
+    close = data.columns["close"][lo:hi]
+    if len(close) < 2:
+        return None
+    log_returns = np.diff(np.log(close))
+    volatility = float(log_returns.std(ddof=1) * np.sqrt(TRADING_DAYS_PER_YEAR)) if len(log_returns) > 1 else None
+    return {
+        "start_date": data.date_strings[lo],
+        "end_date": data.date_strings[hi - 1],
+        "return": float(close[-1] / close[0] - 1),
+        "annualized_volatility": volatility,
+        "max_drawdown": float((close / np.maximum.accumulate(close)).min() - 1),
+    }
+
+
+def event_returns(
+    data: PriceColumns, event: MarketEvent, days_before: Optional[int] = None, days_after: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Compare the window before the event with the window after it.
+
+    The pivot is the last close on or before the event date; the pre leg runs
+    from the window start to the pivot and the post leg from the pivot to the
+    window end. Memoized per snapshot and offsets.
+    """
+    before, after = event.offsets(days_before, days_after)
+
+    def compute() -> Dict[str, Any]:
+        lo, hi = window_indices(data, event, before, after)
+        pivot = int(np.searchsorted(data.days, to_day(event.date), side="right")) - 1
+        result: Dict[str, Any] = {
+            "event": event.name, "date": event.date.isoformat(), "days_before": before, "days_after": after,
+            "pivot_date": None, "pivot_close": None, "pre": None, "post": None, "return_difference": None,
+        }
+        if not lo <= pivot < hi:
+            return result
+        pre, post = _leg(data, lo, pivot + 1), _leg(data, pivot, hi)
+        result.update(
+            pivot_date=data.date_strings[pivot],
+            pivot_close=float(data.columns["close"][pivot]),
+            pre=pre,
+            post=post,
+            return_difference=post["return"] - pre["return"] if pre and post else None,
+        )
+        return result
+
+    return data.memoize(("event_returns", event.name, before, after), compute)
+
+
+def warm_event_windows(data: PriceColumns, registry: EventRegistry) -> None:
+    """Precompute the default window, its encoded rows and the comparison for every event."""
+    for event in registry.list():
+        lo, hi = window_indices(data, event)
+        encode_rows(data, lo, hi)
+        event_returns(data, event)
@@ -0,0 +1,225 @@
+import asyncio
+import logging
+import statistics
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import httpx
+
+from app.cache import QuoteCache, make_backend
+from app.config import Lazy, settings
+from app.metrics import UPSTREAM_ERRORS, UPSTREAM_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ExchangeSource:
+    """A public ticker endpoint and how to read the BTC/USD price (and 24h BTC volume) from it."""
+    name: str
+    url: str
+    parse_price: Callable[[Any], Any]
+    parse_volume: Optional[Callable[[Any], Any]] = None
+
+
+@dataclass
+class Quote:
+    source: str
+    price: Optional[float]
+    volume: Optional[float]
+    latency_ms: float
+    error: Optional[str] = None
+
+
+SOURCES: Dict[str, ExchangeSource] = {
+    source.name: source
+    for source in (
+        ExchangeSource(
+            "coingecko",
+            "https://api.coingecko.com/api/v3/simple/price?ids=bitcoin&vs_currencies=usd&include_24hr_vol=true",
+            lambda data: data["bitcoin"]["usd"],
+            # CoinGecko reports volume in USD; convert to BTC so it can weight the VWAP
+            lambda data: data["bitcoin"]["usd_24h_vol"] / data["bitcoin"]["usd"],
+        ),
+        ExchangeSource(
+            "coincap",
+            "https://api.coincap.io/v2/assets/bitcoin",
+            lambda data: data["data"]["priceUsd"],
+            lambda data: float(data["data"]["volumeUsd24Hr"]) / float(data["data"]["priceUsd"]),
+        ),
+        ExchangeSource(
+            "binance",
+            "https://api.binance.com/api/v3/ticker/price?symbol=BTCUSDT",
+            lambda data: data["price"],
+        ),
+        ExchangeSource(
+            "kraken",
+            "https://api.kraken.com/0/public/Ticker?pair=XXBTZUSD",
+            lambda data: data["result"]["XXBTZUSD"]["c"][0],
+            lambda data: data["result"]["XXBTZUSD"]["v"][1],
+        ),
+        ExchangeSource(
+            "bybit",
+            "https://api.bybit.com/v2/public/tickers?symbol=BTCUSD",
+            lambda data: data.get("result", [{}])[0].get("last_price"),
+        ),
+        ExchangeSource(
+            "coinbase",
+            "https://api.coinbase.com/v2/prices/bitcoin-usd/spot",
+            lambda data: data.get("data", {}).get("amount"),
+        ),
+        ExchangeSource(
+            "kucoin",
+            "https://api.kucoin.com/api/v1/market/orderbook/level1?symbol=BTC-USDT",
+            lambda data: data.get("data", {}).get("price"),
+        ),
+    )
+}
+
+
+def configured_sources() -> List[ExchangeSource]:
+    """Sources enabled through ``settings.exchange_sources``, in the configured order."""
+    names = [name.strip() for name in settings.exchange_sources.split(",") if name.strip()]
+    return [SOURCES[name] for name in names if name in SOURCES]
+
+
+# Shared client created on application startup; it keeps TLS connections alive between requests
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def create_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(settings.exchange_timeout),
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry,
+        ),
+        headers={"Accept": "application/json"},
+    )
+
+
+async def start_http_client() -> None:
+    global _http_client
+    if _http_client is None:
+        _http_client = create_http_client()
+
+
+async def close_http_client() -> None:
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+# Dependency providing the pooled HTTP client used to reach the exchanges
+def get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None:
+        _http_client = create_http_client()
+    return _http_client
+
+
+async def request_json(client: httpx.AsyncClient, url: str) -> Any:
+    """GET a JSON document, retrying connection errors, 429 and 5xx responses with exponential backoff."""
+    attempt = 0
+    while True:
+        try:
+            response = await client.get(url)
+            if response.status_code == 429 or response.status_code >= 500:
+                response.raise_for_status()
+            break
+        except (httpx.TransportError, httpx.HTTPStatusError):
+            if attempt >= settings.exchange_retries:
+                raise
+            await asyncio.sleep(settings.exchange_backoff * 2 ** attempt)
+            attempt += 1
+    response.raise_for_status()
+    return response.json()
+
+
+quote_cache = Lazy(lambda: QuoteCache(
+    ttl=settings.quote_cache_ttl,
+    stale_ttl=settings.quote_cache_stale_ttl,
+    backend=make_backend(settings.cache_backend, settings.cache_redis_url, settings.cache_key_prefix),
+))
+
+
+async def request_source_json(client: httpx.AsyncClient, source: ExchangeSource) -> Any:
+    """One uncached request to a source, recorded in the upstream latency and error metrics."""
+    started = time.perf_counter()
+    try:
+        return await request_json(client, source.url)
+    except Exception as e:
+        UPSTREAM_ERRORS.labels(source=source.name, error=type(e).__name__).inc()
+        raise
+    finally:
+        UPSTREAM_SECONDS.labels(source=source.name).observe(time.perf_counter() - started)
+
+
+async def fetch_source_json(client: httpx.AsyncClient, source: ExchangeSource) -> Any:
+    """Fetch a source's ticker document through the quote cache, coalescing concurrent callers."""
+    return await quote_cache.get(source.name, lambda: request_source_json(client, source))
+
+
+async def fetch_quote(client: httpx.AsyncClient, source: ExchangeSource) -> Quote:
+    """Fetch one source; failures are reported on the quote instead of raised."""
+    started = time.perf_counter()
+    try:
+        data = await fetch_source_json(client, source)
+        price = float(source.parse_price(data))
+        volume = None
+        if source.parse_volume is not None:
+            try:
+                volume = float(source.parse_volume(data))
+            except (KeyError, IndexError, TypeError, ValueError, ZeroDivisionError):
+                volume = None
+        return Quote(source.name, price, volume, (time.perf_counter() - started) * 1000)
+    except Exception as e:
+        logger.warning(f"Failed to fetch a quote from {source.name}: {e}")
+        return Quote(source.name, None, None, (time.perf_counter() - started) * 1000, error=str(e) or type(e).__name__)
+
+
+async def fetch_quotes(client: httpx.AsyncClient, sources: Iterable[ExchangeSource], timeout: float) -> List[Quote]:
+    """Query every source concurrently, giving each at most ``timeout`` seconds."""
+    async def fetch_with_deadline(source: ExchangeSource) -> Quote:
+        try:
+            return await asyncio.wait_for(fetch_quote(client, source), timeout)
+        except asyncio.TimeoutError:
+            UPSTREAM_ERRORS.labels(source=source.name, error="timeout").inc()
+            return Quote(source.name, None, None, timeout * 1000, error="timeout")
+
+    return list(await asyncio.gather(*(fetch_with_deadline(source) for source in sources)))
+
+
+def consensus(quotes: List[Quote]) -> Dict[str, Any]:
+    """Combine the successful quotes into a median/VWAP consensus with spread."""
+    prices = [quote.price for quote in quotes if quote.price is not None]
+    weighted = [(quote.price, quote.volume) for quote in quotes if quote.price is not None and quote.volume]
+    result: Dict[str, Any] = {
+        "median_price": None,
+        "mean_price": None,
+        "vwap": None,
+        "min_price": None,
+        "max_price": None,
+        "spread": None,
+        "spread_pct": None,
+        "sources_ok": len(prices),
+        "sources_total": len(quotes),
+    }
+    if prices:
+        median = statistics.median(prices)
+        result.update(
+            median_price=median,
+            mean_price=statistics.fmean(prices),
+            min_price=min(prices),
+            max_price=max(prices),
+            spread=max(prices) - min(prices),
+            spread_pct=(max(prices) - min(prices)) / median * 100 if median else None,
+        )
+    if weighted:
+        total_volume = sum(volume for _, volume in weighted)
+        result["vwap"] = sum(price * volume for price, volume in weighted) / total_volume
+    result["quotes"] = [asdict(quote) for quote in quotes]
+    return result
@@ -0,0 +1,114 @@
+import zlib
+from datetime import date, datetime, time, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+
+from app.config import settings
+from app.store import PRICE_COLUMNS, PriceColumns, price_store, refresh_store, to_day
+
+# Bump when the representation of cached responses changes so clients revalidate
+ETAG_SALT = "v1"
+CACHE_HEADERS = ("ETag", "Last-Modified", "Cache-Control", "Vary")
+
+
+def slice_fingerprint(data: PriceColumns, lo: int, hi: int) -> str:
+    """CRC32 over the raw column bytes of rows [lo, hi), memoized per snapshot."""
+    def compute() -> str:
+        checksum = zlib.crc32(data.days[lo:hi].tobytes())
+        for name in PRICE_COLUMNS:
+            checksum = zlib.crc32(data.columns[name][lo:hi].tobytes(), checksum)
+        return f"{checksum:08x}-{hi - lo}"
+
+    return data.memoize(("fingerprint", lo, hi), compute)
+
+
+def make_etag(request: Request, fingerprint: str, variant: str = "") -> str:
+    # The query string selects the representation (pagination, grouping, indicator parameters...)
+    # and variant covers whatever the headers select, such as the negotiated format. Weak, because
+    # the compression middleware sends gzip, brotli and identity bytes under the same tag
+    checksum = zlib.crc32(f"{ETAG_SALT}{variant}?{request.url.query}".encode())
+    return f'W/"{fingerprint}-{checksum:08x}"'
+
+
+def opaque_tag(etag: str) -> str:
+    """The quoted part of an entity tag, for the weak comparison If-None-Match uses."""
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def http_date(day: date) -> str:
+    return format_datetime(datetime.combine(day, time(), tzinfo=timezone.utc), usegmt=True)
+
+
+def cache_control(end: Optional[date], data: PriceColumns) -> str:
+    """
+    Closed periods never change and may be cached for long; anything else stays short-lived.
+
+    A period is closed once it has ended and the store holds its final day,
+    so a past year still missing its last days is not cached as final.
+    """
+    if (
+        end is not None
+        and end < datetime.now(timezone.utc).date()
+        and len(data)
+        and int(data.days[-1]) >= to_day(end)
+    ):
+        return f"public, max-age={settings.http_cache_closed_max_age}"
+    return f"public, max-age={settings.http_cache_open_max_age}"
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[str]) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match takes precedence over If-Modified-Since
+        candidates = [opaque_tag(tag.strip()) for tag in if_none_match.split(",")]
+        return "*" in candidates or opaque_tag(etag) in candidates
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+async def conditional_get(
+    request: Request,
+    response: Response,
+    database,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    variant: Optional[str] = None,
+) -> Optional[Response]:
+    """
+    Set ETag, Last-Modified and Cache-Control for the rows in [start, end].
+
+    Returns a 304 response when the client's copy is current, before any
+    rows are read or serialized. Pass the Accept-negotiated format as variant
+    so each representation gets its own ETag. Needs the price store; without
+    it nothing is cached and None is returned.
+    """
+    if not price_store.enabled:
+        return None
+    await refresh_store(database)
+    data = price_store.snapshot()
+    lo, hi = data.range_indices(start, end)
+
+    headers: Dict[str, str] = {
+        "ETag": make_etag(request, slice_fingerprint(data, lo, hi), variant or ""),
+        "Cache-Control": cache_control(end, data),
+    }
+    if variant is not None:
+        headers["Vary"] = "Accept"
+    if hi > lo:
+        headers["Last-Modified"] = http_date(date.fromisoformat(data.date_strings[hi - 1]))
+    if is_not_modified(request, headers["ETag"], headers.get("Last-Modified")):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+def cache_headers(response: Response) -> Dict[str, str]:
+    """Validator headers set by conditional_get, for endpoints that build their own Response."""
+    return {name: response.headers[name] for name in CACHE_HEADERS if name in response.headers}
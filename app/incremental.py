@@ -0,0 +1,297 @@
+import argparse
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import httpx
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.candles import rollups
+from app.config import Lazy, settings
+from app.exchanges import get_http_client, request_json
+from app.ingest import CSV_COLUMNS, normalize_frame, upsert_frames
+from app.models.bitcoin_price import BitcoinPrice
+from app.store import price_store
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DROP_DIR = Path(__file__).resolve().parent.parent / "data" / "incoming"
+BINANCE_KLINES_URL = "https://api.binance.com/api/v3/klines"
+BINANCE_KLINES_LIMIT = 1000
+DAY_MS = 86_400_000
+
+# Inclusive range of missing days
+Gap = Tuple[date, date]
+
+
+def _empty_frame() -> pd.DataFrame:
+    return pd.DataFrame(columns=list(CSV_COLUMNS.values()))
+
+
+class PriceSource(ABC):
+    """Where new daily candles come from. fetch returns a frame normalized like ``ingest.normalize_frame``."""
+
+    name = "source"
+
+    @abstractmethod
+    async def fetch(self, start: Optional[date], end: date) -> pd.DataFrame:
+        ...
+
+
+class CsvDropSource(PriceSource):
+    """Yahoo Finance style CSV files dropped into a directory; later files win on duplicate dates."""
+
+    name = "csv"
+
+    def __init__(self, directory: Union[str, Path] = DEFAULT_DROP_DIR):
+        self.directory = Path(directory)
+
+    async def fetch(self, start: Optional[date], end: date) -> pd.DataFrame:
+        paths = sorted(self.directory.glob("*.csv"))
+        if not paths:
+            return _empty_frame()
+        frame = pd.concat([normalize_frame(pd.read_csv(path)) for path in paths], ignore_index=True)
+        frame = frame.drop_duplicates(subset="date", keep="last")
+        mask = frame["date"] <= end
+        if start is not None:
+            mask &= frame["date"] >= start
+        return frame[mask]
+
+
+class BinanceDailySource(PriceSource):
+    """Daily BTC/USDT klines from Binance; volume is the quote (USD) volume, as in the Yahoo data."""
+
+    name = "exchange"
+
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        self.client = client
+
+    async def fetch(self, start: Optional[date], end: date) -> pd.DataFrame:
+        client = self.client or get_http_client()
+        start_ms = int(datetime.combine(start or date(2017, 8, 17), datetime.min.time(), timezone.utc).timestamp() * 1000)
+        end_ms = int(datetime.combine(end, datetime.min.time(), timezone.utc).timestamp() * 1000) + DAY_MS - 1
+        klines: List[List[Any]] = []
+        while start_ms <= end_ms:
+            url = (
+                f"{BINANCE_KLINES_URL}?symbol=BTCUSDT&interval=1d"
+                f"&startTime={start_ms}&endTime={end_ms}&limit={BINANCE_KLINES_LIMIT}"
+            )
+            page = await request_json(client, url)
+            if not page:
+                break
+            klines.extend(page)
+            start_ms = page[-1][0] + DAY_MS
+        if not klines:
+            return _empty_frame()
+        raw = np.array([kline[:8] for kline in klines], dtype=np.float64)
+        frame = pd.DataFrame({
+            "date": pd.to_datetime(raw[:, 0], unit="ms").date,
+            "open": raw[:, 1],
+            "high": raw[:, 2],
+            "low": raw[:, 3],
+            "close": raw[:, 4],
+            "adj_close": raw[:, 4],
+            "volume": raw[:, 7].astype(np.int64),
+        })
+        return frame
+
+
+class StaticSource(PriceSource):
+    """A fixed in-memory frame; used by tests and for replaying a known dataset."""
+
+    name = "static"
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+
+    async def fetch(self, start: Optional[date], end: date) -> pd.DataFrame:
+        mask = self.frame["date"] <= end
+        if start is not None:
+            mask &= self.frame["date"] >= start
+        return self.frame[mask]
+
+
+def configured_source() -> PriceSource:
+    if settings.ingest_source == "csv":
+        return CsvDropSource(settings.ingest_drop_dir or DEFAULT_DROP_DIR)
+    if settings.ingest_source == "exchange":
+        return BinanceDailySource()
+    raise ValueError(f"Unknown ingest source: {settings.ingest_source}")
+
+
+def stored_days(engine: Engine) -> np.ndarray:
+    """Every stored date as int days since the epoch, read from the primary key index only."""
+    with engine.connect() as connection:
+        dates = connection.execute(select(BitcoinPrice.date).order_by(BitcoinPrice.date)).scalars().all()
+    return np.array(dates, dtype="datetime64[D]").astype(np.int64)
+
+
+def find_gaps(days: np.ndarray, until: Optional[int] = None) -> List[Tuple[int, int]]:
+    """Missing day ranges between consecutive sorted days, plus the tail up to until (all inclusive)."""
+    if len(days) == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(days) > 1)
+    gaps = [(int(days[i]) + 1, int(days[i + 1]) - 1) for i in breaks]
+    if until is not None and until > days[-1]:
+        gaps.append((int(days[-1]) + 1, until))
+    return gaps
+
+
+def last_complete_day() -> date:
+    """Yesterday (UTC): today's daily candle is still open and would be stored half-formed."""
+    return datetime.now(timezone.utc).date() - timedelta(days=1)
+
+
+def _as_dates(gaps: List[Tuple[int, int]]) -> List[Gap]:
+    epoch = date(1970, 1, 1)
+    return [(epoch + timedelta(days=lo), epoch + timedelta(days=hi)) for lo, hi in gaps]
+
+
+@dataclass
+class SyncReport:
+    source: str
+    last_date: Optional[str]
+    requested: List[Tuple[str, str]] = field(default_factory=list)
+    rows_upserted: int = 0
+    gaps_remaining: List[Tuple[str, str]] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def refresh_dependents(engine: Engine) -> None:
+    """Reload the price store and bring the candle rollups up to date after new rows landed."""
+    price_store.invalidate()
+    if not price_store.enabled:
+        return
+    with Session(engine) as db:
+        price_store.ensure_loaded(db)
+    data = price_store.snapshot()
+    # Appended days extend the previous snapshot, so each rollup only re-aggregates its last candle
+    for rollup in rollups.values():
+        rollup.sync(data)
+
+
+async def sync_prices(engine: Engine, source: PriceSource, until: Optional[date] = None) -> SyncReport:
+    """
+    Fetch and upsert only the days missing from bitcoin_prices.
+
+    Missing days are the gaps between stored dates plus everything after the
+    last stored date up to until, which is capped at the last complete day
+    (yesterday, UTC). Each gap is fetched on its own, so a historic gap the
+    source cannot fill does not make every run re-download the years after
+    it. Days the source could not supply are reported back as remaining gaps.
+    """
+    started = time.perf_counter()
+    until = min(until, last_complete_day()) if until else last_complete_day()
+    days = await run_in_threadpool(stored_days, engine)
+    until_day = (until - date(1970, 1, 1)).days
+    report = SyncReport(source=source.name, last_date=str(days[-1].astype("datetime64[D]")) if len(days) else None)
+
+    if len(days) == 0:
+        # Empty table: take everything the source has
+        frame = await source.fetch(None, until)
+    else:
+        missing = _as_dates(find_gaps(days, until_day))
+        report.requested = [(lo.isoformat(), hi.isoformat()) for lo, hi in missing]
+        frames = []
+        for lo, hi in missing:
+            fetched = await source.fetch(lo, hi)
+            if not fetched.empty:
+                frames.append(fetched)
+        frame = pd.concat(frames, ignore_index=True) if frames else _empty_frame()
+        # Keep only days inside a gap; anything already stored is left untouched
+        new_days = np.array(frame["date"].tolist(), dtype="datetime64[D]").astype(np.int64)
+        frame = frame[~np.isin(new_days, days)]
+
+    if not frame.empty:
+        report.rows_upserted = await run_in_threadpool(upsert_frames, engine, [frame])
+        await run_in_threadpool(refresh_dependents, engine)
+
+    remaining = np.union1d(days, np.array(frame["date"].tolist(), dtype="datetime64[D]").astype(np.int64))
+    report.gaps_remaining = [(lo.isoformat(), hi.isoformat()) for lo, hi in _as_dates(find_gaps(remaining, until_day))]
+    report.elapsed_ms = (time.perf_counter() - started) * 1000
+    if report.gaps_remaining:
+        logger.warning(f"bitcoin_prices still has {len(report.gaps_remaining)} gap(s): {report.gaps_remaining}")
+    logger.info(
+        f"Incremental sync from {source.name}: {report.rows_upserted} rows upserted after {report.last_date} "
+        f"in {report.elapsed_ms:.1f}ms."
+    )
+    return report
+
+
+class IngestionJob:
+    """Runs sync_prices on a fixed interval in the background and keeps the latest report."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.last_report: Optional[SyncReport] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def run_once(self, engine: Engine, source: PriceSource) -> SyncReport:
+        self.last_report = await sync_prices(engine, source)
+        return self.last_report
+
+    async def _run(self, engine: Engine, source: PriceSource) -> None:
+        while True:
+            try:
+                await self.run_once(engine, source)
+            except Exception as e:
+                logger.error(f"Incremental ingestion failed: {e}", exc_info=True)
+            await asyncio.sleep(self.interval)
+
+    def start(self, engine: Engine, source: PriceSource) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._run(engine, source))
+            logger.info(f"Started incremental ingestion from {source.name} every {self.interval}s.")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+ingestion_job = Lazy(lambda: IngestionJob(interval=settings.ingest_interval))
+
+
+async def _sync_once(engine: Engine, source_name: str, drop_dir: str) -> SyncReport:
+    if source_name == "csv":
+        return await sync_prices(engine, CsvDropSource(drop_dir))
+    async with httpx.AsyncClient(timeout=settings.exchange_timeout) as client:
+        return await sync_prices(engine, BinanceDailySource(client))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fetch and upsert only the days missing from bitcoin_prices.")
+    parser.add_argument("--source", choices=["csv", "exchange"], default=settings.ingest_source, help="Where new days come from.")
+    parser.add_argument("--drop-dir", default=settings.ingest_drop_dir or str(DEFAULT_DROP_DIR), help="CSV drop directory.")
+    args = parser.parse_args()
+
+    from app.database import get_engine
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    report = asyncio.run(_sync_once(get_engine(), args.source, args.drop_dir))
+    print(report.to_dict())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from app.store import PriceColumns
+
+# Bitcoin trades every day of the year
+PERIODS_PER_YEAR = 365
+
+
+def _series(values: np.ndarray):
+    # pandas is imported on first use so that importing the app does not load it
+    import pandas as pd
+
+    return pd.Series(values)
+
+
+def sma(values: np.ndarray, window: int) -> np.ndarray:
+    """Simple moving average in O(n) using a cumulative sum; the first window - 1 values are NaN."""
+    result = np.full(len(values), np.nan)
+    if window <= len(values):
+        cumulative = np.cumsum(np.r_[0.0, values])
+        result[window - 1:] = (cumulative[window:] - cumulative[:-window]) / window
+    return result
+
+
+def ema(values: np.ndarray, span: int) -> np.ndarray:
+    """Exponential moving average with smoothing 2 / (span + 1)."""
+    return _series(values).ewm(span=span, adjust=False).mean().to_numpy()
+
+
+def wilder(values: np.ndarray, window: int) -> np.ndarray:
+    """Wilder's smoothing (an EMA with alpha = 1 / window) as used by RSI and ATR."""
+    return _series(values).ewm(alpha=1 / window, adjust=False).mean().to_numpy()
+
+
+def rolling_std(values: np.ndarray, window: int) -> np.ndarray:
+    return _series(values).rolling(window).std(ddof=0).to_numpy()
+
+
+def rsi(close: np.ndarray, window: int) -> np.ndarray:
+    change = np.diff(close)
+    gains = wilder(np.clip(change, 0, None), window)
+    losses = wilder(np.clip(-change, 0, None), window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values = np.where(losses == 0, 100.0, 100 - 100 / (1 + gains / losses))
+    result = np.full(len(close), np.nan)
+    result[1:] = values
+    result[:window] = np.nan  # not enough history yet
+    return result
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    previous_close = np.r_[np.nan, close[:-1]]
+    return np.fmax(high - low, np.fmax(np.abs(high - previous_close), np.abs(low - previous_close)))
+
+
+def _sma(data: PriceColumns, window: int = 20) -> Dict[str, np.ndarray]:
+    return {"sma": sma(data.columns["close"], window)}
+
+
+def _ema(data: PriceColumns, window: int = 20) -> Dict[str, np.ndarray]:
+    return {"ema": ema(data.columns["close"], window)}
+
+
+def _rsi(data: PriceColumns, window: int = 14) -> Dict[str, np.ndarray]:
+    return {"rsi": rsi(data.columns["close"], window)}
+
+
+def _bollinger(data: PriceColumns, window: int = 20, k: float = 2.0) -> Dict[str, np.ndarray]:
+    close = data.columns["close"]
+    middle = sma(close, window)
+    width = k * rolling_std(close, window)
+    return {"middle": middle, "upper": middle + width, "lower": middle - width}
+
+
+def _macd(data: PriceColumns, fast: int = 12, slow: int = 26, signal: int = 9) -> Dict[str, np.ndarray]:
+    close = data.columns["close"]
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(line, signal)
+    return {"macd": line, "signal": signal_line, "histogram": line - signal_line}
+
+
+def _atr(data: PriceColumns, window: int = 14) -> Dict[str, np.ndarray]:
+    ranges = true_range(data.columns["high"], data.columns["low"], data.columns["close"])
+    result = wilder(ranges, window)
+    result[:window - 1] = np.nan
+    return {"atr": result}
+
+
+def _volatility(data: PriceColumns, window: int = 30) -> Dict[str, np.ndarray]:
+    log_returns = np.diff(np.log(data.columns["close"]), prepend=np.nan)
+    daily = _series(log_returns).rolling(window).std(ddof=1).to_numpy()
+    return {"volatility": daily * np.sqrt(PERIODS_PER_YEAR)}
+
+
+# Indicator name -> kernel over the full series; defaults live in each kernel's signature
+INDICATORS: Dict[str, Callable[..., Dict[str, np.ndarray]]] = {
+    "sma": _sma,
+    "ema": _ema,
+    "rsi": _rsi,
+    "bollinger": _bollinger,
+    "macd": _macd,
+    "atr": _atr,
+    "volatility": _volatility,
+}
+
+
+def compute_indicator(data: PriceColumns, name: str, **params: Any) -> Dict[str, np.ndarray]:
+    """Indicator series over the whole snapshot, memoized per (indicator, params)."""
+    key = ("indicator", name, tuple(sorted(params.items())))
+    return data.memoize(key, lambda: INDICATORS[name](data, **params))
+
+
+def indicator_rows(data: PriceColumns, lo: int, hi: int, name: str, **params: Any) -> List[Dict[str, Any]]:
+    """Rows for [lo, hi), memoized per (indicator, params, range); warm-up values are None."""
+    def build() -> List[Dict[str, Any]]:
+        series = compute_indicator(data, name, **params)
+        columns = {
+            column: [None if v != v else v for v in values[lo:hi].tolist()]
+            for column, values in series.items()
+        }
+        closes = data.columns["close"][lo:hi].tolist()
+        return [
+            {"date": day, "close": close, **{column: values[i] for column, values in columns.items()}}
+            for i, (day, close) in enumerate(zip(data.date_strings[lo:hi], closes))
+        ]
+
+    return data.memoize(("indicator_rows", name, tuple(sorted(params.items())), lo, hi), build)
@@ -0,0 +1,143 @@
+import argparse
+import csv
+import io
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Union
+
+import pandas as pd
+from sqlalchemy import Table
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection, Engine
+
+from app.models.bitcoin_price import BitcoinPrice
+from app.store import price_store
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CSV_PATH = Path(__file__).resolve().parent.parent / "data" / "BTC-USD Yahoo Finance - Max Yrs.csv"
+DEFAULT_CHUNK_SIZE = 5000
+
+# Yahoo Finance CSV header -> bitcoin_prices column
+CSV_COLUMNS = {
+    "Date": "date",
+    "Open": "open",
+    "High": "high",
+    "Low": "low",
+    "Close": "close",
+    "Adj Close": "adj_close",
+    "Volume": "volume",
+}
+VALUE_COLUMNS = [column for column in CSV_COLUMNS.values() if column != "date"]
+
+
+def normalize_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    """Rename the Yahoo columns and parse dates and scientific-notation volumes in one vectorized pass."""
+    frame = frame.rename(columns=CSV_COLUMNS)[list(CSV_COLUMNS.values())]
+    frame["date"] = pd.to_datetime(frame["date"]).dt.date
+    for column in VALUE_COLUMNS:
+        frame[column] = pd.to_numeric(frame[column], errors="coerce")
+    # Rows Yahoo exports as "null" are dropped before the volume can be cast
+    frame = frame.dropna(subset=["open", "high", "low", "close", "volume"])
+    # Volumes such as "2.1056800e+07" are parsed as floats and then truncated to integers
+    frame["volume"] = frame["volume"].astype("int64")
+    return frame
+
+
+def read_csv_chunks(path: Union[str, Path], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """Stream a Yahoo Finance CSV in normalized chunks."""
+    for chunk in pd.read_csv(path, chunksize=chunk_size):
+        yield normalize_frame(chunk)
+
+
+def frame_to_records(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Convert a normalized frame into plain Python rows, with NaN adj_close as None."""
+    frame = frame.astype(object).where(frame.notna(), None)
+    return frame.to_dict("records")
+
+
+def _upsert_sqlite(connection: Connection, table: Table, frame: pd.DataFrame) -> None:
+    stmt = sqlite_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["date"],
+        set_={column: stmt.excluded[column] for column in VALUE_COLUMNS},
+    )
+    # A single executemany per chunk
+    connection.execute(stmt, frame_to_records(frame))
+
+
+def _upsert_postgresql(connection: Connection, table: Table, frame: pd.DataFrame) -> None:
+    # COPY the chunk into a temporary table, then merge it into bitcoin_prices in one statement
+    columns = list(CSV_COLUMNS.values())
+    buffer = io.StringIO()
+    frame.to_csv(buffer, columns=columns, header=False, index=False, quoting=csv.QUOTE_MINIMAL)
+    buffer.seek(0)
+
+    cursor = connection.connection.cursor()
+    try:
+        cursor.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS bitcoin_prices_staging "
+            f"(LIKE {table.name} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+        )
+        cursor.execute("TRUNCATE bitcoin_prices_staging")
+        cursor.copy_expert(
+            f"COPY bitcoin_prices_staging ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+        updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in VALUE_COLUMNS)
+        cursor.execute(
+            f"INSERT INTO {table.name} ({', '.join(columns)}) "
+            f"SELECT {', '.join(columns)} FROM bitcoin_prices_staging "
+            f"ON CONFLICT (date) DO UPDATE SET {updates}"
+        )
+    finally:
+        cursor.close()
+
+
+def upsert_frames(engine: Engine, frames: Iterable[pd.DataFrame]) -> int:
+    """Upsert normalized frames on the ``date`` primary key and return the number of rows written."""
+    table = BitcoinPrice.__table__
+    dialect = engine.dialect.name
+    if dialect == "postgresql":
+        upsert = _upsert_postgresql
+    elif dialect == "sqlite":
+        upsert = _upsert_sqlite
+    else:
+        raise ValueError(f"Unsupported dialect: {dialect}. Bulk upsert supports postgresql and sqlite")
+
+    total = 0
+    with engine.begin() as connection:
+        for frame in frames:
+            if frame.empty:
+                continue
+            upsert(connection, table, frame)
+            total += len(frame)
+    price_store.invalidate()
+    return total
+
+
+def load_csv(engine: Engine, path: Union[str, Path] = DEFAULT_CSV_PATH, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Load a Yahoo Finance CSV into bitcoin_prices, reporting throughput."""
+    started = time.perf_counter()
+    total = upsert_frames(engine, read_csv_chunks(path, chunk_size))
+    elapsed = time.perf_counter() - started
+    rate = total / elapsed if elapsed > 0 else float("inf")
+    logger.info(f"Upserted {total} rows from {path} in {elapsed:.3f}s ({rate:,.0f} rows/sec).")
+    return total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk load a Yahoo Finance BTC-USD CSV into bitcoin_prices.")
+    parser.add_argument("csv_path", nargs="?", default=str(DEFAULT_CSV_PATH), help="Path to the CSV file.")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per batch.")
+    args = parser.parse_args()
+
+    from app.database import get_engine
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    load_csv(get_engine(), args.csv_path, args.chunk_size)
+
+
+if __name__ == "__main__":
+    main()
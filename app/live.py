@@ -0,0 +1,94 @@
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Set
+
+import httpx
+
+from app.config import Lazy, settings
+from app.exchanges import configured_sources, consensus, fetch_quotes
+
+logger = logging.getLogger(__name__)
+
+
+class PricePoller:
+    """
+    Polls the configured exchanges on a schedule and fans each tick out to subscribers.
+
+    Ticks are kept in a bounded ring buffer for late joiners. Every subscriber
+    gets its own bounded queue; a slow consumer loses its oldest ticks rather
+    than holding up the others.
+    """
+
+    def __init__(self, interval: float, history_size: int, queue_size: int):
+        self.interval = interval
+        self.queue_size = queue_size
+        self.ticks: Deque[Dict[str, Any]] = deque(maxlen=history_size)
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        return self.ticks[-1] if self.ticks else None
+
+    def recent(self, limit: int) -> List[Dict[str, Any]]:
+        return list(self.ticks)[-limit:]
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+    def publish(self, tick: Dict[str, Any]) -> None:
+        self.ticks.append(tick)
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(tick)
+
+    async def poll_once(self, client: httpx.AsyncClient) -> Dict[str, Any]:
+        quotes = await fetch_quotes(client, configured_sources(), settings.exchange_timeout)
+        tick = {"timestamp": datetime.now(timezone.utc).isoformat(), **consensus(quotes)}
+        if tick["sources_ok"]:
+            self.publish(tick)
+        return tick
+
+    async def _run(self, client: httpx.AsyncClient) -> None:
+        while True:
+            try:
+                await self.poll_once(client)
+            except Exception as e:
+                logger.error(f"Live price poll failed: {e}", exc_info=True)
+            await asyncio.sleep(self.interval)
+
+    def start(self, client: httpx.AsyncClient) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._run(client))
+            logger.info(f"Started live price poller every {self.interval}s.")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+price_poller = Lazy(lambda: PricePoller(
+    interval=settings.live_poll_interval,
+    history_size=settings.live_history_size,
+    queue_size=settings.live_subscriber_queue_size,
+))
@@ -0,0 +1,211 @@
+import logging
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, Metric
+from prometheus_client.registry import Collector
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = CONTENT_TYPE_LATEST
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+
+class CallbackMetric(Collector):
+    """
+    A gauge (or, with family=CounterMetricFamily, a counter) read at scrape time
+    from a callback returning {label tuple: value}.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        collect: Callable[[], Dict[Tuple[str, ...], float]] = dict,
+        family: Callable[..., Metric] = GaugeMetricFamily,
+        registry: Optional[CollectorRegistry] = REGISTRY,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._collect = collect
+        self._family = family
+        if registry is not None:
+            registry.register(self)
+
+    def describe(self) -> Iterator[Metric]:
+        # Lets the registry check names without running the callback
+        yield self._family(self.name, self.documentation, labels=self.labelnames)
+
+    def collect(self) -> Iterator[Metric]:
+        family = self._family(self.name, self.documentation, labels=self.labelnames)
+        try:
+            values = self._collect()
+        except Exception as e:
+            # A failing source must not take the whole scrape down
+            logger.warning(f"Could not collect metric {self.name}: {e}")
+            return
+        for key, value in values.items():
+            family.add_metric(list(key), value)
+        yield family
+
+
+def sample_value(metric: Collector, name: str, **labels: str) -> float:
+    """The current value of metric's sample name with exactly these labels; 0 when it was never recorded."""
+    for family in metric.collect():
+        for sample in family.samples:
+            if sample.name == name and sample.labels == labels:
+                return sample.value
+    return 0.0
+
+
+# HTTP requests, recorded by MetricsMiddleware for every route
+REQUESTS = Counter("http_requests_total", "HTTP requests by route template and status.", ("method", "route", "status"))
+REQUEST_SECONDS = Histogram("http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route"))
+REQUEST_PHASE_SECONDS = Histogram(
+    "http_request_phase_seconds", "Time spent per handler phase (load, serialize) as reported in Server-Timing.", ("phase",)
+)
+
+# Database, recorded by SQLAlchemy engine events
+DB_QUERY_SECONDS = Histogram("db_query_duration_seconds", "Duration of each SQL statement.")
+DB_QUERY_ERRORS = Counter("db_query_errors_total", "SQL statements that raised.")
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request", "SQL statements executed while serving one request.", ("route",), buckets=COUNT_BUCKETS
+)
+DB_SECONDS_PER_REQUEST = Histogram("db_time_per_request_seconds", "Total SQL time while serving one request.", ("route",))
+
+# Upstream exchanges, recorded around every uncached request
+UPSTREAM_SECONDS = Histogram("upstream_request_duration_seconds", "Latency of uncached exchange requests.", ("source",))
+UPSTREAM_ERRORS = Counter("upstream_errors_total", "Failed exchange requests by error type.", ("source", "error"))
+
+# In-process caches
+CACHE_LOOKUPS = Counter("cache_lookups_total", "Cache lookups by cache and result.", ("cache", "result"))
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+# Set by the middleware; worker threads started with run_in_threadpool inherit it
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+def route_label(scope: Dict) -> str:
+    """The matched route template, e.g. /api/prices/{year}; unmatched paths share one label."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware timing every HTTP request, including streamed bodies."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            current_request.reset(token)
+            route = route_label(scope)
+            REQUESTS.labels(method=scope["method"], route=route, status=status).inc()
+            REQUEST_SECONDS.labels(method=scope["method"], route=route).observe(elapsed)
+            DB_QUERIES_PER_REQUEST.labels(route=route).observe(stats.queries)
+            DB_SECONDS_PER_REQUEST.labels(route=route).observe(stats.db_seconds)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    DB_QUERY_SECONDS.observe(elapsed)
+    stats = current_request.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context) -> None:
+    started = context.connection.info.get("query_started") if context.connection is not None else None
+    if started:
+        started.pop()
+    DB_QUERY_ERRORS.inc()
+
+
+def _pool_stats() -> Dict[Tuple[str, ...], float]:
+    """Checked-out connections, pool size and saturation for each engine with a sized pool."""
+    from app.database import created_engines
+
+    values: Dict[Tuple[str, ...], float] = {}
+    for name, engine in created_engines():
+        pool = engine.pool
+        if not hasattr(pool, "checkedout") or not hasattr(pool, "size"):
+            continue  # e.g. SQLite's single-connection pools
+        capacity = pool.size() + max(getattr(pool, "_max_overflow", 0), 0)
+        values[(name, "checked_out")] = pool.checkedout()
+        values[(name, "size")] = pool.size()
+        values[(name, "overflow")] = max(pool.overflow(), 0)
+        values[(name, "saturation")] = pool.checkedout() / capacity if capacity else 0.0
+    return values
+
+
+def _cache_hit_ratios() -> Dict[Tuple[str, ...], float]:
+    from app.exchanges import quote_cache
+
+    ratios = {("quotes",): quote_cache.stats()["hit_ratio"] or 0.0}
+    hits = sample_value(CACHE_LOOKUPS, "cache_lookups_total", cache="snapshot_memo", result="hit")
+    misses = sample_value(CACHE_LOOKUPS, "cache_lookups_total", cache="snapshot_memo", result="miss")
+    ratios[("snapshot_memo",)] = hits / (hits + misses) if hits + misses else 0.0
+    return ratios
+
+
+def _quote_cache_lookups() -> Dict[Tuple[str, ...], float]:
+    from app.exchanges import quote_cache
+
+    return {(result,): float(count) for result, count in quote_cache.counters.items()}
+
+
+DB_POOL = CallbackMetric("db_pool_connections", "Connection pool state per engine.", ("engine", "state"), collect=_pool_stats)
+CACHE_HIT_RATIO = CallbackMetric("cache_hit_ratio", "Share of lookups answered from cache.", ("cache",), collect=_cache_hit_ratios)
+# Exposed as quote_cache_lookups_total; the counts only grow, so rate() applies
+QUOTE_CACHE_LOOKUPS = CallbackMetric(
+    "quote_cache_lookups",
+    "Quote cache lookups by result since start or the last cache reset.",
+    ("result",),
+    collect=_quote_cache_lookups,
+    family=CounterMetricFamily,
+)
+
+
+def render() -> str:
+    return generate_latest(REGISTRY).decode()
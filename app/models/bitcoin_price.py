@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Date, Float, Integer
+from sqlalchemy import BigInteger, Column, Date, Float
 from app.database import Base
 from pydantic import BaseModel
 from typing import Optional
@@ -12,7 +12,7 @@ class BitcoinPrice(Base):
     low = Column(Float, nullable=False)
     close = Column(Float, nullable=False)
     adj_close = Column(Float, nullable=True)
-    volume = Column(Integer, nullable=False)
+    volume = Column(BigInteger, nullable=False)  # daily volumes exceed 32-bit range
 
     def to_dict(self):
         """
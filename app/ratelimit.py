@@ -0,0 +1,421 @@
+import hashlib
+import logging
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from fastapi.responses import JSONResponse
+from prometheus_client import Counter
+from pydantic import ValidationError
+from starlette.datastructures import Headers
+
+from app.batch import BatchQueryError, query_bounds, resolve_event
+from app.cache import LocalRedis, redis
+from app.config import Lazy, settings
+from app.metrics import CallbackMetric
+from app.schema import BatchRequest
+from app.store import price_store, to_day
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_BACKENDS = ("memory", "redis", "local-redis")
+
+# Paths under the API prefix that are limited; the live streams hold one long-lived connection
+LIMITED_PREFIX = "/api/"
+EXEMPT_PREFIXES = ("/api/live/",)
+
+# First day of any price history; the bounds used before the price store is loaded
+GENESIS = date(2009, 1, 3)
+
+# First and last day of the history, as day numbers on the price store's time axis
+HistoryBounds = Tuple[int, int]
+
+
+def spend(tokens: float, elapsed: float, cost: float, rate: float, burst: float) -> Tuple[bool, float, float]:
+    """
+    Refill a bucket for elapsed seconds, then try to take cost tokens from it.
+
+    Returns (allowed, tokens left, seconds until cost tokens are available).
+    """
+    tokens = min(burst, tokens + max(elapsed, 0.0) * rate)
+    if tokens >= cost:
+        return True, tokens - cost, 0.0
+    return False, tokens, (cost - tokens) / rate
+
+
+class BucketStore(ABC):
+    """Where token buckets are kept, as (tokens, last update) per client key."""
+
+    @abstractmethod
+    async def take(self, key: str, cost: float, rate: float, burst: float) -> Tuple[bool, float, float]:
+        ...
+
+    def reset(self) -> None:
+        """Forget process-local buckets; shared ones refill on their own."""
+
+    def size(self) -> Optional[int]:
+        return None
+
+
+class MemoryBucketStore(BucketStore):
+    """
+    Buckets in an LRU-ordered dict owned by this process, O(1) per request.
+
+    Beyond max_buckets the least recently seen client is evicted; it comes
+    back with a full bucket, which is what an idle client would have anyway.
+    """
+
+    def __init__(self, max_buckets: int = 100_000):
+        self.max_buckets = max_buckets
+        self.evictions = 0
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, cost: float, rate: float, burst: float) -> Tuple[bool, float, float]:
+        now = time.monotonic()
+        # Popping and re-inserting moves the key to the most recently used end
+        tokens, updated = self._buckets.pop(key, (burst, now))
+        allowed, tokens, retry_after = spend(tokens, now - updated, cost, rate, burst)
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_buckets:
+            self._buckets.popitem(last=False)
+            self.evictions += 1
+        return allowed, tokens, retry_after
+
+    def reset(self) -> None:
+        self._buckets.clear()
+
+    def size(self) -> Optional[int]:
+        return len(self._buckets)
+
+
+class SharedBucketStore(BucketStore):
+    """
+    Buckets in Redis (or LocalRedis), so every worker process draws on the same quota.
+
+    Each bucket expires once it would have refilled, so idle clients cost no
+    memory. The read-modify-write is not atomic: requests racing on
+    different workers may both be admitted, which only loosens the limit by
+    the number of concurrent requests.
+    """
+
+    def __init__(self, client: Any, prefix: str = "bitcoin-api:ratelimit:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def take(self, key: str, cost: float, rate: float, burst: float) -> Tuple[bool, float, float]:
+        # Wall-clock time, so buckets written by another process age correctly
+        now = time.time()
+        raw = await self.client.get(self.prefix + key)
+        if raw is None:
+            tokens, updated = burst, now
+        else:
+            tokens, updated = (float(part) for part in (raw.decode() if isinstance(raw, bytes) else raw).split(":"))
+        allowed, tokens, retry_after = spend(tokens, now - updated, cost, rate, burst)
+        refill_ms = max(int((burst - tokens) / rate * 1000), 1)
+        await self.client.set(self.prefix + key, f"{tokens!r}:{now!r}".encode(), px=refill_ms)
+        return allowed, tokens, retry_after
+
+
+def make_bucket_store(name: str = "memory", redis_url: str = "", prefix: str = "bitcoin-api:", max_buckets: int = 100_000) -> BucketStore:
+    """Build the store named by RATE_LIMIT_BACKEND: memory, redis (needs the redis package) or local-redis."""
+    if name == "memory":
+        return MemoryBucketStore(max_buckets)
+    if name == "local-redis":
+        return SharedBucketStore(LocalRedis(), prefix + "ratelimit:")
+    if name == "redis":
+        if redis is None:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requires the redis package to be installed")
+        return SharedBucketStore(redis.from_url(redis_url), prefix + "ratelimit:")
+    raise ValueError(f"Unknown rate limit backend: {name}. Expected one of: {', '.join(RATE_LIMIT_BACKENDS)}")
+
+
+def parse_quotas(value: str) -> Dict[str, Tuple[Optional[float], Optional[float]]]:
+    """
+    Parse RATE_LIMIT_API_KEYS: comma-separated ``key`` or ``key=rate/burst`` entries.
+
+    A bare key gets its own bucket with the default rate and burst.
+    """
+    quotas: Dict[str, Tuple[Optional[float], Optional[float]]] = {}
+    for entry in filter(None, (part.strip() for part in value.split(","))):
+        key, _, quota = entry.partition("=")
+        if not quota:
+            quotas[key] = (None, None)
+            continue
+        rate, _, burst = quota.partition("/")
+        try:
+            quotas[key] = (float(rate), float(burst) if burst else None)
+        except ValueError:
+            raise ValueError(f"Invalid rate limit quota for an API key: {quota!r}; expected rate/burst") from None
+    return quotas
+
+
+def history_bounds() -> HistoryBounds:
+    """The days the price store holds, or genesis to today until it is loaded (or when it is disabled)."""
+    if price_store.enabled and len(price_store):
+        days = price_store.snapshot().days
+        return int(days[0]), int(days[-1])
+    return to_day(GENESIS), to_day(date.today())
+
+
+def span_cost(
+    bounds: HistoryBounds, start: Optional[date], end: Optional[date], rows: Optional[int], full_history_cost: float
+) -> float:
+    """
+    The share of full_history_cost a read of [start, end] takes, at least 1.
+
+    The range is clamped to the history, so dates outside it cost nothing
+    extra; rows caps the daily rows returned, e.g. a page size or max_points.
+    """
+    first, last = bounds
+    lo = first if start is None else max(first, to_day(start))
+    hi = last if end is None else min(last, to_day(end))
+    returned = max(hi - lo + 1, 0)
+    if rows is not None:
+        returned = min(returned, rows)
+    return max(1.0, full_history_cost * returned / max(last - first + 1, 1))
+
+
+def _parameter(parameters: Dict[str, List[str]], name: str, parse: Any) -> Any:
+    # Malformed values are left for the endpoint to reject; they bound nothing here
+    try:
+        return parse(parameters[name][0]) if name in parameters else None
+    except ValueError:
+        return None
+
+
+def prices_cost(query_string: bytes, bounds: HistoryBounds, full_history_cost: float) -> float:
+    """The span rule for /prices: its range, moved past any cursor, and capped by limit or max_points."""
+    parameters = parse_qs(query_string.decode("latin-1"))
+    start = _parameter(parameters, "start", date.fromisoformat)
+    after = _parameter(parameters, "after", date.fromisoformat)
+    if after is not None:
+        start = max(start, after + timedelta(days=1)) if start else after + timedelta(days=1)
+    caps = [_parameter(parameters, name, int) for name in ("limit", "max_points")]
+    rows = min((cap for cap in caps if cap is not None), default=None)
+    return span_cost(bounds, start, _parameter(parameters, "end", date.fromisoformat), rows, full_history_cost)
+
+
+def batch_cost_of(body: bytes, bounds: HistoryBounds, full_history_cost: float, batch_cost: float) -> float:
+    """The span rule summed over a batch's sub-queries, and never below the flat batch_cost."""
+    try:
+        queries = BatchRequest.model_validate_json(body).queries.values()
+    except ValidationError:
+        # Rejected by the endpoint anyway
+        return batch_cost
+    total = 0.0
+    for query in queries:
+        try:
+            start, end = query_bounds(query, resolve_event(query))
+        except BatchQueryError:
+            total += 1.0
+            continue
+        total += span_cost(bounds, start, end, query.max_points, full_history_cost)
+    return max(batch_cost, total)
+
+
+def request_cost(
+    path: str,
+    query_string: bytes,
+    full_history_cost: float,
+    batch_cost: float,
+    aggregate_cost: float,
+    bounds: HistoryBounds,
+    body: bytes = b"",
+) -> Tuple[str, float]:
+    """The cost rule a request falls under and the tokens it takes."""
+    if path in ("/api/prices", "/api/prices/"):
+        cost = prices_cost(query_string, bounds, full_history_cost)
+        return ("full_history" if cost >= full_history_cost else "range"), cost
+    if path == "/api/batch":
+        return "batch", batch_cost_of(body, bounds, full_history_cost, batch_cost)
+    if path == "/api/aggregate":
+        return "aggregate", aggregate_cost
+    return "default", 1.0
+
+
+async def read_body(receive: Any) -> Tuple[bytes, List[Dict[str, Any]]]:
+    """Read a request body, returning it and the messages to replay to the app."""
+    messages = []
+    while True:
+        message = await receive()
+        messages.append(message)
+        if message["type"] != "http.request" or not message.get("more_body", False):
+            break
+    return b"".join(message.get("body", b"") for message in messages), messages
+
+
+def replay(messages: List[Dict[str, Any]], receive: Any) -> Any:
+    """A receive callable returning the already read messages first."""
+
+    async def replayed() -> Dict[str, Any]:
+        return messages.pop(0) if messages else await receive()
+
+    return replayed
+
+
+def forwarded_address(values: List[str], trusted_proxies: int) -> Optional[str]:
+    """
+    The client address recorded by the outermost of trusted_proxies proxies in X-Forwarded-For.
+
+    Each proxy appends the address it received the request from, so only the
+    last trusted_proxies entries can be trusted; anything to their left was
+    sent by the client. None without trusted proxies or with too few entries.
+    """
+    if trusted_proxies <= 0:
+        return None
+    hops = [hop.strip() for value in values for hop in value.split(",") if hop.strip()]
+    return hops[-trusted_proxies] if len(hops) >= trusted_proxies else None
+
+
+@dataclass
+class Decision:
+    allowed: bool
+    limit: float
+    remaining: float
+    retry_after: float
+    rule: str
+
+
+class RateLimiter:
+    """
+    Token-bucket admission control per API key or client address.
+
+    Every client starts with burst tokens, refilled at rate tokens per
+    second, and each request takes its route's cost. A failing shared store
+    admits the request rather than failing it.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        store: Optional[BucketStore] = None,
+        quotas: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+        full_history_cost: float = 10.0,
+        batch_cost: float = 5.0,
+        aggregate_cost: float = 3.0,
+        trusted_proxies: int = 0,
+        enabled: bool = True,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.store = store or MemoryBucketStore()
+        self.quotas = quotas or {}
+        self.full_history_cost = full_history_cost
+        self.batch_cost = batch_cost
+        self.aggregate_cost = aggregate_cost
+        self.trusted_proxies = trusted_proxies
+        self.enabled = enabled and rate > 0
+
+    @staticmethod
+    def applies(path: str) -> bool:
+        return path.startswith(LIMITED_PREFIX) and not path.startswith(EXEMPT_PREFIXES)
+
+    def client(self, scope: Dict) -> Tuple[str, float, float]:
+        """Bucket key, rate and burst for a request: a configured API key's quota, else its address."""
+        headers = Headers(scope=scope)
+        api_key = headers.get("x-api-key")
+        if api_key is not None and api_key in self.quotas:
+            rate, burst = self.quotas[api_key]
+            # Hashed so shared stores never hold the key itself
+            digest = hashlib.sha256(api_key.encode()).hexdigest()[:16]
+            return f"key:{digest}", rate or self.rate, burst or self.burst
+        address = forwarded_address(headers.getlist("x-forwarded-for"), self.trusted_proxies)
+        if address is None:
+            address = scope["client"][0] if scope.get("client") else "unknown"
+        return f"ip:{address}", self.rate, self.burst
+
+    async def check(self, scope: Dict, body: bytes = b"") -> Decision:
+        key, rate, burst = self.client(scope)
+        rule, cost = request_cost(
+            scope["path"],
+            scope.get("query_string", b""),
+            self.full_history_cost,
+            self.batch_cost,
+            self.aggregate_cost,
+            history_bounds(),
+            body,
+        )
+        # A cost above the burst could never be paid; it then takes the whole bucket
+        cost = min(cost, burst)
+        try:
+            allowed, remaining, retry_after = await self.store.take(key, cost, rate, burst)
+        except Exception as e:
+            logger.warning(f"Rate limit store failed, admitting the request: {e}")
+            return Decision(True, burst, burst, 0.0, rule)
+        if not allowed:
+            RATE_LIMIT_REJECTIONS.labels(rule=rule, client=key.split(":", 1)[0]).inc()
+        return Decision(allowed, burst, remaining, retry_after, rule)
+
+    def reset(self) -> None:
+        self.store.reset()
+
+
+class RateLimitMiddleware:
+    """Pure ASGI middleware answering 429 with Retry-After once a client's bucket is empty."""
+
+    def __init__(self, app, limiter: Optional[RateLimiter] = None):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        limiter = self.limiter or rate_limiter
+        if scope["type"] != "http" or not limiter.enabled or not limiter.applies(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        body = b""
+        if scope["path"] == "/api/batch":
+            # The batch's cost depends on its queries; the body is replayed to the endpoint
+            body, messages = await read_body(receive)
+            receive = replay(messages, receive)
+
+        decision = await limiter.check(scope, body)
+        headers = {
+            "X-RateLimit-Limit": str(int(decision.limit)),
+            "X-RateLimit-Remaining": str(int(decision.remaining)),
+        }
+        if not decision.allowed:
+            headers["Retry-After"] = str(max(math.ceil(decision.retry_after), 1))
+            response = JSONResponse({"detail": "Rate limit exceeded"}, status_code=429, headers=headers)
+            await response(scope, receive, send)
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (name.lower().encode(), value.encode()) for name, value in headers.items()
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+def _bucket_count() -> Dict[Tuple[str, ...], float]:
+    size = rate_limiter.store.size()
+    return {} if size is None else {(): float(size)}
+
+
+RATE_LIMIT_REJECTIONS = Counter(
+    "rate_limit_rejections_total", "Requests answered 429 by cost rule and client type.", ("rule", "client")
+)
+RATE_LIMIT_BUCKETS = CallbackMetric("rate_limit_buckets", "Token buckets held in this process.", collect=_bucket_count)
+
+rate_limiter = Lazy(lambda: RateLimiter(
+    rate=settings.rate_limit_rate,
+    burst=settings.rate_limit_burst,
+    store=make_bucket_store(
+        settings.rate_limit_backend, settings.cache_redis_url, settings.cache_key_prefix, settings.rate_limit_max_buckets
+    ),
+    quotas=parse_quotas(settings.rate_limit_api_keys),
+    full_history_cost=settings.rate_limit_full_history_cost,
+    batch_cost=settings.rate_limit_batch_cost,
+    aggregate_cost=settings.rate_limit_aggregate_cost,
+    trusted_proxies=settings.rate_limit_trusted_proxies,
+    enabled=settings.rate_limit_enabled,
+))
@@ -0,0 +1,155 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from typing import Literal, Optional
+from datetime import date, timedelta
+import logging
+
+from app.analytics import correlations, halving_cycles, performance, return_rows, sharpe_rows
+from app.database import Database, get_database
+from app.events import get_events
+from app.http_cache import conditional_get
+from app.routers.historical import json_response
+from app.serialization import ServerTiming, dumps
+from app.store import select_range
+
+# Set up logging
+logger = logging.getLogger(__name__)
+analytics_router = APIRouter()
+
+START_DESCRIPTION = "First date to include (inclusive)."
+END_DESCRIPTION = "Last date to include (inclusive)."
+RISK_FREE_DESCRIPTION = "Annual risk-free rate subtracted from returns, e.g. 0.04."
+
+def check_range(start: Optional[date], end: Optional[date]) -> None:
+    if start is not None and end is not None and start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+
+def day_before(start: Optional[date]) -> Optional[date]:
+    """First date to load when the first day's return needs the previous close."""
+    return start - timedelta(days=1) if start is not None else None
+
+@analytics_router.get("/analytics/performance", summary="Return, Volatility, Sharpe Ratio and Max Drawdown")
+async def get_performance(
+    request: Request,
+    response: Response,
+    start: Optional[date] = Query(None, description=START_DESCRIPTION),
+    end: Optional[date] = Query(None, description=END_DESCRIPTION),
+    risk_free_rate: float = Query(0.0, ge=-1, le=1, description=RISK_FREE_DESCRIPTION),
+    database: Database = Depends(get_database),
+):
+    logger.info("Computing range performance.")
+    check_range(start, end)
+    try:
+        timing = ServerTiming()
+        not_modified = await conditional_get(request, response, database, start, end)
+        if not_modified is not None:
+            return not_modified
+        with timing.measure("load"):
+            data, lo, hi = await select_range(database, start, end)
+        with timing.measure("compute"):
+            body = dumps(performance(data, lo, hi, risk_free_rate))
+        return json_response(body, response, timing)
+    except Exception as e:
+        logger.error(f"Failed to compute performance: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@analytics_router.get("/analytics/returns", summary="Daily and Cumulative Returns with Drawdowns")
+async def get_returns(
+    request: Request,
+    response: Response,
+    start: Optional[date] = Query(None, description=START_DESCRIPTION),
+    end: Optional[date] = Query(None, description=END_DESCRIPTION),
+    method: Literal["simple", "log"] = Query("simple", description="Simple or log returns."),
+    database: Database = Depends(get_database),
+):
+    logger.info(f"Computing {method} returns.")
+    check_range(start, end)
+    try:
+        timing = ServerTiming()
+        not_modified = await conditional_get(request, response, database, day_before(start), end)
+        if not_modified is not None:
+            return not_modified
+        # The first day's return needs the close before start
+        with timing.measure("load"):
+            data, _, _ = await select_range(database, day_before(start), end)
+            lo, hi = data.range_indices(start, end)
+        with timing.measure("compute"):
+            body = dumps({"method": method, "data": return_rows(data, lo, hi, method)})
+        return json_response(body, response, timing)
+    except Exception as e:
+        logger.error(f"Failed to compute returns: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@analytics_router.get("/analytics/sharpe", summary="Rolling Sharpe Ratio")
+async def get_rolling_sharpe(
+    request: Request,
+    response: Response,
+    start: Optional[date] = Query(None, description="First date to return (earlier history is still used for warm-up)."),
+    end: Optional[date] = Query(None, description=END_DESCRIPTION),
+    window: int = Query(90, ge=2, le=1000, description="Trailing window in days."),
+    risk_free_rate: float = Query(0.0, ge=-1, le=1, description=RISK_FREE_DESCRIPTION),
+    database: Database = Depends(get_database),
+):
+    logger.info(f"Computing the {window}-day rolling Sharpe ratio.")
+    check_range(start, end)
+    try:
+        timing = ServerTiming()
+        not_modified = await conditional_get(request, response, database, None, end)
+        if not_modified is not None:
+            return not_modified
+        with timing.measure("load"):
+            data, _, _ = await select_range(database, None, end)
+            lo, hi = data.range_indices(start, end)
+        with timing.measure("compute"):
+            rows = sharpe_rows(data, lo, hi, window, risk_free_rate)
+            body = dumps({"window": window, "risk_free_rate": risk_free_rate, "data": rows})
+        return json_response(body, response, timing)
+    except Exception as e:
+        logger.error(f"Failed to compute the rolling Sharpe ratio: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@analytics_router.get("/analytics/correlation", summary="Correlation of Returns, Volume and Range")
+async def get_correlation(
+    request: Request,
+    response: Response,
+    start: Optional[date] = Query(None, description=START_DESCRIPTION),
+    end: Optional[date] = Query(None, description=END_DESCRIPTION),
+    database: Database = Depends(get_database),
+):
+    logger.info("Computing correlations.")
+    check_range(start, end)
+    try:
+        timing = ServerTiming()
+        not_modified = await conditional_get(request, response, database, day_before(start), end)
+        if not_modified is not None:
+            return not_modified
+        with timing.measure("load"):
+            data, _, _ = await select_range(database, day_before(start), end)
+            lo, hi = data.range_indices(start, end)
+        with timing.measure("compute"):
+            body = dumps(correlations(data, lo, hi))
+        return json_response(body, response, timing)
+    except Exception as e:
+        logger.error(f"Failed to compute correlations: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@analytics_router.get("/analytics/halving-cycles", summary="Performance Across Halving Cycles")
+async def get_halving_cycles(
+    request: Request,
+    response: Response,
+    days: int = Query(1460, ge=1, le=3650, description="Days after each halving to follow."),
+    database: Database = Depends(get_database),
+):
+    logger.info(f"Comparing the {days} days after each halving.")
+    try:
+        timing = ServerTiming()
+        not_modified = await conditional_get(request, response, database)
+        if not_modified is not None:
+            return not_modified
+        with timing.measure("load"):
+            data, _, _ = await select_range(database)
+        with timing.measure("compute"):
+            body = dumps(halving_cycles(data, get_events(), days))
+        return json_response(body, response, timing)
+    except Exception as e:
+        logger.error(f"Failed to compare halving cycles: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error")
@@ -1,96 +1,469 @@
-from fastapi import APIRouter, Depends, HTTPException, Path
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import Dict, List, Any
-from datetime import datetime
+from sqlalchemy import select
+from typing import Dict, Iterator, List, Any, Literal, Optional, Tuple, Union
+from datetime import date, timedelta
+import inspect
 import logging
 
-from app.database import get_db
+from app.database import Database, get_database, get_session_factory
 from app.models.bitcoin_price import BitcoinPrice
-from app.schema import StatisticsResponse, HalvingPricesResponse
+from app.schema import BatchRequest, GroupedStatisticsResponse, StatisticsResponse, HalvingPricesResponse, MarketEventResponse, PricePage
+from app.batch import covering_bounds, encode_batch, plan_batch
+from app.candles import CandleRollup, rollups
+from app.downsample import downsample_slice
+from app.events import MAX_OFFSET_DAYS, MarketEvent, event_returns, get_events
+from app.http_cache import cache_headers, conditional_get
+from app.indicators import INDICATORS, indicator_rows
+from app.serialization import MEDIA_TYPES, FastJSONResponse, ServerTiming, dumps, encode_rows, format_available, negotiate_format
+from app.stats import price_statistics
+from app.store import PRICE_COLUMNS, price_store, refresh_store, select_range, to_day
 
 # Set up logging
 logger = logging.getLogger(__name__)
 bitcoin_price_router = APIRouter()
 
-@bitcoin_price_router.get("/prices/", response_model=List[dict], summary="Get All Historical Prices")
-def get_all_prices(db: Session = Depends(get_db)):
-    logger.info("Fetching all historical prices.")
+# Rows fetched per server-side cursor batch / emitted per streamed chunk
+STREAM_CHUNK_SIZE = 1000
+MAX_PAGE_SIZE = 10000
+STREAM_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "json": "application/json"}
+RowFormat = Optional[Literal["json", "csv", "arrow", "parquet"]]
+FORMAT_DESCRIPTION = "Output format; overrides the Accept header. arrow and parquet need pyarrow."
+MAX_POINTS_DESCRIPTION = "Downsample to at most this many rows for charting."
+DownsampleMethod = Literal["lttb", "ohlc"]
+DOWNSAMPLE_DESCRIPTION = "lttb keeps the days that best preserve the close-price line; ohlc merges days into min/max-preserving candles."
+FIELDS_DESCRIPTION = f"Comma-separated columns to return besides date: {', '.join(PRICE_COLUMNS)}."
+
+def json_response(body: bytes, response: Response, timing: ServerTiming) -> Response:
+    """Send pre-encoded JSON as-is, skipping response_model validation, with cache and timing headers."""
+    return FastJSONResponse(body, headers={**cache_headers(response), "Server-Timing": timing.header()})
+
+def resolve_format(request: Request, fmt: Optional[str]) -> str:
+    """Negotiate the row format from format= or Accept; 406 when it needs a missing optional dependency."""
+    fmt = negotiate_format(fmt, request.headers.get("accept"))
+    if not format_available(fmt):
+        raise HTTPException(status_code=406, detail=f"The {fmt} format requires pyarrow to be installed")
+    return fmt
+
+def parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """Validate a fields= projection and put it in column order; all columns when omitted."""
+    if fields is None:
+        return PRICE_COLUMNS
+    requested = {name.strip() for name in fields.split(",") if name.strip()} - {"date"}
+    unknown = sorted(requested - set(PRICE_COLUMNS))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return tuple(name for name in PRICE_COLUMNS if name in requested)
+
+def rows_response(
+    data, lo: int, hi: int, fmt: str, response: Response, timing: ServerTiming, filename: str,
+    fields: Tuple[str, ...] = PRICE_COLUMNS,
+) -> Response:
+    """Encode rows [lo, hi) of a snapshot in the negotiated format."""
+    with timing.measure("serialize"):
+        body = encode_rows(data, lo, hi, fmt, fields)
+    headers = {**cache_headers(response), "Server-Timing": timing.header()}
+    if fmt != "json":
+        headers["Content-Disposition"] = f'attachment; filename="{filename}.{fmt}"'
+    return Response(body, media_type=MEDIA_TYPES[fmt], headers=headers)
+
+def query_page(db: Session, after: Optional[date], limit: int) -> List[Dict[str, Any]]:
+    query = db.query(BitcoinPrice)
+    if after is not None:
+        query = query.filter(BitcoinPrice.date > after)
+    return [price.to_dict() for price in query.order_by(BitcoinPrice.date).limit(limit).all()]
+
+async def load_page(database: Database, after: Optional[date], limit: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Keyset pagination: return up to limit rows dated strictly after the cursor and the next cursor."""
+    # One extra row is fetched to find out whether another page exists
+    if price_store.enabled:
+        await refresh_store(database)
+        data = price_store.snapshot()
+        lo, hi = data.range_indices(after + timedelta(days=1) if after else None)
+        prices = data.to_dicts(lo, min(hi, lo + limit + 1))
+    else:
+        prices = await database.run(lambda db: query_page(db, after, limit + 1))
+
+    if len(prices) > limit:
+        prices = prices[:limit]
+        return prices, prices[-1]["date"]
+    return prices, None
+
+def iter_price_chunks(session_factory, after: Optional[date], limit: Optional[int]) -> Iterator[List[Dict[str, Any]]]:
+    """Yield rows in bounded chunks, from the price store or a server-side cursor."""
+    if price_store.enabled:
+        if price_store.is_stale:
+            with session_factory() as db:
+                price_store.ensure_loaded(db)
+        data = price_store.snapshot()
+        lo, hi = data.range_indices(after + timedelta(days=1) if after else None)
+        if limit is not None:
+            hi = min(hi, lo + limit)
+        for offset in range(lo, hi, STREAM_CHUNK_SIZE):
+            yield data.to_dicts(offset, min(offset + STREAM_CHUNK_SIZE, hi))
+        return
+
+    stmt = select(BitcoinPrice).order_by(BitcoinPrice.date)
+    if after is not None:
+        stmt = stmt.where(BitcoinPrice.date > after)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    with session_factory() as db:
+        # yield_per streams results through a server-side cursor where the driver supports it
+        result = db.execute(stmt.execution_options(yield_per=STREAM_CHUNK_SIZE)).scalars()
+        for partition in result.partitions():
+            yield [price.to_dict() for price in partition]
+
+def stream_prices(chunks: Iterator[List[Dict[str, Any]]], fmt: str) -> Iterator[bytes]:
+    """Encode row chunks as NDJSON lines or as one chunked JSON array."""
+    if fmt == "ndjson":
+        for chunk in chunks:
+            yield b"".join(dumps(row) + b"\n" for row in chunk)
+        return
+
+    yield b"["
+    first = True
+    for chunk in chunks:
+        if not chunk:
+            continue
+        # Encode the chunk as one array and strip its brackets
+        body = dumps(chunk)[1:-1]
+        yield body if first else b"," + body
+        first = False
+    yield b"]"
+
+@bitcoin_price_router.get("/prices/", response_model=Union[List[dict], PricePage], summary="Get Historical Prices")
+@bitcoin_price_router.get("/prices", response_model=Union[List[dict], PricePage], include_in_schema=False)
+async def get_all_prices(
+    request: Request,
+    response: Response,
+    start: Optional[date] = Query(None, description="First date to include (inclusive)."),
+    end: Optional[date] = Query(None, description="Last date to include (inclusive)."),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    after: Optional[date] = Query(None, description="Cursor: only return rows dated strictly after this date."),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; the response then includes next_cursor."),
+    stream: Optional[Literal["ndjson", "json"]] = Query(None, description="Stream the rows as NDJSON or a chunked JSON array."),
+    fmt: RowFormat = Query(None, alias="format", description=FORMAT_DESCRIPTION),
+    max_points: Optional[int] = Query(None, ge=3, le=MAX_PAGE_SIZE, description=MAX_POINTS_DESCRIPTION),
+    method: DownsampleMethod = Query("lttb", alias="downsample", description=DOWNSAMPLE_DESCRIPTION),
+    database: Database = Depends(get_database),
+    session_factory=Depends(get_session_factory),
+):
+    logger.info(f"Fetching historical prices from {start or 'the first day'} to {end or 'the last day'}.")
+    if max_points is not None and (stream or after is not None or limit is not None):
+        raise HTTPException(status_code=400, detail="max_points cannot be combined with pagination or streaming")
+    ranged = start is not None or end is not None or fields is not None
+    if ranged and (stream or after is not None or limit is not None):
+        raise HTTPException(status_code=400, detail="start, end and fields cannot be combined with pagination or streaming")
+    if start is not None and end is not None and start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    columns = parse_fields(fields)
+    if stream:
+        return StreamingResponse(
+            stream_prices(iter_price_chunks(session_factory, after, limit), stream),
+            media_type=STREAM_MEDIA_TYPES[stream],
+        )
+    paginated = after is not None or limit is not None
+    if paginated and fmt not in (None, "json"):
+        raise HTTPException(status_code=400, detail="Pagination is only available as JSON")
+    fmt = "json" if paginated else resolve_format(request, fmt)
     try:
-        prices = db.query(BitcoinPrice).all()
-        if not prices:
-            logger.warning("No prices found in the database.")
-            return []  # Return an empty list if no records are found
-        return [price.to_dict() for price in prices]  # Return the list of prices directly
+        timing = ServerTiming()
+        not_modified = await conditional_get(request, response, database, start, end, fmt)
+        if not_modified is not None:
+            return not_modified
+        if paginated:
+            with timing.measure("load"):
+                prices, next_cursor = await load_page(database, after, limit or MAX_PAGE_SIZE)
+            with timing.measure("serialize"):
+                body = dumps({"prices": prices, "next_cursor": next_cursor})
+            return json_response(body, response, timing)
+        with timing.measure("load"):
+            # Without the store only the projected columns are read; downsampling needs them all
+            data, lo, hi = await select_range(database, start, end, columns if max_points is None else PRICE_COLUMNS)
+        if hi == lo:
+            logger.warning("No prices found for the requested range.")
+        with timing.measure("downsample"):
+            data, lo, hi = downsample_slice(data, lo, hi, max_points, method)
+        return rows_response(data, lo, hi, fmt, response, timing, "bitcoin_prices", columns)
     except Exception as e:
         logger.error(f"Failed to fetch prices: {e}", exc_info=True)  # Log the full exception trace
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @bitcoin_price_router.get("/prices/{year}", response_model=List[dict], summary="Get Prices by Year")
-def get_prices_by_year(year: int = Path(..., title="The year to fetch Bitcoin prices for"), db: Session = Depends(get_db)):
+async def get_prices_by_year(
+    request: Request,
+    response: Response,
+    year: int = Path(..., ge=1, le=9999, title="The year to fetch Bitcoin prices for"),
+    fmt: RowFormat = Query(None, alias="format", description=FORMAT_DESCRIPTION),
+    max_points: Optional[int] = Query(None, ge=3, le=MAX_PAGE_SIZE, description=MAX_POINTS_DESCRIPTION),
+    method: DownsampleMethod = Query("lttb", alias="downsample", description=DOWNSAMPLE_DESCRIPTION),
+    database: Database = Depends(get_database),
+):
     logger.info(f"Fetching Bitcoin prices for year: {year}")
+    fmt = resolve_format(request, fmt)
     try:
-        # Query to get prices for the specific year
-        prices = db.query(BitcoinPrice).filter(BitcoinPrice.date.between(f'{year}-01-01', f'{year}-12-31')).all()
-        if not prices:
+        timing = ServerTiming()
+        # Closed years get long-lived caching; revalidation is answered from the store alone
+        not_modified = await conditional_get(request, response, database, date(year, 1, 1), date(year, 12, 31), fmt)
+        if not_modified is not None:
+            return not_modified
+        # The year's rows from the price store, or one range query when the store is disabled
+        with timing.measure("load"):
+            data, lo, hi = await select_range(database, date(year, 1, 1), date(year, 12, 31))
+        if hi == lo:
             logger.warning(f"No prices found for the year {year}.")
-            return []  # Return an empty list if no records are found
-        return [price.to_dict() for price in prices]  # Return the list of prices directly
+        with timing.measure("downsample"):
+            data, lo, hi = downsample_slice(data, lo, hi, max_points, method)
+        return rows_response(data, lo, hi, fmt, response, timing, f"bitcoin_prices_{year}")
     except Exception as e:
         logger.error(f"Failed to fetch prices for year {year}: {e}", exc_info=True)  # Log the full exception trace
         raise HTTPException(status_code=500, detail="Internal server error")
 
+async def event_window_response(
+    request: Request,
+    response: Response,
+    database: Database,
+    event: MarketEvent,
+    envelope: Dict[str, Any],
+    days_before: Optional[int],
+    days_after: Optional[int],
+    compare: bool,
+    fmt: str,
+    max_points: Optional[int] = None,
+    method: str = "lttb",
+) -> Response:
+    """Rows around an event, wrapped as envelope + prices (+ comparison) for JSON; bare rows otherwise."""
+    start, end = event.window(days_before, days_after)
+    logger.info(f"Date range for {event.name}: {start} to {end}")
+    try:
+        timing = ServerTiming()
+        not_modified = await conditional_get(request, response, database, start, end, fmt)
+        if not_modified is not None:
+            return not_modified
+        with timing.measure("load"):
+            data, lo, hi = await select_range(database, start, end)
+    except Exception as e:
+        logger.error(f"Error fetching prices for {event.name}: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+    if hi == lo:
+        logger.warning(f"No price data available for {event.name}")
+        raise HTTPException(status_code=404, detail="No price data available for the specified event.")
+    # The comparison always uses the full-resolution rows
+    comparison = event_returns(data, event, days_before, days_after) if compare and fmt == "json" else None
+    with timing.measure("downsample"):
+        data, lo, hi = downsample_slice(data, lo, hi, max_points, method)
+    if fmt != "json":
+        return rows_response(data, lo, hi, fmt, response, timing, f"bitcoin_prices_{event.name}")
+    with timing.measure("serialize"):
+        # Splice the cached row bytes into the envelope instead of re-encoding them
+        body = dumps(envelope)[:-1] + b',"prices":' + encode_rows(data, lo, hi)
+        if comparison is not None:
+            body += b',"comparison":' + dumps(comparison)
+        body += b"}"
+    return json_response(body, response, timing)
+
 @bitcoin_price_router.get("/prices/halving/{halving_number}", response_model=HalvingPricesResponse, summary="Get Prices Around Halving Events")
-def read_prices_around_halving(halving_number: int, db: Session = Depends(get_db)) -> Dict[str, Any]:
+async def read_prices_around_halving(
+    request: Request,
+    response: Response,
+    halving_number: int,
+    days_before: Optional[int] = Query(None, ge=0, le=MAX_OFFSET_DAYS, description="Days before the halving; defaults to the event's window."),
+    days_after: Optional[int] = Query(None, ge=0, le=MAX_OFFSET_DAYS, description="Days after the halving; defaults to the event's window."),
+    compare: bool = Query(False, description="Include pre/post-halving returns, volatility and drawdown."),
+    fmt: RowFormat = Query(None, alias="format", description=FORMAT_DESCRIPTION + " Non-JSON formats return just the rows."),
+    max_points: Optional[int] = Query(None, ge=3, le=MAX_PAGE_SIZE, description=MAX_POINTS_DESCRIPTION),
+    method: DownsampleMethod = Query("lttb", alias="downsample", description=DOWNSAMPLE_DESCRIPTION),
+    database: Database = Depends(get_database),
+) -> Dict[str, Any]:
     """Fetch Bitcoin prices around specific halving events."""
     logger.info(f"Fetching prices around halving number: {halving_number}.")
 
-    # Define the halving dates and their ranges
-    halving_dates: Dict[int, Dict[str, str]] = {
-        1: {"date": "2012-11-28", "start": "2012-09-01", "end": "2013-02-28"},
-        2: {"date": "2016-07-09", "start": "2016-04-01", "end": "2016-10-31"},
-        3: {"date": "2020-05-11", "start": "2020-02-01", "end": "2020-08-31"},
-        4: {"date": "2024-04-19", "start": "2024-02-01", "end": "2024-08-31"}
-    }
-
-    if halving_number not in halving_dates:
+    # Halvings come from the market event registry, loaded once
+    event = get_events().halving(halving_number)
+    if event is None:
         logger.error(f"Halving event {halving_number} not found.")
         raise HTTPException(status_code=404, detail="Halving event not found")
+    fmt = resolve_format(request, fmt)
+    return await event_window_response(
+        request, response, database, event, {"halving_number": halving_number}, days_before, days_after, compare, fmt,
+        max_points, method,
+    )
 
-    date_range = halving_dates[halving_number]
-    date_range_start = datetime.strptime(date_range["start"], "%Y-%m-%d").date()
-    date_range_end = datetime.strptime(date_range["end"], "%Y-%m-%d").date()
-
-    logger.info(f"Date range for halving number {halving_number}: {date_range_start} to {date_range_end}")
+@bitcoin_price_router.get("/events", response_model=List[MarketEventResponse], summary="List Market Events")
+async def list_market_events(kind: Optional[str] = Query(None, description="Only events of this kind, e.g. halving.")):
+    return [event.to_dict() for event in get_events().list(kind)]
 
+@bitcoin_price_router.get("/events/returns", response_model=List[dict], summary="Compare Returns Around Market Events")
+async def compare_market_events(
+    request: Request,
+    response: Response,
+    kind: Optional[str] = Query(None, description="Only events of this kind, e.g. halving."),
+    days_before: Optional[int] = Query(None, ge=0, le=MAX_OFFSET_DAYS, description="Days before each event; defaults to its window."),
+    days_after: Optional[int] = Query(None, ge=0, le=MAX_OFFSET_DAYS, description="Days after each event; defaults to its window."),
+    database: Database = Depends(get_database),
+):
+    logger.info("Comparing returns around market events.")
     try:
-        prices = db.query(BitcoinPrice).filter(
-            BitcoinPrice.date.between(date_range_start, date_range_end)
-        ).all()
-        if not prices:
-            logger.warning(f"No price data available for halving number: {halving_number}")
-            raise HTTPException(status_code=404, detail="No price data available for the specified halving event.")
-        return {"halving_number": halving_number, "prices": [price.to_dict() for price in prices]}
+        timing = ServerTiming()
+        not_modified = await conditional_get(request, response, database)
+        if not_modified is not None:
+            return not_modified
+        with timing.measure("load"):
+            data, _, _ = await select_range(database)
+            comparisons = [event_returns(data, event, days_before, days_after) for event in get_events().list(kind)]
+        with timing.measure("serialize"):
+            body = dumps(comparisons)
+        return json_response(body, response, timing)
     except Exception as e:
-        logger.error(f"Error fetching prices for halving number {halving_number}: {e}")
+        logger.error(f"Failed to compare market events: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
 
-@bitcoin_price_router.get("/historical/prices/statistics", response_model=Dict[str, float], summary="Get Bitcoin Price Statistics")
-def get_price_statistics(db: Session = Depends(get_db)):
+@bitcoin_price_router.get("/events/{name}", summary="Get Prices Around a Market Event")
+async def read_prices_around_event(
+    request: Request,
+    response: Response,
+    name: str,
+    days_before: Optional[int] = Query(None, ge=0, le=MAX_OFFSET_DAYS, description="Days before the event; defaults to its window."),
+    days_after: Optional[int] = Query(None, ge=0, le=MAX_OFFSET_DAYS, description="Days after the event; defaults to its window."),
+    compare: bool = Query(False, description="Include pre/post-event returns, volatility and drawdown."),
+    fmt: RowFormat = Query(None, alias="format", description=FORMAT_DESCRIPTION + " Non-JSON formats return just the rows."),
+    max_points: Optional[int] = Query(None, ge=3, le=MAX_PAGE_SIZE, description=MAX_POINTS_DESCRIPTION),
+    method: DownsampleMethod = Query("lttb", alias="downsample", description=DOWNSAMPLE_DESCRIPTION),
+    database: Database = Depends(get_database),
+):
+    logger.info(f"Fetching prices around market event: {name}.")
+    event = get_events().get(name)
+    if event is None:
+        raise HTTPException(status_code=404, detail="Market event not found")
+    fmt = resolve_format(request, fmt)
+    return await event_window_response(
+        request, response, database, event, {"event": event.to_dict()}, days_before, days_after, compare, fmt,
+        max_points, method,
+    )
+
+@bitcoin_price_router.get(
+    "/historical/prices/statistics",
+    response_model=Union[StatisticsResponse, GroupedStatisticsResponse],
+    summary="Get Bitcoin Price Statistics",
+)
+async def get_price_statistics(
+    request: Request,
+    response: Response,
+    start: Optional[date] = Query(None, description="First date to include (inclusive)."),
+    end: Optional[date] = Query(None, description="Last date to include (inclusive)."),
+    group_by: Optional[Literal["year", "month", "week"]] = Query(None, description="Return one set of statistics per period."),
+    database: Database = Depends(get_database),
+):
     logger.info("Fetching Bitcoin price statistics.")
     try:
-        # Aggregate statistics
-        min_price = db.query(func.min(BitcoinPrice.low)).scalar()
-        max_price = db.query(func.max(BitcoinPrice.high)).scalar()
-        avg_price = db.query(func.avg(BitcoinPrice.close)).scalar()
-        total_entries = db.query(func.count(BitcoinPrice.date)).scalar()
-
-        return {
-            "min_price": min_price,
-            "max_price": max_price,
-            "avg_price": avg_price,
-            "total_entries": total_entries
-        }
+        not_modified = await conditional_get(request, response, database, start, end)
+        if not_modified is not None:
+            return not_modified
+        data, lo, hi = await select_range(database, start, end)
+        return price_statistics(data, lo, hi, group_by)
     except Exception as e:
         logger.error(f"Failed to fetch price statistics: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
+
+@bitcoin_price_router.post("/batch", summary="Run Several Price Queries in One Request")
+async def run_batch(batch: BatchRequest, response: Response, database: Database = Depends(get_database)):
+    """
+    Answer ranges, years, halvings, events and statistics keyed by the caller's names.
+
+    Every query is served from one load covering all of them: the price store
+    snapshot, or a single database query when the store is disabled.
+    """
+    logger.info(f"Running a batch of {len(batch.queries)} queries.")
+    plans, errors = plan_batch(batch.queries)
+    try:
+        timing = ServerTiming()
+        if not plans:
+            return json_response(dumps({"results": {}, "errors": errors}), response, timing)
+        with timing.measure("load"):
+            data, _, _ = await select_range(database, *covering_bounds([bounds for _, bounds in plans.values()]))
+        with timing.measure("serialize"):
+            body = encode_batch(data, batch.queries, plans, errors)
+        return json_response(body, response, timing)
+    except Exception as e:
+        logger.error(f"Failed to run the batch: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@bitcoin_price_router.get("/candles", response_model=List[dict], summary="Get Weekly/Monthly/Quarterly/Yearly Candles")
+async def get_candles(
+    request: Request,
+    response: Response,
+    interval: Literal["week", "month", "quarter", "year"] = Query(..., description="Candle size."),
+    start: Optional[date] = Query(None, description="Only candles whose period starts on or after this date."),
+    end: Optional[date] = Query(None, description="Only candles whose period starts on or before this date."),
+    database: Database = Depends(get_database),
+):
+    logger.info(f"Fetching {interval} candles.")
+    try:
+        timing = ServerTiming()
+        # The last candle can include days after end, so the whole series is fingerprinted
+        not_modified = await conditional_get(request, response, database)
+        if not_modified is not None:
+            return not_modified
+        with timing.measure("load"):
+            if price_store.enabled:
+                await refresh_store(database)
+                rollup = rollups[interval]
+                rollup.sync(price_store.snapshot())
+            else:
+                data, _, _ = await select_range(database)
+                rollup = CandleRollup(interval)
+                rollup.sync(data)
+            candles = rollup.to_dicts(
+                to_day(start) if start is not None else None,
+                to_day(end) if end is not None else None,
+            )
+        with timing.measure("serialize"):
+            body = dumps(candles)
+        return json_response(body, response, timing)
+    except Exception as e:
+        logger.error(f"Failed to fetch {interval} candles: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@bitcoin_price_router.get("/indicators/{name}", summary="Get Technical Indicator Series")
+async def get_indicator(
+    request: Request,
+    response: Response,
+    name: Literal["sma", "ema", "rsi", "bollinger", "macd", "atr", "volatility"] = Path(..., description="Indicator to compute."),
+    start: Optional[date] = Query(None, description="First date to return (earlier history is still used for warm-up)."),
+    end: Optional[date] = Query(None, description="Last date to return."),
+    window: Optional[int] = Query(None, ge=2, le=1000, description="Lookback window for sma, ema, rsi, bollinger, atr and volatility."),
+    k: Optional[float] = Query(None, gt=0, le=10, description="Band width in standard deviations for bollinger."),
+    fast: Optional[int] = Query(None, ge=2, le=1000, description="Fast EMA span for macd."),
+    slow: Optional[int] = Query(None, ge=2, le=1000, description="Slow EMA span for macd."),
+    signal: Optional[int] = Query(None, ge=2, le=1000, description="Signal EMA span for macd."),
+    database: Database = Depends(get_database),
+):
+    logger.info(f"Fetching the {name} indicator.")
+    params = {key: value for key, value in dict(window=window, k=k, fast=fast, slow=slow, signal=signal).items() if value is not None}
+    accepted = inspect.signature(INDICATORS[name]).parameters
+    unsupported = sorted(set(params) - set(accepted))
+    if unsupported:
+        raise HTTPException(status_code=400, detail=f"{name} does not accept: {', '.join(unsupported)}")
+    # Fill in the kernel defaults so equivalent requests share one cache entry
+    params = {key: params.get(key, parameter.default) for key, parameter in accepted.items() if key != "data"}
+
+    try:
+        timing = ServerTiming()
+        # Values up to end depend on all earlier history through the warm-up
+        not_modified = await conditional_get(request, response, database, None, end)
+        if not_modified is not None:
+            return not_modified
+        # Indicators are computed over the whole series so the requested range has warmed-up values
+        with timing.measure("load"):
+            data, _, _ = await select_range(database)
+            lo, hi = data.range_indices(start, end)
+            rows = indicator_rows(data, lo, hi, name, **params)
+        with timing.measure("serialize"):
+            body = dumps({"indicator": name, "params": params, "data": rows})
+        return json_response(body, response, timing)
+    except Exception as e:
+        logger.error(f"Failed to compute the {name} indicator: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error")
@@ -0,0 +1,58 @@
+from fastapi import APIRouter, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+import asyncio
+import json
+import logging
+
+from app.live import price_poller
+
+logger = logging.getLogger(__name__)
+live_router = APIRouter()
+
+# Seconds between SSE keep-alive comments when no tick arrives
+SSE_HEARTBEAT = 15.0
+
+@live_router.get("/live/ticks", summary="Recent live price ticks")
+def get_recent_ticks(limit: int = Query(60, ge=1, le=10000)):
+    return {"running": price_poller.running, "ticks": price_poller.recent(limit)}
+
+@live_router.websocket("/live/ws")
+async def live_prices_websocket(websocket: WebSocket):
+    await websocket.accept()
+    queue = price_poller.subscribe()
+    try:
+        latest = price_poller.latest()
+        if latest is not None:
+            await websocket.send_json(latest)
+        while True:
+            await websocket.send_json(await queue.get())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        price_poller.unsubscribe(queue)
+
+async def sse_events(request: Request):
+    queue = price_poller.subscribe()
+    try:
+        latest = price_poller.latest()
+        if latest is not None:
+            yield f"data: {json.dumps(latest)}\n\n"
+        while not await request.is_disconnected():
+            try:
+                tick = await asyncio.wait_for(queue.get(), SSE_HEARTBEAT)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"data: {json.dumps(tick)}\n\n"
+    finally:
+        price_poller.unsubscribe(queue)
+
+@live_router.get("/live/sse", summary="Stream live prices as Server-Sent Events")
+async def live_prices_sse(request: Request):
+    # Identity encoding keeps the compression middleware, which buffers its output, from holding
+    # back ticks; it passes responses that already declare an encoding through unchanged
+    return StreamingResponse(
+        sse_events(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "Content-Encoding": "identity"},
+    )
@@ -1,44 +1,58 @@
-from fastapi import APIRouter, HTTPException
-import requests
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional
+import httpx
+
+from app.config import settings
+from app.exchanges import SOURCES, configured_sources, consensus, fetch_quotes, fetch_source_json, get_http_client, quote_cache
 
 real_time_router = APIRouter()
 
-@real_time_router.get("/coingecko", summary="Fetch Bitcoin price from CoinGecko")
-def get_coingecko_price():
+async def fetch_source_price(client: httpx.AsyncClient, name: str):
+    """Fetch one exchange through the shared client and return its price as the exchange reports it."""
+    source = SOURCES[name]
     try:
-        response = requests.get("https://api.coingecko.com/api/v3/simple/price?ids=bitcoin&vs_currencies=usd")
-        response.raise_for_status()
-        data = response.json()
-        return {"price": data["bitcoin"]["usd"]}
-    except requests.RequestException as e:
+        data = await fetch_source_json(client, source)
+        return {"price": source.parse_price(data)}
+    except httpx.HTTPError as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@real_time_router.get("/coingecko", summary="Fetch Bitcoin price from CoinGecko")
+async def get_coingecko_price(client: httpx.AsyncClient = Depends(get_http_client)):
+    return await fetch_source_price(client, "coingecko")
+
 @real_time_router.get("/coincap", summary="Fetch Bitcoin price from CoinCap")
-def get_coincap_price():
-    try:
-        response = requests.get("https://api.coincap.io/v2/assets/bitcoin")
-        response.raise_for_status()
-        data = response.json()
-        return {"price": data["data"]["priceUsd"]}
-    except requests.RequestException as e:
-        raise HTTPException(status_code=500, detail=str(e))
+async def get_coincap_price(client: httpx.AsyncClient = Depends(get_http_client)):
+    return await fetch_source_price(client, "coincap")
 
 @real_time_router.get("/binance", summary="Fetch Bitcoin price from Binance")
-def get_binance_price():
-    try:
-        response = requests.get("https://api.binance.com/api/v3/ticker/price?symbol=BTCUSDT")
-        response.raise_for_status()
-        data = response.json()
-        return {"price": data["price"]}
-    except requests.RequestException as e:
-        raise HTTPException(status_code=500, detail=str(e))
+async def get_binance_price(client: httpx.AsyncClient = Depends(get_http_client)):
+    return await fetch_source_price(client, "binance")
 
 @real_time_router.get("/kraken", summary="Fetch Bitcoin price from Kraken")
-def get_kraken_price():
-    try:
-        response = requests.get("https://api.kraken.com/0/public/Ticker?pair=XXBTZUSD")
-        response.raise_for_status()
-        data = response.json()
-        return {"price": data["result"]["XXBTZUSD"]["c"][0]}
-    except requests.RequestException as e:
-        raise HTTPException(status_code=500, detail=str(e))
+async def get_kraken_price(client: httpx.AsyncClient = Depends(get_http_client)):
+    return await fetch_source_price(client, "kraken")
+
+@real_time_router.get("/aggregate", summary="Consensus Bitcoin price across all exchanges")
+async def get_aggregate_price(
+    sources: Optional[List[str]] = Query(None, description="Exchanges to query; defaults to every configured source."),
+    timeout: Optional[float] = Query(None, gt=0, le=30, description="Per-source deadline in seconds; defaults to EXCHANGE_TIMEOUT."),
+    client: httpx.AsyncClient = Depends(get_http_client),
+):
+    if sources:
+        unknown = [name for name in sources if name not in SOURCES]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown sources: {', '.join(unknown)}")
+        selected = [SOURCES[name] for name in sources]
+    else:
+        selected = configured_sources()
+
+    # All sources are queried concurrently, so latency is bounded by the deadline, not their sum
+    quotes = await fetch_quotes(client, selected, timeout or settings.exchange_timeout)
+    result = consensus(quotes)
+    if not result["sources_ok"]:
+        raise HTTPException(status_code=502, detail="No exchange returned a price within the deadline")
+    return result
+
+@real_time_router.get("/cache/quotes", summary="Quote cache hit/miss/coalesced counters")
+def get_quote_cache_stats():
+    return quote_cache.stats()
@@ -1,12 +1,12 @@
-from pydantic import BaseModel
-from typing import List
-import sys
-import os
+from pydantic import BaseModel, Field, model_validator
+from datetime import date
+from typing import Any, Dict, List, Literal, Optional
 import logging
-from sqlalchemy import create_engine
 from sqlalchemy.exc import SQLAlchemyError
-from app.models import Base
-from app.database import engine  # Ensure this is correctly imported
+from app.events import MAX_OFFSET_DAYS
+
+logger = logging.getLogger(__name__)
+
 class Price(BaseModel):
     date: str
     open: float
@@ -19,29 +19,87 @@ class Price(BaseModel):
 class HalvingPricesResponse(BaseModel):
     halving_number: int
     prices: List[Price]
+    comparison: Optional[Dict[str, Any]] = None  # pre/post-event returns, with ?compare=true
+
+class MarketEventResponse(BaseModel):
+    name: str
+    kind: str
+    date: str
+    days_before: int
+    days_after: int
+    number: Optional[int] = None
+    description: str = ""
+
+class PricePage(BaseModel):
+    prices: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None  # pass as ?after= to fetch the following page
 
 class StatisticsResponse(BaseModel):
-    min_price: float
-    max_price: float
-    avg_price: float
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    avg_price: Optional[float] = None
     total_entries: int
-    
-# Set up logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+    median_price: Optional[float] = None
+    std_price: Optional[float] = None
+    percentiles: Dict[str, Optional[float]] = {}
+    total_volume: int = 0
+    daily_volatility: Optional[float] = None  # standard deviation of daily log returns
+    annualized_volatility: Optional[float] = None
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
 
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+class PeriodStatistics(StatisticsResponse):
+    period: str
+
+class GroupedStatisticsResponse(BaseModel):
+    group_by: str
+    groups: List[PeriodStatistics]
+
+MAX_BATCH_QUERIES = 50
+MAX_BATCH_POINTS = 10000
+
+# Fields each batch query type needs
+BATCH_REQUIRED_FIELDS = {"year": "year", "halving": "number", "event": "name"}
+
+class BatchQuery(BaseModel):
+    type: Literal["range", "year", "halving", "event", "statistics"]
+    start: Optional[date] = None  # range and statistics
+    end: Optional[date] = None
+    year: Optional[int] = Field(None, ge=1, le=9999)
+    number: Optional[int] = None  # halving number
+    name: Optional[str] = None  # market event name
+    days_before: Optional[int] = Field(None, ge=0, le=MAX_OFFSET_DAYS)
+    days_after: Optional[int] = Field(None, ge=0, le=MAX_OFFSET_DAYS)
+    compare: bool = False
+    group_by: Optional[Literal["year", "month", "week"]] = None
+    max_points: Optional[int] = Field(None, ge=3, le=MAX_BATCH_POINTS)
+    downsample: Literal["lttb", "ohlc"] = "lttb"
+
+    @model_validator(mode="after")
+    def check_required_field(self) -> "BatchQuery":
+        field = BATCH_REQUIRED_FIELDS.get(self.type)
+        if field is not None and getattr(self, field) is None:
+            raise ValueError(f"{self.type} queries require {field}")
+        return self
+
+class BatchRequest(BaseModel):
+    queries: Dict[str, BatchQuery] = Field(..., min_length=1, max_length=MAX_BATCH_QUERIES)
 
 def create_schema():
     """Create all tables defined in the Base metadata."""
+    from app.database import Base, get_engine
+    # BitcoinPrice is declared on app.database.Base; importing it registers the table
+    from app.models import BitcoinPrice  # noqa: F401
+
     try:
-        Base.metadata.create_all(bind=engine)
+        Base.metadata.create_all(bind=get_engine())
         logger.info("Database schema created successfully.")
     except SQLAlchemyError as e:
         logger.error(f"An error occurred while creating the database schema: {e}")
         logger.debug(e, exc_info=True)
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     create_schema()
 
 
@@ -0,0 +1,158 @@
+import io
+import json
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from fastapi.responses import JSONResponse
+
+from app.metrics import REQUEST_PHASE_SECONDS
+from app.store import PRICE_COLUMNS, PriceColumns
+
+# orjson is an optional dependency; the standard library encoder produces the same JSON, just slower
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# pyarrow is optional too; without it the arrow and parquet formats are unavailable
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# Output format -> media type, in the order preferred when Accept allows several equally
+MEDIA_TYPES = {
+    "json": "application/json",
+    "csv": "text/csv",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+ARROW_FORMATS = ("arrow", "parquet")
+
+
+def dumps(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":"), allow_nan=False).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson when available; pre-encoded bytes are sent as-is."""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
+
+
+class ServerTiming:
+    """Collects named durations for the ``Server-Timing`` response header."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.entries: List[Tuple[str, float]] = []
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.entries.append((name, elapsed * 1000))
+            REQUEST_PHASE_SECONDS.labels(phase=name).observe(elapsed)
+
+    def header(self) -> str:
+        total = (time.perf_counter() - self.started) * 1000
+        return ", ".join(f"{name};dur={duration:.3f}" for name, duration in [*self.entries, ("total", total)])
+
+
+def negotiate_format(requested: Optional[str], accept: Optional[str]) -> str:
+    """
+    Pick the output format from ``format=`` or else the Accept header.
+
+    Accept entries are ranked by q-value; anything unrecognised, including a
+    missing header or ``*/*``, falls back to JSON.
+    """
+    if requested:
+        return requested
+    candidates = []
+    for position, entry in enumerate((accept or "").split(",")):
+        media_type, _, params = entry.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        for fmt, known in MEDIA_TYPES.items():
+            if media_type.strip().lower() == known and quality > 0:
+                candidates.append((-quality, position, fmt))
+    return min(candidates)[2] if candidates else "json"
+
+
+def format_available(fmt: str) -> bool:
+    return fmt not in ARROW_FORMATS or pa is not None
+
+
+def arrow_table(data: PriceColumns, lo: int, hi: int, fields: Sequence[str] = PRICE_COLUMNS) -> "pa.Table":
+    """Arrow table over rows [lo, hi); numeric columns are wrapped without copying."""
+    arrays = {"date": pa.array(data.days[lo:hi].astype(np.int32), type=pa.date32())}
+    for name in fields:
+        # from_pandas maps the NaN used for missing adj_close values to null
+        arrays[name] = pa.array(data.columns[name][lo:hi], from_pandas=True)
+    return pa.table(arrays)
+
+
+def _encode_csv(data: PriceColumns, lo: int, hi: int, fields: Sequence[str]) -> bytes:
+    # Imported on first use so that importing the app does not load pandas
+    import pandas as pd
+
+    frame = pd.DataFrame(
+        {"date": data.date_strings[lo:hi], **{name: data.columns[name][lo:hi] for name in fields}}
+    )
+    return frame.to_csv(index=False).encode()
+
+
+def _encode_arrow(data: PriceColumns, lo: int, hi: int, fields: Sequence[str]) -> bytes:
+    table = arrow_table(data, lo, hi, fields)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _encode_parquet(data: PriceColumns, lo: int, hi: int, fields: Sequence[str]) -> bytes:
+    buffer = io.BytesIO()
+    pq.write_table(arrow_table(data, lo, hi, fields), buffer)
+    return buffer.getvalue()
+
+
+_ENCODERS = {
+    "json": lambda data, lo, hi, fields: dumps(data.to_dicts(lo, hi, fields)),
+    "csv": _encode_csv,
+    "arrow": _encode_arrow,
+    "parquet": _encode_parquet,
+}
+
+
+def encode_rows(
+    data: PriceColumns, lo: int, hi: int, fmt: str = "json", fields: Sequence[str] = PRICE_COLUMNS
+) -> bytes:
+    """
+    Rows [lo, hi) encoded as JSON (the ``BitcoinPrice.to_dict`` shape), CSV, Arrow IPC or Parquet.
+
+    Built straight from the columns (dates were formatted once at load) with
+    no model validation, and memoized per snapshot so repeated requests for
+    the same range and fields reuse the encoded bytes; the memo holds at most
+    MEMO_BYTES of them. The date is always included; fields selects the
+    other columns.
+    """
+    fields = tuple(fields)
+    return data.memoize(("encoded_rows", fmt, lo, hi, fields), lambda: _ENCODERS[fmt](data, lo, hi, fields))
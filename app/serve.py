@@ -0,0 +1,132 @@
+import argparse
+import gc
+import logging
+import os
+from typing import Any, Dict
+
+import uvicorn
+
+from app.config import settings
+
+# gunicorn is optional; without it uvicorn's own process manager runs the workers, which
+# import the app and load the data separately instead of sharing the preloaded pages
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:
+    BaseApplication = None
+
+logger = logging.getLogger(__name__)
+
+WORKER_CLASS = "uvicorn.workers.UvicornWorker"
+
+
+def worker_count(requested: int = 0) -> int:
+    """Workers to run: the requested number, or one per CPU."""
+    return requested if requested > 0 else os.cpu_count() or 1
+
+
+def preload() -> Any:
+    """
+    Import the app and load the historical data before the workers are forked.
+
+    The price store, event windows and their encoded rows are then shared by
+    every worker copy-on-write. gc.freeze() keeps the collector from touching
+    (and so copying) those objects in each worker.
+
+    Workers still check the table every PRICE_STORE_MAX_AGE seconds; one
+    that finds new days reloads into its own copy, giving up the sharing for
+    the store but never serving data frozen at fork time.
+    """
+    from app.database import created_engines, get_sessionmaker
+    from app.events import get_events, warm_event_windows
+    from app.main import app
+    from app.store import price_store
+
+    if price_store.enabled:
+        with get_sessionmaker()() as db:
+            price_store.ensure_loaded(db)
+        warm_event_windows(price_store.snapshot(), get_events())
+    # Pooled connections must not be shared with the forked workers; engines never
+    # created (the store is disabled) are left alone rather than built to be disposed
+    for _, engine in created_engines():
+        engine.dispose()
+    gc.freeze()
+    return app
+
+
+def gunicorn_options(host: str, port: int, workers: int) -> Dict[str, Any]:
+    return {
+        "bind": f"{host}:{port}",
+        "workers": workers,
+        "worker_class": WORKER_CLASS,
+        "preload_app": True,
+        "graceful_timeout": settings.web_graceful_timeout,
+        "keepalive": 5,
+        "accesslog": "-",
+    }
+
+
+if BaseApplication is not None:
+    class GunicornServer(BaseApplication):
+        """Runs an already imported (preloaded) app under gunicorn's pre-fork process manager."""
+
+        def __init__(self, application: Any, options: Dict[str, Any]):
+            self.application = application
+            self.options = options
+            super().__init__()
+
+        def load_config(self) -> None:
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self) -> Any:
+            return self.application
+
+
+def disable_per_process_jobs(workers: int) -> None:
+    """Turn off the background jobs that must run once, not once per worker process."""
+    if workers <= 1:
+        return
+    if settings.ingest_interval > 0:
+        # Every worker would run its own copy of the job; schedule python -m app.incremental instead
+        logger.warning("INGEST_INTERVAL is ignored with several workers; run python -m app.incremental on a schedule.")
+        settings.ingest_interval = 0
+        os.environ["INGEST_INTERVAL"] = "0"
+    if settings.live_poll_interval > 0:
+        # Each worker would poll the exchanges itself and push ticks only to its own subscribers
+        logger.warning("LIVE_POLL_INTERVAL is ignored with several workers; serve the live streams from a single worker.")
+        settings.live_poll_interval = 0
+        os.environ["LIVE_POLL_INTERVAL"] = "0"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve the API with several worker processes.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=settings.web_workers, help="Worker processes; 0 uses the CPU count.")
+    parser.add_argument("--init-schema", action="store_true", help="Create missing tables once before starting the workers.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    workers = worker_count(args.workers)
+    if args.init_schema:
+        from app.schema import create_schema
+        create_schema()
+    disable_per_process_jobs(workers)
+
+    if BaseApplication is not None:
+        logger.info(f"Starting gunicorn with {workers} preloaded workers.")
+        GunicornServer(preload(), gunicorn_options(args.host, args.port, workers)).run()
+    else:
+        logger.info(f"gunicorn is not installed; starting {workers} uvicorn workers without preloading.")
+        uvicorn.run(
+            "app.main:app",
+            host=args.host,
+            port=args.port,
+            workers=workers,
+            timeout_graceful_shutdown=settings.web_graceful_timeout,
+        )
+
+
+if __name__ == "__main__":
+    main()
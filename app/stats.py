@@ -0,0 +1,89 @@
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.store import PriceColumns
+
+GROUPINGS = ("year", "month", "week")
+PERCENTILES = (5, 25, 75, 95)
+# Bitcoin trades every day of the year
+TRADING_DAYS_PER_YEAR = 365
+
+
+def group_keys(days: np.ndarray, group_by: str) -> np.ndarray:
+    """Label every day with the first day of its year, month or ISO (Monday-based) week."""
+    if group_by == "year":
+        return days.astype("datetime64[D]").astype("datetime64[Y]").astype("datetime64[D]").astype(np.int64)
+    if group_by == "month":
+        return days.astype("datetime64[D]").astype("datetime64[M]").astype("datetime64[D]").astype(np.int64)
+    if group_by == "week":
+        # 1970-01-01 was a Thursday, so (days + 3) % 7 is the offset from Monday
+        return days - (days + 3) % 7
+    raise ValueError(f"Unsupported grouping: {group_by}")
+
+
+def format_period(day: int, group_by: str) -> str:
+    value = np.datetime64(int(day), "D")
+    if group_by == "year":
+        return str(value.astype("datetime64[Y]"))
+    if group_by == "month":
+        return str(value.astype("datetime64[M]"))
+    return str(value)
+
+
+def _float(value: Any) -> Optional[float]:
+    value = float(value)
+    return None if np.isnan(value) else value
+
+
+def summarize(data: PriceColumns, lo: int, hi: int) -> Dict[str, Any]:
+    """Compute every statistic for rows [lo, hi) in one vectorized pass over the columns."""
+    close = data.columns["close"][lo:hi]
+    if len(close) == 0:
+        return {
+            "min_price": None, "max_price": None, "avg_price": None, "median_price": None,
+            "std_price": None, "percentiles": {f"p{p}": None for p in PERCENTILES},
+            "total_volume": 0, "daily_volatility": None, "annualized_volatility": None,
+            "total_entries": 0, "start_date": None, "end_date": None,
+        }
+
+    percentiles = np.percentile(close, PERCENTILES)
+    log_returns = np.diff(np.log(close))
+    volatility = _float(log_returns.std(ddof=1)) if len(log_returns) > 1 else None
+    return {
+        "min_price": float(data.columns["low"][lo:hi].min()),
+        "max_price": float(data.columns["high"][lo:hi].max()),
+        "avg_price": float(close.mean()),
+        "median_price": float(np.median(close)),
+        "std_price": float(close.std(ddof=1)) if len(close) > 1 else None,
+        "percentiles": {f"p{p}": float(v) for p, v in zip(PERCENTILES, percentiles)},
+        "total_volume": int(data.columns["volume"][lo:hi].sum()),
+        "daily_volatility": volatility,
+        "annualized_volatility": float(volatility * np.sqrt(TRADING_DAYS_PER_YEAR)) if volatility is not None else None,
+        "total_entries": int(hi - lo),
+        "start_date": data.date_strings[lo],
+        "end_date": data.date_strings[hi - 1],
+    }
+
+
+def summarize_groups(data: PriceColumns, lo: int, hi: int, group_by: str) -> List[Dict[str, Any]]:
+    """Statistics per year, month or week; rows are date-sorted so every group is a contiguous slice."""
+    keys = group_keys(data.days[lo:hi], group_by)
+    if len(keys) == 0:
+        return []
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(keys)]
+    return [
+        {"period": format_period(keys[start], group_by), **summarize(data, lo + start, lo + end)}
+        for start, end in zip(starts.tolist(), ends.tolist())
+    ]
+
+
+def price_statistics(data: PriceColumns, lo: int, hi: int, group_by: Optional[str] = None) -> Dict[str, Any]:
+    """Memoized statistics for a slice of a snapshot, optionally grouped by period."""
+    def compute() -> Dict[str, Any]:
+        if group_by is None:
+            return summarize(data, lo, hi)
+        return {"group_by": group_by, "groups": summarize_groups(data, lo, hi, group_by)}
+
+    return data.memoize(("statistics", lo, hi, group_by), compute)
@@ -0,0 +1,283 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from app.config import Lazy, settings
+from app.metrics import CACHE_LOOKUPS
+from app.models.bitcoin_price import BitcoinPrice
+
+if TYPE_CHECKING:
+    from app.database import Database
+
+logger = logging.getLogger(__name__)
+
+# Numeric columns held by the store, in the same order as BitcoinPrice.to_dict
+PRICE_COLUMNS = ("open", "high", "low", "close", "adj_close", "volume")
+
+# Derived results (statistics, indicators, ...) memoized per snapshot
+MEMO_SIZE = 256
+# Cap on the encoded bodies among them, which clients can vary with arbitrary ranges
+MEMO_BYTES = 32 * 1024 * 1024
+
+
+def to_day(value: date) -> int:
+    """Convert a date to the integer day number used on the store's time axis."""
+    return int(np.datetime64(value, "D").astype(np.int64))
+
+
+def _memo_size(value: Any) -> int:
+    return len(value) if isinstance(value, bytes) else 0
+
+
+class PriceColumns:
+    """
+    One immutable load of the ``bitcoin_prices`` table.
+
+    Dates are kept as int64 days since the epoch and every other column as a
+    NumPy array, all sorted by date, so a date range is answered with a binary
+    search plus slicing instead of an ORM query.
+    """
+
+    def __init__(self, dates: List[date], values: List[List[Any]], names: Sequence[str] = PRICE_COLUMNS):
+        columns: Dict[str, np.ndarray] = {}
+        for name, column in zip(names, values):
+            if name == "volume":
+                columns[name] = np.array(column, dtype=np.int64)
+            else:
+                # Missing adj_close values become NaN and are reported back as None
+                columns[name] = np.array([np.nan if v is None else v for v in column], dtype=np.float64)
+        self._set_arrays(np.array(dates, dtype="datetime64[D]").astype(np.int64), columns)
+
+    @classmethod
+    def from_arrays(cls, days: np.ndarray, columns: Dict[str, np.ndarray]) -> "PriceColumns":
+        """Build a snapshot from existing arrays, e.g. a downsampled view of another snapshot."""
+        data = cls.__new__(cls)
+        data._set_arrays(days, columns)
+        return data
+
+    def _set_arrays(self, days: np.ndarray, columns: Dict[str, np.ndarray]) -> None:
+        self.days = days
+        # Preformat the dates once per load instead of once per row per request
+        self.date_strings: List[str] = np.datetime_as_string(self.days.astype("datetime64[D]")).tolist()
+        self.columns = columns
+        self._memo: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._memo_bytes = 0
+        self._memo_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def extends(self, other: "PriceColumns") -> bool:
+        """True when this snapshot is ``other`` with zero or more rows appended after its last date."""
+        n = len(other)
+        if n > len(self) or not np.array_equal(self.days[:n], other.days):
+            return False
+        return all(
+            np.array_equal(self.columns[name][:n], other.columns[name], equal_nan=name != "volume")
+            for name in PRICE_COLUMNS
+        )
+
+    def memoize(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Return compute() cached under key for this snapshot.
+
+        A reload creates a new snapshot, so memoized results are dropped
+        whenever new rows are ingested. The cache is an LRU bounded to
+        MEMO_SIZE entries and MEMO_BYTES of bytes values; a value larger
+        than MEMO_BYTES on its own is returned without being kept.
+        """
+        with self._memo_lock:
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                CACHE_LOOKUPS.labels(cache="snapshot_memo", result="hit").inc()
+                return self._memo[key]
+        CACHE_LOOKUPS.labels(cache="snapshot_memo", result="miss").inc()
+        value = compute()
+        size = _memo_size(value)
+        if size > MEMO_BYTES:
+            return value
+        with self._memo_lock:
+            # Another thread may have computed the same key meanwhile
+            self._memo_bytes += size - _memo_size(self._memo.get(key))
+            self._memo[key] = value
+            while len(self._memo) > MEMO_SIZE or self._memo_bytes > MEMO_BYTES:
+                _, evicted = self._memo.popitem(last=False)
+                self._memo_bytes -= _memo_size(evicted)
+        return value
+
+    def range_indices(self, start: Optional[date] = None, end: Optional[date] = None) -> Tuple[int, int]:
+        """Return the [lo, hi) slice of rows whose date lies within [start, end]."""
+        lo = 0 if start is None else int(np.searchsorted(self.days, to_day(start), side="left"))
+        hi = len(self.days) if end is None else int(np.searchsorted(self.days, to_day(end), side="right"))
+        return lo, max(lo, hi)
+
+    def to_dicts(
+        self, lo: int = 0, hi: Optional[int] = None, fields: Sequence[str] = PRICE_COLUMNS
+    ) -> List[Dict[str, Any]]:
+        """Build rows in the same shape as ``BitcoinPrice.to_dict`` for the slice [lo, hi), keeping only fields."""
+        hi = len(self.days) if hi is None else hi
+        dates = self.date_strings[lo:hi]
+        columns = [self.columns[name][lo:hi].tolist() for name in fields]
+        if "adj_close" in fields:
+            adj_index = fields.index("adj_close")
+            columns[adj_index] = [None if v != v else v for v in columns[adj_index]]
+        if tuple(fields) == PRICE_COLUMNS:
+            return [
+                {"date": d, "open": o, "high": h, "low": l, "close": c, "adj_close": a, "volume": v}
+                for d, o, h, l, c, a, v in zip(dates, *columns)
+            ]
+        keys = ("date", *fields)
+        return [dict(zip(keys, row)) for row in zip(dates, *columns)]
+
+
+def load_columns(
+    db: Session, start: Optional[date] = None, end: Optional[date] = None, fields: Sequence[str] = PRICE_COLUMNS
+) -> PriceColumns:
+    """
+    Read the rows between start and end (inclusive) into a PriceColumns with one query.
+
+    Only the date and the given fields are selected, so a projection covered by
+    the date index is answered with an index-only range scan.
+    """
+    stmt = select(BitcoinPrice.date, *(getattr(BitcoinPrice, name) for name in fields))
+    if start is not None:
+        stmt = stmt.where(BitcoinPrice.date >= start)
+    if end is not None:
+        stmt = stmt.where(BitcoinPrice.date <= end)
+    rows = db.execute(stmt.order_by(BitcoinPrice.date)).all()
+    dates = [row[0] for row in rows]
+    values = [list(column) for column in zip(*rows)][1:] if rows else [[] for _ in fields]
+    return PriceColumns(dates, values, fields)
+
+
+class PriceStore:
+    """
+    Process-wide holder of the current ``PriceColumns``.
+
+    Reloads swap in a new snapshot atomically, so readers that grabbed
+    ``snapshot()`` keep a consistent view while the table is refreshed.
+
+    Once max_age has passed, a count and max(date) query decides whether the
+    table changed; an unchanged table keeps the current snapshot, so pages a
+    preloaded server shares between workers stay shared until new days land.
+    """
+
+    def __init__(self, enabled: bool = True, max_age: Optional[float] = None):
+        self.enabled = enabled
+        self.max_age = max_age
+        self.version = 0
+        self._lock = threading.Lock()
+        self._stale = True
+        self._loaded_at = 0.0
+        self._data = PriceColumns([], [[] for _ in PRICE_COLUMNS])
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def is_stale(self) -> bool:
+        if self._stale:
+            return True
+        return self.max_age is not None and time.monotonic() - self._loaded_at > self.max_age
+
+    def invalidate(self) -> None:
+        """Mark the store as out of date so the next read reloads it."""
+        self._stale = True
+
+    def load(self, db: Session) -> None:
+        """Load the whole table with a single query, replacing the current snapshot."""
+        # Clear the flag before querying so an invalidation racing with the load is not lost
+        self._stale = False
+        try:
+            data = load_columns(db)
+        except Exception:
+            self._stale = True
+            raise
+        self._data = data
+        self.version += 1
+        self._loaded_at = time.monotonic()
+        logger.info(f"Loaded {len(data)} rows into the price store (version {self.version}).")
+
+    def unchanged(self, db: Session) -> bool:
+        """True when the table still holds as many rows as the snapshot, up to the same last date."""
+        count, last = db.execute(select(func.count(), func.max(BitcoinPrice.date))).one()
+        data = self._data
+        if count != len(data):
+            return False
+        return count == 0 or to_day(last) == int(data.days[-1])
+
+    def ensure_loaded(self, db: Session) -> None:
+        """Reload the store from the database if it is stale."""
+        if not self.is_stale:
+            return
+        with self._lock:
+            if not self.is_stale:
+                return
+            # Only expired, not invalidated: skip the reload when the table has not changed
+            if not self._stale and self.unchanged(db):
+                self._loaded_at = time.monotonic()
+                return
+            self.load(db)
+
+    def snapshot(self) -> PriceColumns:
+        """Return the current columns; the object is never mutated after a reload."""
+        return self._data
+
+    def range_indices(self, start: Optional[date] = None, end: Optional[date] = None) -> Tuple[int, int]:
+        return self._data.range_indices(start, end)
+
+    def to_dicts(self, lo: int = 0, hi: Optional[int] = None) -> List[Dict[str, Any]]:
+        return self._data.to_dicts(lo, hi)
+
+
+async def refresh_store(database: "Database") -> None:
+    """Reload the price store through the database runner when it is stale; free when it is fresh."""
+    if price_store.enabled and price_store.is_stale:
+        await database.run(price_store.ensure_loaded)
+
+
+async def select_range(
+    database: "Database",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    fields: Sequence[str] = PRICE_COLUMNS,
+) -> Tuple[PriceColumns, int, int]:
+    """
+    Return columns covering [start, end] and the [lo, hi) slice of them to use.
+
+    Served from the price store when it is enabled; otherwise only the range
+    and the given fields are read from the database.
+    """
+    if price_store.enabled:
+        await refresh_store(database)
+        data = price_store.snapshot()
+        lo, hi = data.range_indices(start, end)
+        return data, lo, hi
+    data = await database.run(lambda db: load_columns(db, start, end, fields))
+    return data, 0, len(data)
+
+
+price_store = Lazy(lambda: PriceStore(
+    enabled=settings.price_store_enabled,
+    max_age=settings.price_store_max_age or None,
+))
+
+
+# Invalidate the store whenever a committed ORM transaction touched bitcoin_prices
+@event.listens_for(Session, "after_flush")
+def _track_price_changes(session: Session, flush_context: Any) -> None:
+    if any(isinstance(obj, BitcoinPrice) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info["bitcoin_prices_changed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session: Session) -> None:
+    if session.info.pop("bitcoin_prices_changed", False):
+        price_store.invalidate()
@@ -0,0 +1,80 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.analytics import halving_cycles, max_drawdown, percentage_changes, rolling_mean_std, rolling_sharpe
+from app.events import get_events
+from app.store import PRICE_COLUMNS, PriceColumns, to_day
+from app.utils import calculate_percentage_change
+
+
+def test_percentage_changes_match_scalar_helper():
+    values = np.array([10.0, 12.0, 9.0, 0.0, 5.0])
+    changes = percentage_changes(values)
+    assert np.isnan(changes[0]) and np.isnan(changes[4])  # no change from zero
+    assert changes[1:4].tolist() == [calculate_percentage_change(a, b) for a, b in zip(values[:3], values[1:4])]
+
+
+def test_rolling_kernels_match_pandas():
+    rng = np.random.default_rng(3)
+    values = rng.normal(0.001, 0.03, 500)
+    values[[0, 200]] = np.nan
+    mean, std = rolling_mean_std(values, 30)
+    rolling = pd.Series(values).rolling(30)
+    np.testing.assert_allclose(mean, rolling.mean(), equal_nan=True)
+    np.testing.assert_allclose(std, rolling.std(), equal_nan=True)
+
+    close = np.exp(np.cumsum(rng.normal(0, 0.02, 500)))
+    log_returns = pd.Series(np.log(close)).diff()
+    expected = log_returns.rolling(60).mean() / log_returns.rolling(60).std() * np.sqrt(365)
+    np.testing.assert_allclose(rolling_sharpe(close, 60), expected, equal_nan=True)
+
+
+def test_max_drawdown_positions():
+    close = np.array([1.0, 3.0, 2.0, 1.5, 4.0, 2.0, 3.0])
+    assert max_drawdown(close) == {"depth": -0.5, "peak": 1, "trough": 3, "recovery": 4}
+    assert max_drawdown(np.array([3.0, 2.0, 1.0]))["recovery"] is None
+
+
+def test_analytics_endpoints(client):
+    summary = client.get("/api/analytics/performance", params={"start": "2020-01-01", "end": "2020-12-31"}).json()
+    assert summary["start_date"] == "2020-01-01" and summary["end_date"] == "2020-12-31"
+    # The seeded close only ever rises
+    assert summary["max_drawdown"]["depth"] == 0
+    assert summary["total_return"] > 0
+
+    returns = client.get("/api/analytics/returns", params={"start": "2020-01-01", "end": "2020-01-03"}).json()["data"]
+    assert [row["date"] for row in returns] == ["2020-01-01", "2020-01-02", "2020-01-03"]
+    # The first day's return is measured against the previous close
+    assert returns[0]["return"] == pytest.approx(returns[0]["close"] / (returns[0]["close"] - 1) - 1)
+    assert returns[0]["cumulative_return"] == 0
+
+    sharpe = client.get("/api/analytics/sharpe", params={"window": 30, "start": "2012-01-01", "end": "2012-02-15"}).json()
+    values = [row["sharpe_ratio"] for row in sharpe["data"]]
+    assert values[:30] == [None] * 30 and values[30] is not None
+
+    matrix = client.get("/api/analytics/correlation", params={"start": "2019-01-01"}).json()["matrix"]
+    assert matrix["return"]["return"] == pytest.approx(1.0)
+
+    cycles = client.get("/api/analytics/halving-cycles", params={"days": 365}).json()
+    assert [cycle["halving_number"] for cycle in cycles["cycles"]] == [1, 2, 3, 4]
+    third = cycles["cycles"][2]
+    assert third["pivot_date"] == "2020-05-11" and third["returns_at"]["365"] == pytest.approx(365 / third["pivot_close"])
+    assert cycles["correlation"]["halving-1"]["halving-1"] == pytest.approx(1.0)
+    # The last cycle only runs to the end of the data
+    spans = client.get("/api/analytics/halving-cycles").json()["cycles"]
+    assert [cycle["days_available"] for cycle in spans] == [1460, 1460, 1460, 256]
+
+    assert client.get("/api/analytics/performance", params={"start": "2021-01-02", "end": "2021-01-01"}).status_code == 400
+
+
+def test_halving_cycles_skip_halvings_after_the_data():
+    # Daily closes from 2012-01-01 up to 2024-04-18, the day before the fourth halving
+    days = np.arange(to_day(date(2012, 1, 1)), to_day(date(2024, 4, 19)))
+    close = np.linspace(100.0, 200.0, len(days))
+    data = PriceColumns.from_arrays(days, {name: close for name in PRICE_COLUMNS})
+    cycles = halving_cycles(data, get_events(), 1460)["cycles"]
+    assert [cycle["halving_number"] for cycle in cycles] == [1, 2, 3]
+    assert cycles[-1]["days_available"] == int(days[-1] - to_day(date(2020, 5, 11)))
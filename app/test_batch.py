@@ -0,0 +1,64 @@
+from datetime import date
+
+from sqlalchemy import event
+
+from app.batch import covering_bounds
+from app.store import price_store
+
+
+def test_covering_bounds():
+    assert covering_bounds([(date(2020, 1, 1), date(2020, 2, 1)), (date(2019, 5, 1), date(2019, 6, 1))]) == (
+        date(2019, 5, 1), date(2020, 2, 1)
+    )
+    assert covering_bounds([(None, date(2020, 1, 1)), (date(2019, 1, 1), date(2019, 2, 1))]) == (None, date(2020, 1, 1))
+
+
+def test_batch_matches_single_endpoints(client):
+    queries = {
+        "y2020": {"type": "year", "year": 2020},
+        "range": {"type": "range", "start": "2021-01-01", "end": "2021-01-10", "max_points": 5},
+        "h3": {"type": "halving", "number": 3, "days_before": 10, "days_after": 5, "compare": True},
+        "covid": {"type": "event", "name": "covid-crash"},
+        "stats": {"type": "statistics", "start": "2020-01-01", "end": "2020-12-31", "group_by": "month"},
+        "missing": {"type": "halving", "number": 9},
+    }
+    response = client.post("/api/batch", json={"queries": queries})
+    assert response.status_code == 200
+    body = response.json()
+    results = body["results"]
+    assert body["errors"] == {"missing": "Halving event not found"}
+
+    assert results["y2020"]["prices"] == client.get("/api/prices/2020").json()
+    assert results["y2020"]["start"] == "2020-01-01"
+    assert len(results["range"]["prices"]) == 5
+    halving = client.get("/api/prices/halving/3", params={"days_before": 10, "days_after": 5, "compare": True}).json()
+    assert results["h3"] == halving
+    assert results["covid"] == client.get("/api/events/covid-crash").json()
+    stats = client.get("/api/historical/prices/statistics", params={"start": "2020-01-01", "end": "2020-12-31", "group_by": "month"})
+    assert results["stats"] == stats.json()
+
+
+def test_batch_without_store_uses_one_query(client, session_factory, monkeypatch):
+    monkeypatch.setattr(price_store, "enabled", False)
+    statements = []
+    engine = session_factory.kw["bind"]
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    queries = {"a": {"type": "year", "year": 2015}, "b": {"type": "halving", "number": 2}}
+    try:
+        body = client.post("/api/batch", json={"queries": queries}).json()
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert len([s for s in statements if "bitcoin_prices" in s]) == 1
+    assert body["results"]["a"]["prices"][0]["date"] == "2015-01-01"
+    assert body["results"]["b"]["halving_number"] == 2
+
+
+def test_batch_validation(client):
+    assert client.post("/api/batch", json={"queries": {}}).status_code == 422
+    assert client.post("/api/batch", json={"queries": {"y": {"type": "year"}}}).status_code == 422
+    assert client.post("/api/batch", json={"queries": {"y": {"type": "year", "year": 0}}}).status_code == 422
+    too_many = {str(i): {"type": "year", "year": 2020} for i in range(51)}
+    assert client.post("/api/batch", json={"queries": too_many}).status_code == 422
+    body = client.post("/api/batch", json={"queries": {"e": {"type": "event", "name": "nope"}}}).json()
+    assert body == {"results": {}, "errors": {"e": "Market event not found"}}
@@ -0,0 +1,30 @@
+import asyncio
+
+import httpx
+
+from app.exchanges import get_http_client
+from app.main import app
+from benchmarks.load import run_load
+from benchmarks.micro import micro_benchmarks
+from benchmarks.stubs import stub_exchange_client
+
+
+def test_micro_benchmarks_cover_every_stage(session_factory):
+    results = micro_benchmarks(session_factory, repeat=2)
+    assert {"query_orm", "to_dict_orm", "serialize_dumps", "encode_rows_memoized"} <= set(results)
+    assert all(result["runs"] == 2 and result["p99_ms"] >= result["min_ms"] for result in results.values())
+
+
+def test_load_generator_reports_throughput_and_percentiles(client):
+    async def run():
+        stub = stub_exchange_client()
+        app.dependency_overrides[get_http_client] = lambda: stub
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as bench_client:
+            return await run_load(bench_client, requests=10, concurrency=4, scenarios=["/api/prices/2021", "/api/aggregate"])
+
+    results = asyncio.run(run())
+    assert set(results) == {"/api/prices/2021", "/api/aggregate"}
+    for result in results.values():
+        assert result["requests"] == 10 and result["errors"] == 0
+        assert result["rps"] > 0 and result["p99_ms"] >= result["p50_ms"]
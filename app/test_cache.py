@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from app.cache import CacheBackend, LocalRedis, MemoryBackend, QuoteCache, RedisBackend, make_backend
+
+
+def test_workers_share_entries_through_a_shared_backend():
+    shared = LocalRedis()
+    # Two caches stand in for two worker processes
+    first = QuoteCache(ttl=5, backend=RedisBackend(shared))
+    second = QuoteCache(ttl=5, backend=RedisBackend(shared))
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return {"price": 42.5}
+
+    async def run():
+        assert await first.get("binance", fetch) == {"price": 42.5}
+        assert await second.get("binance", fetch) == {"price": 42.5}
+        await second.invalidate("binance")
+        assert await first.get("binance", fetch) == {"price": 42.5}
+
+    asyncio.run(run())
+    assert len(calls) == 2
+    assert second.stats()["hits"] == 1
+    assert second.stats()["entries"] is None
+
+
+def test_local_redis_expiry_and_scan():
+    client = LocalRedis()
+
+    async def run():
+        await client.set("a:1", b"x", px=10)
+        await client.set("a:2", "y")
+        await client.set("b:1", b"z")
+        assert sorted([key async for key in client.scan_iter(match="a:*")]) == ["a:1", "a:2"]
+        await asyncio.sleep(0.02)
+        assert await client.get("a:1") is None
+        assert await client.get("a:2") == b"y"
+        assert await client.delete("a:2", "missing") == 1
+
+    asyncio.run(run())
+
+
+def test_failing_backend_falls_back_to_fetching():
+    class Down(MemoryBackend):
+        async def get(self, key):
+            raise ConnectionError("redis is down")
+
+        async def set(self, key, entry, ttl):
+            raise ConnectionError("redis is down")
+
+    cache = QuoteCache(ttl=5, backend=Down())
+
+    async def fetch():
+        return 1
+
+    assert asyncio.run(cache.get("kraken", fetch)) == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_incomplete_backend_fails_when_instantiated():
+    class GetOnly(CacheBackend):
+        async def get(self, key):
+            return None
+
+    with pytest.raises(TypeError, match="abstract"):
+        GetOnly()
+
+
+def test_backend_configuration():
+    assert make_backend("memory").size() == 0
+    assert isinstance(make_backend("local-redis").client, LocalRedis)
+    with pytest.raises(ValueError):
+        make_backend("memcached")
@@ -0,0 +1,62 @@
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+
+from app.candles import CandleRollup
+from app.conftest import END_DATE, make_price
+from app.store import PriceStore
+
+
+def resample(db_rows, rule):
+    frame = pd.DataFrame(db_rows).set_index("date")
+    frame.index = pd.to_datetime(frame.index)
+    return frame.resample(rule).agg({"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"})
+
+
+@pytest.mark.parametrize("interval,rule", [("week", "W-SUN"), ("month", "MS"), ("quarter", "QS"), ("year", "YS")])
+def test_candles_match_pandas_resample(db, interval, rule):
+    store = PriceStore()
+    store.ensure_loaded(db)
+    rollup = CandleRollup(interval)
+    rollup.sync(store.snapshot())
+    candles = rollup.to_dicts()
+
+    expected = resample(store.to_dicts(), rule)
+    assert len(candles) == len(expected)
+    for candle, (_, row) in zip(candles, expected.iterrows()):
+        assert (candle["open"], candle["high"], candle["low"], candle["close"], candle["volume"]) == (
+            row["open"], row["high"], row["low"], row["close"], row["volume"],
+        )
+
+
+def test_appended_days_update_incrementally(db):
+    store = PriceStore()
+    store.ensure_loaded(db)
+    rollup = CandleRollup("month")
+    rollup.sync(store.snapshot())
+    before = rollup.to_dicts()
+
+    offset = (END_DATE - date(2012, 1, 1)).days + 1
+    db.add_all(make_price(END_DATE + timedelta(days=i), offset + i - 1) for i in range(1, 41))
+    db.commit()
+    store.invalidate()
+    store.ensure_loaded(db)
+    rollup.sync(store.snapshot())
+
+    assert (rollup.rebuilds, rollup.incremental_updates) == (1, 1)
+    after = rollup.to_dicts()
+    assert after[:-2] == before
+    assert [c["period_start"] for c in after[-2:]] == ["2025-01-01", "2025-02-01"]
+    assert after[-1]["days"] == 9
+
+    rebuilt = CandleRollup("month")
+    rebuilt.sync(store.snapshot())
+    assert rebuilt.to_dicts() == after
+
+
+def test_candles_endpoint(client):
+    response = client.get("/api/candles", params={"interval": "year", "start": "2020-01-01", "end": "2021-06-01"})
+    assert response.status_code == 200
+    assert [candle["period_start"] for candle in response.json()] == ["2020-01-01", "2021-01-01"]
+    assert client.get("/api/candles", params={"interval": "day"}).status_code == 422
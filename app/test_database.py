@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from app.config import Settings
+from app.database import Database, engine_options
+from app.models.bitcoin_price import BitcoinPrice
+
+
+def test_async_url_uses_asyncpg_driver():
+    settings = Settings(database_url="postgresql://user:secret@db:5432/btc")
+    assert settings.sqlalchemy_async_database_url == "postgresql+asyncpg://user:secret@db:5432/btc"
+
+
+def test_url_requires_connection_settings(monkeypatch):
+    for name in ("DATABASE_URL", "DATABASE_USERNAME", "DATABASE_PASSWORD", "DATABASE_HOSTNAME", "DATABASE_PORT", "DATABASE_NAME"):
+        monkeypatch.delenv(name, raising=False)
+    with pytest.raises(ValueError, match="DATABASE_URL"):
+        Settings(_env_file=None).sqlalchemy_database_url
+
+
+def test_engine_options_only_size_real_pools():
+    postgres = engine_options("postgresql://user:secret@db/btc")
+    assert postgres["echo"] is False
+    assert {"pool_size", "max_overflow", "pool_recycle", "pool_timeout"} <= set(postgres)
+    assert "pool_size" not in engine_options("sqlite://")
+
+
+def test_database_runs_sync_sessions_off_the_event_loop(session_factory):
+    database = Database(session_factory)
+    count = asyncio.run(database.run(lambda db: db.query(BitcoinPrice).count()))
+    assert count > 0
+
+
+def test_database_runs_on_async_sessions(tmp_path):
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from app.database import Base
+
+    async def run():
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'prices.db'}")
+        async with async_engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        database = Database(sessionmaker(), async_sessionmaker(async_engine))
+        count = await database.run(lambda db: db.query(BitcoinPrice).count())
+        await async_engine.dispose()
+        return count
+
+    assert asyncio.run(run()) == 0
@@ -0,0 +1,64 @@
+import numpy as np
+
+from app.downsample import downsample, lttb_indices
+from app.store import price_store
+
+
+def reference_lttb(x, y, n):
+    """Textbook loop implementation used to check the vectorized one."""
+    bucket_size = (len(y) - 2) / (n - 2)
+    selected, a = [0], 0
+    for i in range(n - 2):
+        start, end = int(i * bucket_size) + 1, int((i + 1) * bucket_size) + 1
+        next_start, next_end = end, min(int((i + 2) * bucket_size) + 1, len(y) - 1)
+        if next_start >= next_end:
+            cx, cy = x[-1], y[-1]
+        else:
+            cx, cy = np.mean(x[next_start:next_end]), np.mean(y[next_start:next_end])
+        areas = [abs((x[a] - cx) * (y[j] - y[a]) - (x[a] - x[j]) * (cy - y[a])) for j in range(start, end)]
+        a = start + int(np.argmax(areas))
+        selected.append(a)
+    return selected + [len(y) - 1]
+
+
+def test_lttb_matches_reference_and_keeps_spikes():
+    rng = np.random.default_rng(7)
+    x = np.arange(1000)
+    y = np.cumsum(rng.normal(size=1000))
+    y[500] = 100.0
+    indices = lttb_indices(x, y, 50)
+    assert indices.tolist() == reference_lttb(x.astype(float), y, 50)
+    assert len(indices) == 50 and 500 in indices
+    assert np.all(np.diff(indices) > 0)
+    assert lttb_indices(x, y, 2000).tolist() == list(range(1000))
+
+
+def test_ohlc_buckets_preserve_extremes_and_volume(client):
+    client.get("/api/prices/")
+    data = price_store.snapshot()
+    lo, hi = 10, 1010
+    reduced = downsample(data, lo, hi, 100, "ohlc")
+    assert len(reduced) == 100
+    assert reduced.columns["high"].max() == data.columns["high"][lo:hi].max()
+    assert reduced.columns["low"].min() == data.columns["low"][lo:hi].min()
+    assert reduced.columns["volume"].sum() == data.columns["volume"][lo:hi].sum()
+    assert reduced.columns["open"][0] == data.columns["open"][lo]
+    assert reduced.columns["close"][-1] == data.columns["close"][hi - 1]
+    assert downsample(data, lo, hi, 100, "ohlc") is reduced
+    assert downsample(data, lo, lo + 50, 100) is None
+
+
+def test_max_points_on_endpoints(client):
+    full = client.get("/api/prices/").json()
+    rows = client.get("/api/prices/", params={"max_points": 200}).json()
+    assert len(rows) == 200
+    assert rows[0] == full[0] and rows[-1] == full[-1]
+
+    candles = client.get("/api/prices/2020", params={"max_points": 12, "downsample": "ohlc", "format": "csv"})
+    assert len(candles.text.splitlines()) == 13
+
+    halving = client.get("/api/prices/halving/3", params={"max_points": 20, "compare": True}).json()
+    assert len(halving["prices"]) == 20
+    assert halving["comparison"]["pivot_date"] == "2020-05-11"
+
+    assert client.get("/api/prices/", params={"max_points": 10, "limit": 5}).status_code == 400
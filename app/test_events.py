@@ -0,0 +1,54 @@
+import json
+from datetime import date
+
+import pytest
+
+from app.events import event_returns, get_events, load_events, window_indices
+from app.store import price_store
+
+
+def test_registry_loads_halvings_and_market_events():
+    events = get_events()
+    assert [event.number for event in events.list("halving")] == [1, 2, 3, 4]
+    assert events.halving(3).window() == (date(2020, 2, 1), date(2020, 8, 31))
+    assert events.get("ftx-collapse").kind == "market"
+    assert get_events() is events  # parsed once
+
+
+def test_custom_registry_file(tmp_path):
+    path = tmp_path / "events.json"
+    path.write_text(json.dumps([{"name": "genesis", "date": "2009-01-03"}]))
+    event = load_events(str(path)).get("genesis")
+    assert (event.kind, event.days_before, event.days_after) == ("market", 30, 30)
+
+
+def test_halving_offsets_and_comparison(client):
+    body = client.get("/api/prices/halving/3", params={"days_before": 10, "days_after": 5, "compare": True}).json()
+    assert [body["prices"][0]["date"], body["prices"][-1]["date"]] == ["2020-05-01", "2020-05-16"]
+    comparison = body["comparison"]
+    assert comparison["pivot_date"] == "2020-05-11"
+    # Seeded closes rise by one per day from the pivot close
+    pivot = comparison["pivot_close"]
+    assert comparison["pre"]["return"] == pytest.approx(pivot / (pivot - 10) - 1)
+    assert comparison["post"]["return"] == pytest.approx((pivot + 5) / pivot - 1)
+    assert comparison["pre"]["max_drawdown"] == 0
+
+
+def test_event_endpoints(client):
+    names = [event["name"] for event in client.get("/api/events").json()]
+    assert "spot-etf-approval" in names
+    body = client.get("/api/events/covid-crash").json()
+    assert body["event"]["date"] == "2020-03-12"
+    assert len(body["prices"]) == 61
+    assert client.get("/api/events/unknown").status_code == 404
+
+    returns = client.get("/api/events/returns", params={"kind": "halving"}).json()
+    assert [row["event"] for row in returns] == ["halving-1", "halving-2", "halving-3", "halving-4"]
+
+
+def test_windows_are_memoized_per_snapshot(client):
+    client.get("/api/prices/")
+    data = price_store.snapshot()
+    event = get_events().halving(2)
+    assert window_indices(data, event) == data.range_indices(*event.window())
+    assert event_returns(data, event) is event_returns(data, event)
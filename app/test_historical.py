@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from app.store import price_store
+
+
+@pytest.fixture(params=[True, False], ids=["store", "orm"])
+def any_backend(request):
+    """Run a test against both the price store and the plain ORM path."""
+    enabled = price_store.enabled
+    price_store.enabled = request.param
+    yield
+    price_store.enabled = enabled
+
+
+def test_keyset_pagination_walks_full_history(client, any_backend):
+    total = len(client.get("/api/prices/").json())
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 1000}
+        if cursor:
+            params["after"] = cursor
+        page = client.get("/api/prices/", params=params).json()
+        seen.extend(row["date"] for row in page["prices"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert len(seen) == total
+    assert seen == sorted(set(seen))
+
+
+def test_stream_ndjson(client, any_backend):
+    response = client.get("/api/prices/", params={"stream": "ndjson", "after": "2024-12-28"})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["date"] for row in rows] == ["2024-12-29", "2024-12-30", "2024-12-31"]
+
+
+def test_stream_json_array_matches_plain_response(client, any_backend):
+    streamed = client.get("/api/prices/", params={"stream": "json"}).json()
+    assert streamed == client.get("/api/prices/").json()
+    assert client.get("/api/prices/", params={"stream": "json", "after": "2030-01-01"}).json() == []
+
+
+def test_date_range_with_projection(client, any_backend):
+    rows = client.get("/api/prices", params={"start": "2020-02-27", "end": "2020-03-02", "fields": "close,volume"}).json()
+    assert [row["date"] for row in rows] == ["2020-02-27", "2020-02-28", "2020-02-29", "2020-03-01", "2020-03-02"]
+    assert set(rows[0]) == {"date", "close", "volume"}
+    full = client.get("/api/prices/", params={"start": "2020-02-27", "end": "2020-03-02"}).json()
+    assert [{key: row[key] for key in ("date", "close", "volume")} for row in full] == rows
+
+    csv = client.get("/api/prices/", params={"start": "2024-12-30", "fields": "high,low", "format": "csv"}).text
+    assert csv.splitlines()[0] == "date,high,low"
+    assert len(csv.splitlines()) == 3
+
+
+def test_date_range_validation(client):
+    assert client.get("/api/prices/", params={"fields": "close,bogus"}).status_code == 400
+    assert client.get("/api/prices/", params={"start": "2021-01-02", "end": "2021-01-01"}).status_code == 400
+    assert client.get("/api/prices/", params={"start": "2021-01-01", "limit": 10}).status_code == 400
+    assert client.get("/api/prices/", params={"start": "not-a-date"}).status_code == 422
@@ -0,0 +1,57 @@
+from datetime import date
+
+from app.models.bitcoin_price import BitcoinPrice
+
+
+def test_year_etag_and_conditional_get(client):
+    first = client.get("/api/prices/2016")
+    etag = first.headers["etag"]
+    # Weak: the gzip, brotli and identity bodies share it
+    assert etag.startswith('W/"')
+    assert first.headers["cache-control"] == "public, max-age=86400"
+    assert first.headers["last-modified"] == "Sat, 31 Dec 2016 00:00:00 GMT"
+
+    revalidated = client.get("/api/prices/2016", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == etag
+
+    # If-None-Match compares weakly, so the tag matches with or without its W/ prefix
+    assert client.get("/api/prices/2016", headers={"If-None-Match": etag[2:]}).status_code == 304
+
+    since = client.get("/api/prices/2016", headers={"If-Modified-Since": first.headers["last-modified"]})
+    assert since.status_code == 304
+
+
+def test_closed_year_etag_survives_appended_days(client, db):
+    etag = client.get("/api/prices/2016").headers["etag"]
+    full_etag = client.get("/api/prices/").headers["etag"]
+    db.add(BitcoinPrice(date=date(2025, 1, 1), open=1, high=1, low=1, close=1, adj_close=1, volume=1))
+    db.commit()
+    assert client.get("/api/prices/2016", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/api/prices/", headers={"If-None-Match": full_etag}).status_code == 200
+
+
+def test_past_year_missing_its_last_days_is_not_cached_as_closed(client, db):
+    db.add(BitcoinPrice(date=date(2025, 1, 1), open=1, high=1, low=1, close=1, adj_close=1, volume=1))
+    db.commit()
+    assert client.get("/api/prices/2024").headers["cache-control"] == "public, max-age=86400"
+    assert client.get("/api/prices/2025").headers["cache-control"] == "public, max-age=60"
+
+
+def test_query_string_changes_etag(client):
+    plain = client.get("/api/historical/prices/statistics").headers["etag"]
+    grouped = client.get("/api/historical/prices/statistics", params={"group_by": "year"}).headers["etag"]
+    assert plain != grouped
+    assert client.get("/api/prices/").headers["cache-control"] == "public, max-age=60"
+
+
+def test_large_bodies_are_compressed(client):
+    response = client.get("/api/prices/2020", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()) == 366
+
+
+def test_out_of_range_year_is_rejected_before_the_etag(client):
+    assert client.get("/api/prices/0").status_code == 422
+    assert client.get("/api/prices/10000").status_code == 422
@@ -0,0 +1,116 @@
+import asyncio
+from datetime import date, timedelta
+
+import httpx
+import numpy as np
+import pandas as pd
+from sqlalchemy import delete
+
+from app.candles import rollups
+from app.incremental import (
+    BinanceDailySource,
+    CsvDropSource,
+    StaticSource,
+    find_gaps,
+    last_complete_day,
+    sync_prices,
+)
+from app.models.bitcoin_price import BitcoinPrice
+from app.store import price_store
+
+
+def make_frame(start: date, days: int, close: float = 1.0) -> pd.DataFrame:
+    dates = [start + timedelta(days=i) for i in range(days)]
+    return pd.DataFrame({
+        "date": dates, "open": close, "high": close, "low": close, "close": close, "adj_close": close, "volume": 5,
+    })
+
+
+def test_find_gaps():
+    days = np.array([0, 1, 4, 5, 7])
+    assert find_gaps(days) == [(2, 3), (6, 6)]
+    assert find_gaps(days, until=9) == [(2, 3), (6, 6), (8, 9)]
+    assert find_gaps(np.array([], dtype=np.int64), until=3) == []
+
+
+def test_sync_upserts_only_missing_days(session_factory, db):
+    db.execute(delete(BitcoinPrice).where(BitcoinPrice.date.between(date(2020, 1, 10), date(2020, 1, 12))))
+    db.commit()
+    engine = session_factory.kw["bind"]
+    source = StaticSource(make_frame(date(2020, 1, 1), 1900))
+
+    report = asyncio.run(sync_prices(engine, source, until=date(2025, 1, 3)))
+    assert report.last_date == "2024-12-31"
+    assert report.requested == [("2020-01-10", "2020-01-12"), ("2025-01-01", "2025-01-03")]
+    assert report.rows_upserted == 6
+    assert report.gaps_remaining == []
+    # Stored days are not overwritten by the source
+    assert db.get(BitcoinPrice, date(2020, 1, 1)).close != 1.0
+    assert db.get(BitcoinPrice, date(2020, 1, 11)).close == 1.0
+
+    # Dependent caches were refreshed right away
+    assert not price_store.is_stale
+    assert price_store.snapshot().date_strings[-1] == "2025-01-03"
+    assert rollups["month"].to_dicts()[-1]["period_start"] == "2025-01-01"
+
+    again = asyncio.run(sync_prices(engine, source, until=date(2025, 1, 3)))
+    assert (again.requested, again.rows_upserted) == ([], 0)
+
+
+def test_sync_reports_days_the_source_lacks(session_factory):
+    engine = session_factory.kw["bind"]
+    report = asyncio.run(sync_prices(engine, StaticSource(make_frame(date(2025, 1, 1), 2)), until=date(2025, 1, 5)))
+    assert report.rows_upserted == 2
+    assert report.gaps_remaining == [("2025-01-03", "2025-01-05")]
+
+
+def test_sync_fetches_each_gap_and_skips_the_open_day(session_factory, db):
+    db.execute(delete(BitcoinPrice).where(BitcoinPrice.date == date(2015, 6, 1)))
+    db.commit()
+    engine = session_factory.kw["bind"]
+    today = last_complete_day() + timedelta(days=1)
+    requested = []
+
+    class RecordingSource(StaticSource):
+        async def fetch(self, start, end):
+            requested.append((start, end))
+            return await super().fetch(start, end)
+
+    # The source lacks 2015-06-01 but has every day since 2025, including today's open candle
+    source = RecordingSource(make_frame(date(2025, 1, 1), (today - date(2025, 1, 1)).days + 1))
+    report = asyncio.run(sync_prices(engine, source, until=today + timedelta(days=30)))
+    assert requested == [(date(2015, 6, 1), date(2015, 6, 1)), (date(2025, 1, 1), today - timedelta(days=1))]
+    assert db.get(BitcoinPrice, today) is None
+    assert report.gaps_remaining == [("2015-06-01", "2015-06-01")]
+
+
+def test_csv_drop_source(tmp_path):
+    (tmp_path / "a.csv").write_text(
+        "Date,Open,High,Low,Close,Adj Close,Volume\n"
+        "2025-01-01,1,2,0.5,1.5,1.5,1.0e+03\n"
+        "2025-01-02,1.5,2,1,1.8,1.8,2000\n"
+    )
+    (tmp_path / "b.csv").write_text("Date,Open,High,Low,Close,Adj Close,Volume\n2025-01-02,1.5,2,1,1.9,1.9,2100\n")
+    frame = asyncio.run(CsvDropSource(tmp_path).fetch(date(2025, 1, 2), date(2025, 1, 31)))
+    assert frame["date"].tolist() == [date(2025, 1, 2)]
+    assert frame["close"].tolist() == [1.9]
+
+
+def test_binance_daily_source_pages_klines():
+    start = date(2025, 1, 1)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        open_ms = int(request.url.params["startTime"])
+        # One kline per page to exercise pagination
+        if open_ms > int(request.url.params["endTime"]):
+            return httpx.Response(200, json=[])
+        return httpx.Response(200, json=[[open_ms, "1", "3", "0.5", "2", "10", open_ms + 1, "20.7"]])
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await BinanceDailySource(client).fetch(start, start + timedelta(days=2))
+
+    frame = asyncio.run(run())
+    assert frame["date"].tolist() == [start, start + timedelta(days=1), start + timedelta(days=2)]
+    assert frame["close"].tolist() == [2.0] * 3
+    assert frame["volume"].tolist() == [20] * 3
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.indicators import compute_indicator, ema, rsi, sma
+from app.store import PriceStore
+
+CLOSES = np.array([44.34, 44.09, 44.15, 43.61, 44.33, 44.83, 45.10, 45.42, 45.84, 46.08, 45.89, 46.03, 45.61, 46.28, 46.28, 46.00])
+
+
+def test_sma_matches_pandas_rolling_mean():
+    expected = pd.Series(CLOSES).rolling(5).mean().to_numpy()
+    np.testing.assert_allclose(sma(CLOSES, 5), expected, equal_nan=True)
+    assert np.isnan(sma(CLOSES[:3], 5)).all()
+
+
+def test_ema_and_rsi_bounds():
+    np.testing.assert_allclose(ema(CLOSES, 3)[:2], [44.34, 44.34 + 0.5 * (44.09 - 44.34)])
+    values = rsi(CLOSES, 5)
+    assert np.isnan(values[:5]).all()
+    assert ((values[5:] >= 0) & (values[5:] <= 100)).all()
+    assert rsi(np.arange(1.0, 20.0), 5)[-1] == 100.0
+
+
+def test_bollinger_and_macd_series(db):
+    store = PriceStore()
+    store.ensure_loaded(db)
+    data = store.snapshot()
+    bands = compute_indicator(data, "bollinger", window=20, k=2.0)
+    close = pd.Series(data.columns["close"])
+    np.testing.assert_allclose(bands["upper"], (close.rolling(20).mean() + 2 * close.rolling(20).std(ddof=0)).to_numpy(), equal_nan=True)
+    macd = compute_indicator(data, "macd", fast=12, slow=26, signal=9)
+    np.testing.assert_allclose(macd["histogram"], macd["macd"] - macd["signal"])
+    assert compute_indicator(data, "bollinger", window=20, k=2.0) is bands
+
+
+def test_indicator_endpoint(client):
+    response = client.get("/api/indicators/sma", params={"window": 10, "start": "2020-01-01", "end": "2020-01-05"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["params"] == {"window": 10}
+    assert [row["date"] for row in body["data"]] == ["2020-01-01", "2020-01-02", "2020-01-03", "2020-01-04", "2020-01-05"]
+    # The series has a close of 100 + day index, so a 10-day SMA trails the close by 4.5
+    assert all(row["sma"] == pytest.approx(row["close"] - 4.5) for row in body["data"])
+
+
+def test_indicator_endpoint_validation(client):
+    assert client.get("/api/indicators/rsi", params={"fast": 5}).status_code == 400
+    assert client.get("/api/indicators/unknown").status_code == 422
+    atr = client.get("/api/indicators/atr").json()["data"]
+    assert atr[0]["atr"] is None
+    assert atr[-1]["atr"] == pytest.approx(5.0)
@@ -0,0 +1,47 @@
+import io
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.ingest import DEFAULT_CSV_PATH, load_csv, normalize_frame, upsert_frames
+from app.models.bitcoin_price import BitcoinPrice
+
+
+def test_load_csv_is_idempotent():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+
+    first = load_csv(engine, DEFAULT_CSV_PATH, chunk_size=500)
+    second = load_csv(engine, DEFAULT_CSV_PATH, chunk_size=500)
+
+    with engine.connect() as connection:
+        count = connection.execute(select(func.count()).select_from(BitcoinPrice.__table__)).scalar()
+        row = connection.execute(
+            select(BitcoinPrice.__table__).order_by(BitcoinPrice.date).limit(1)
+        ).one()
+    assert first == second == count == 3479
+    assert str(row.date) == "2014-09-17"
+    assert row.close == 457.33
+    assert row.volume == 21056800
+
+
+def test_upsert_rejects_unsupported_dialects():
+    engine = SimpleNamespace(dialect=SimpleNamespace(name="mysql"))
+    with pytest.raises(ValueError, match="Unsupported dialect: mysql"):
+        upsert_frames(engine, [])
+
+
+def test_null_rows_are_skipped():
+    csv = io.StringIO(
+        "Date,Open,High,Low,Close,Adj Close,Volume\n"
+        "2020-04-17,7000,7100,6900,7050,7050,2.1056800e+07\n"
+        "2020-04-18,null,null,null,null,null,null\n"
+        "2020-04-19,7100,7200,7000,7150,7150,null\n"
+    )
+    frame = normalize_frame(pd.read_csv(csv))
+    assert [str(day) for day in frame["date"]] == ["2020-04-17"]
+    assert frame["volume"].dtype == "int64" and frame["volume"].iloc[0] == 21056800
@@ -0,0 +1,111 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.exchanges import quote_cache
+from app.live import PricePoller, price_poller
+from app.routers.live import sse_events
+
+
+@pytest.fixture
+def poller_ticks():
+    price_poller.ticks.clear()
+    yield price_poller
+    price_poller.ticks.clear()
+
+
+def test_slow_subscriber_drops_oldest_ticks():
+    poller = PricePoller(interval=1, history_size=3, queue_size=2)
+
+    async def run():
+        queue = poller.subscribe()
+        for i in range(5):
+            poller.publish({"median_price": i})
+        return [queue.get_nowait()["median_price"] for _ in range(queue.qsize())]
+
+    assert asyncio.run(run()) == [3, 4]
+    assert [tick["median_price"] for tick in poller.ticks] == [2, 3, 4]
+
+
+def test_poll_once_publishes_consensus(monkeypatch):
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "exchange_sources", "binance")
+    poller = PricePoller(interval=1, history_size=10, queue_size=10)
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json={"price": "123.5"}))
+    quote_cache.reset()
+
+    async def run():
+        async with httpx.AsyncClient(transport=transport) as client:
+            return await poller.poll_once(client)
+
+    tick = asyncio.run(run())
+    quote_cache.reset()
+    assert tick["median_price"] == 123.5
+    assert poller.latest() is tick
+
+
+def test_websocket_sends_latest_tick(client, poller_ticks):
+    poller_ticks.publish({"median_price": 42.0})
+    with client.websocket_connect("/api/live/ws") as websocket:
+        assert websocket.receive_json() == {"median_price": 42.0}
+    assert poller_ticks.subscriber_count == 0
+
+
+def test_recent_ticks_endpoint(client, poller_ticks):
+    for i in range(5):
+        poller_ticks.publish({"median_price": float(i)})
+    body = client.get("/api/live/ticks", params={"limit": 2}).json()
+    assert [tick["median_price"] for tick in body["ticks"]] == [3.0, 4.0]
+
+
+def test_sse_stream_formats_events(poller_ticks):
+    class DisconnectAfterFirstEvent:
+        async def is_disconnected(self):
+            return True
+
+    async def run():
+        poller_ticks.publish({"median_price": 7.0})
+        return [event async for event in sse_events(DisconnectAfterFirstEvent())]
+
+    assert asyncio.run(run()) == ['data: {"median_price": 7.0}\n\n']
+
+
+def test_sse_ticks_are_not_compressed_when_gzip_is_accepted(poller_ticks):
+    from app.main import app
+
+    messages = []
+    bodies = []
+
+    async def run():
+        disconnected = asyncio.Event()
+
+        async def receive():
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            messages.append(message)
+            if message["type"] != "http.response.body" or not message.get("body"):
+                return
+            bodies.append(message["body"])
+            # Publish a second tick once the first has reached the client, then hang up
+            if len(bodies) == 1:
+                poller_ticks.publish({"median_price": 2.0})
+            else:
+                disconnected.set()
+
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+            "path": "/api/live/sse", "raw_path": b"/api/live/sse", "root_path": "", "query_string": b"",
+            "headers": [(b"host", b"testserver"), (b"accept-encoding", b"gzip, deflate, br")],
+            "client": ("127.0.0.1", 50000), "server": ("testserver", 80),
+        }
+        poller_ticks.publish({"median_price": 1.0})
+        await asyncio.wait_for(app(scope, receive, send), 5)
+
+    asyncio.run(run())
+    start = next(m for m in messages if m["type"] == "http.response.start")
+    assert dict(start["headers"]).get(b"content-encoding") == b"identity"
+    assert bodies == [b'data: {"median_price": 1.0}\n\n', b'data: {"median_price": 2.0}\n\n']
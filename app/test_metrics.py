@@ -0,0 +1,68 @@
+import asyncio
+
+import httpx
+
+from app import exchanges
+from prometheus_client import CollectorRegistry, generate_latest
+
+from app.metrics import DB_QUERIES_PER_REQUEST, UPSTREAM_ERRORS, UPSTREAM_SECONDS, CallbackMetric, render, sample_value
+from app.store import price_store
+
+
+def test_callback_metrics_are_read_at_scrape_time():
+    registry = CollectorRegistry()
+    values = {("a",): 1.0}
+    CallbackMetric("jobs_queued", "Queued jobs.", ("kind",), collect=lambda: values, registry=registry)
+    CallbackMetric("broken", "Fails to collect.", collect=lambda: 1 / 0, registry=registry)
+    values[("b",)] = 2.0
+    lines = generate_latest(registry).decode().splitlines()
+    assert "# TYPE jobs_queued gauge" in lines
+    assert 'jobs_queued{kind="b"} 2.0' in lines
+    # The failing callback is skipped rather than failing the scrape
+    assert not any(line.startswith("broken") for line in lines)
+
+
+def test_quote_cache_lookups_are_counters():
+    body = render()
+    assert "# TYPE quote_cache_lookups_total counter" in body
+    assert 'quote_cache_lookups_total{result="hits"}' in body
+
+
+def test_requests_are_labelled_by_route_template(client):
+    client.get("/api/prices/2016")
+    client.get("/api/prices/2017")
+    body = client.get("/metrics").text
+    assert 'http_requests_total{method="GET",route="/api/prices/{year}",status="200"}' in body
+    assert "/api/prices/2016" not in body
+    assert 'cache_hit_ratio{cache="snapshot_memo"}' in body
+
+
+def test_db_queries_are_attributed_to_the_request(client):
+    before = sample_value(DB_QUERIES_PER_REQUEST, "db_queries_per_request_count", route="/api/prices/{year}")
+    enabled = price_store.enabled
+    price_store.enabled = False
+    try:
+        client.get("/api/prices/2016")
+    finally:
+        price_store.enabled = enabled
+    assert sample_value(DB_QUERIES_PER_REQUEST, "db_queries_per_request_count", route="/api/prices/{year}") == before + 1
+    assert 'db_queries_per_request_bucket{le="0.0",route="/api/prices/{year}"}' in client.get("/metrics").text
+
+
+def test_upstream_latency_and_errors(monkeypatch):
+    monkeypatch.setattr(exchanges.settings, "exchange_retries", 0)
+    source = exchanges.SOURCES["binance"]
+    errors = sample_value(UPSTREAM_ERRORS, "upstream_errors_total", source="binance", error="HTTPStatusError")
+    requests = sample_value(UPSTREAM_SECONDS, "upstream_request_duration_seconds_count", source="binance")
+
+    async def run():
+        transport = httpx.MockTransport(lambda request: httpx.Response(503))
+        async with httpx.AsyncClient(transport=transport) as client:
+            try:
+                await exchanges.request_source_json(client, source)
+            except httpx.HTTPStatusError:
+                pass
+
+    asyncio.run(run())
+    assert sample_value(UPSTREAM_ERRORS, "upstream_errors_total", source="binance", error="HTTPStatusError") == errors + 1
+    assert sample_value(UPSTREAM_SECONDS, "upstream_request_duration_seconds_count", source="binance") == requests + 1
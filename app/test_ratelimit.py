@@ -0,0 +1,183 @@
+import asyncio
+import json
+from datetime import date
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.cache import LocalRedis
+from app.metrics import render
+from app.ratelimit import (
+    MemoryBucketStore,
+    RateLimiter,
+    RateLimitMiddleware,
+    SharedBucketStore,
+    forwarded_address,
+    make_bucket_store,
+    parse_quotas,
+    request_cost,
+    spend,
+)
+from app.store import to_day
+
+
+def make_client(limiter: RateLimiter) -> TestClient:
+    app = FastAPI()
+    app.add_middleware(RateLimitMiddleware, limiter=limiter)
+
+    @app.get("/api/prices/")
+    def prices():
+        return []
+
+    @app.get("/api/coingecko")
+    def coingecko():
+        return {"price": 1.0}
+
+    @app.get("/api/live/sse")
+    def live():
+        return {}
+
+    return TestClient(app)
+
+
+def test_spend_refills_up_to_the_burst():
+    assert spend(0.0, 10.0, 1.0, rate=2.0, burst=5.0) == (True, 4.0, 0.0)
+    allowed, tokens, retry_after = spend(0.5, 0.0, 2.0, rate=2.0, burst=5.0)
+    assert not allowed and tokens == 0.5 and retry_after == pytest.approx(0.75)
+
+
+def test_rejects_with_retry_after_once_the_bucket_is_empty():
+    client = make_client(RateLimiter(rate=0.5, burst=3))
+    for remaining in ("2", "1", "0"):
+        response = client.get("/api/coingecko")
+        assert response.status_code == 200
+        assert response.headers["x-ratelimit-remaining"] == remaining
+    rejected = client.get("/api/coingecko")
+    assert rejected.status_code == 429
+    assert rejected.json() == {"detail": "Rate limit exceeded"}
+    assert rejected.headers["retry-after"] == "2"
+    assert 'rate_limit_rejections_total{client="ip",rule="default"}' in render()
+    # Live streams are not limited
+    assert client.get("/api/live/sse").status_code == 200
+
+
+def test_cost_follows_the_span_a_request_returns():
+    # Ten years of daily rows, 2010-01-01 .. 2019-12-31
+    bounds = (to_day(date(2010, 1, 1)), to_day(date(2019, 12, 31)))
+
+    def cost(path, query=b"", body=b""):
+        return request_cost(path, query, 10, 5, 3, bounds, body)
+
+    assert cost("/api/prices/") == ("full_history", 10)
+    # Bounds outside the history, a page larger than it or a cursor before it bound nothing
+    assert cost("/api/prices", b"start=1970-01-01") == ("full_history", 10)
+    assert cost("/api/prices/", b"limit=10000") == ("full_history", 10)
+    assert cost("/api/prices/", b"stream=ndjson&after=1900-01-01") == ("full_history", 10)
+    rule, half = cost("/api/prices", b"start=2015-01-01")
+    assert rule == "range" and half == pytest.approx(10 * 1826 / 3652)
+    assert cost("/api/prices/", b"limit=100") == ("range", 1.0)
+    assert cost("/api/prices/", b"max_points=500") == ("range", pytest.approx(10 * 500 / 3652))
+    assert cost("/api/prices/", b"start=not-a-date") == ("full_history", 10)
+
+    def batch(*queries):
+        return cost("/api/batch", body=json.dumps({"queries": dict(enumerate(queries))}).encode())
+
+    assert batch({"type": "year", "year": 2015}) == ("batch", 5)
+    unbounded = {"type": "range", "start": "1900-01-01"}
+    assert batch(unbounded, unbounded, unbounded) == ("batch", 30)
+    assert batch({"type": "statistics"}, {"type": "range", "max_points": 100}) == ("batch", pytest.approx(10 + 1))
+    assert cost("/api/batch", body=b"not json") == ("batch", 5)
+
+
+def test_full_history_downloads_cost_more_than_ranges():
+    client = make_client(RateLimiter(rate=0.01, burst=20, full_history_cost=10))
+    assert client.get("/api/prices/").status_code == 200
+    assert client.get("/api/prices/").status_code == 200
+    assert client.get("/api/prices/").status_code == 429
+    # The cheap bounded request is still not affordable from an empty bucket
+    assert client.get("/api/prices/", params={"limit": 10}).status_code == 429
+
+
+def test_batch_body_is_charged_and_still_reaches_the_endpoint(client, monkeypatch):
+    # Load the store, so costs are shares of the stored 2012 .. 2024 history
+    assert client.get("/api/prices/2016").status_code == 200
+    monkeypatch.setattr("app.ratelimit.rate_limiter", RateLimiter(rate=0.01, burst=150, full_history_cost=10))
+    queries = {str(n): {"type": "range", "start": "1900-01-01"} for n in range(10)}
+    response = client.post("/api/batch", json={"queries": queries})
+    assert response.status_code == 200
+    assert len(response.json()["results"]) == 10
+    assert response.headers["x-ratelimit-remaining"] == "50"
+    assert client.post("/api/batch", json={"queries": queries}).status_code == 429
+
+
+def test_configured_api_keys_get_their_own_quota():
+    quotas = parse_quotas("partner=5/50, internal")
+    assert quotas == {"partner": (5.0, 50.0), "internal": (None, None)}
+    with pytest.raises(ValueError, match="rate/burst"):
+        parse_quotas("broken=fast")
+    client = make_client(RateLimiter(rate=0.01, burst=1, quotas=quotas))
+    assert client.get("/api/coingecko").status_code == 200
+    assert client.get("/api/coingecko").status_code == 429
+    keyed = client.get("/api/coingecko", headers={"X-API-Key": "partner"})
+    assert keyed.status_code == 200
+    assert keyed.headers["x-ratelimit-limit"] == "50"
+    # Unknown keys share the caller's address bucket rather than minting fresh ones
+    assert client.get("/api/coingecko", headers={"X-API-Key": "made-up"}).status_code == 429
+
+
+def test_memory_store_evicts_the_least_recently_seen_client():
+    store = MemoryBucketStore(max_buckets=2)
+
+    async def run():
+        await store.take("a", 1, 1, 1)
+        await store.take("b", 1, 1, 1)
+        await store.take("a", 1, 1, 1)
+        await store.take("c", 1, 1, 1)
+
+    asyncio.run(run())
+    assert store.size() == 2 and store.evictions == 1
+    assert list(store._buckets) == ["a", "c"]
+
+
+def test_workers_share_buckets_through_a_shared_store():
+    shared = LocalRedis()
+    first, second = SharedBucketStore(shared), SharedBucketStore(shared)
+
+    async def run():
+        return [
+            (await first.take("ip:1", 1, 0.01, 2))[0],
+            (await second.take("ip:1", 1, 0.01, 2))[0],
+            (await first.take("ip:1", 1, 0.01, 2))[0],
+        ]
+
+    assert asyncio.run(run()) == [True, True, False]
+    with pytest.raises(ValueError, match="Unknown rate limit backend"):
+        make_bucket_store("disk")
+
+
+def test_failing_store_admits_requests():
+    class BrokenStore(MemoryBucketStore):
+        async def take(self, key, cost, rate, burst):
+            raise ConnectionError("redis is down")
+
+    client = make_client(RateLimiter(rate=0.01, burst=1, store=BrokenStore()))
+    assert all(client.get("/api/coingecko").status_code == 200 for _ in range(3))
+
+
+def test_spoofed_forwarded_for_does_not_bypass_the_limit():
+    assert forwarded_address(["1.1.1.1, 10.0.0.7"], 1) == "10.0.0.7"
+    assert forwarded_address(["1.1.1.1", "10.0.0.7, 172.16.0.2"], 2) == "10.0.0.7"
+    assert forwarded_address(["10.0.0.7"], 2) is None
+    assert forwarded_address(["10.0.0.7"], 0) is None
+
+    # Without trusted proxies the header is ignored altogether
+    direct = make_client(RateLimiter(rate=0.01, burst=1))
+    assert direct.get("/api/coingecko", headers={"X-Forwarded-For": "1.1.1.1"}).status_code == 200
+    assert direct.get("/api/coingecko", headers={"X-Forwarded-For": "2.2.2.2"}).status_code == 429
+
+    # Behind one proxy, rotating the client-supplied entries still lands in the proxy-recorded bucket
+    proxied = make_client(RateLimiter(rate=0.01, burst=1, trusted_proxies=1))
+    assert proxied.get("/api/coingecko", headers={"X-Forwarded-For": "1.1.1.1, 10.0.0.7"}).status_code == 200
+    assert proxied.get("/api/coingecko", headers={"X-Forwarded-For": "2.2.2.2, 10.0.0.7"}).status_code == 429
+    assert proxied.get("/api/coingecko", headers={"X-Forwarded-For": "10.0.0.8"}).status_code == 200
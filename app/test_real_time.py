@@ -0,0 +1,133 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from app.cache import QuoteCache
+from app.exchanges import get_http_client, quote_cache
+from app.main import app
+
+# Canned ticker payloads keyed by exchange host
+PAYLOADS = {
+    "api.coingecko.com": {"bitcoin": {"usd": 100.0, "usd_24h_vol": 1000.0}},
+    "api.coincap.io": {"data": {"priceUsd": "102.0", "volumeUsd24Hr": "3060.0"}},
+    "api.binance.com": {"price": "101.00000000"},
+    "api.kraken.com": {"result": {"XXBTZUSD": {"c": ["99.0", "1"], "v": ["5", "20"]}}},
+    "api.coinbase.com": {"data": {"amount": "100.5"}},
+    "api.kucoin.com": {"data": {"price": "100.0"}},
+}
+SLOW_HOST = "api.bybit.com"
+
+
+async def handler(request: httpx.Request) -> httpx.Response:
+    if request.url.host == SLOW_HOST:
+        await asyncio.sleep(5)
+    return httpx.Response(200, content=json.dumps(PAYLOADS[request.url.host]))
+
+
+@pytest.fixture
+def exchange_client(client):
+    async def override_http_client():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as mock_client:
+            yield mock_client
+
+    app.dependency_overrides[get_http_client] = override_http_client
+    quote_cache.reset()
+    yield client
+    quote_cache.reset()
+
+
+def test_aggregate_fans_out_concurrently(exchange_client):
+    started = time.perf_counter()
+    response = exchange_client.get("/api/aggregate", params={"timeout": 0.5})
+    elapsed = time.perf_counter() - started
+
+    assert response.status_code == 200
+    body = response.json()
+    assert elapsed < 2  # bounded by the 0.5s deadline, not by the slow source
+    assert body["sources_ok"] == 6
+    assert body["sources_total"] == 7
+    assert body["median_price"] == 100.25
+    assert body["spread"] == 3.0
+    # VWAP weights: coingecko 10 BTC @ 100, coincap 30 BTC @ 102, kraken 20 BTC @ 99
+    assert body["vwap"] == pytest.approx((100 * 10 + 102 * 30 + 99 * 20) / 60)
+    slow = next(quote for quote in body["quotes"] if quote["source"] == "bybit")
+    assert slow["error"] == "timeout"
+
+
+def test_aggregate_rejects_unknown_source(exchange_client):
+    response = exchange_client.get("/api/aggregate", params={"sources": ["nope"]})
+    assert response.status_code == 400
+
+
+def test_aggregate_subset_of_sources(exchange_client):
+    response = exchange_client.get("/api/aggregate", params={"sources": ["binance", "kraken"]})
+    body = response.json()
+    assert [quote["source"] for quote in body["quotes"]] == ["binance", "kraken"]
+    assert body["median_price"] == 100.0
+
+
+def test_single_exchange_endpoints_keep_response_shape(exchange_client):
+    assert exchange_client.get("/api/binance").json() == {"price": "101.00000000"}
+    assert exchange_client.get("/api/coingecko").json() == {"price": 100.0}
+    assert exchange_client.get("/api/kraken").json() == {"price": "99.0"}
+
+
+def test_request_json_retries_with_backoff(monkeypatch):
+    from app.config import settings
+    from app.exchanges import request_json
+
+    monkeypatch.setattr(settings, "exchange_backoff", 0.001)
+    calls = []
+
+    def flaky(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url)
+        if len(calls) < 3:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"ok": True})
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(flaky)) as client:
+            return await request_json(client, "https://example.test/ticker")
+
+    assert asyncio.run(run()) == {"ok": True}
+    assert len(calls) == 3
+
+
+def test_quote_cache_coalesces_and_serves_stale():
+    cache = QuoteCache(ttl=0.05, stale_ttl=10)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return len(calls)
+
+    async def run():
+        # Ten concurrent misses share one upstream fetch
+        results = await asyncio.gather(*(cache.get("binance", fetch) for _ in range(10)))
+        assert results == [1] * 10
+        assert await cache.get("binance", fetch) == 1
+        # Once the TTL expires the stale value is served while one refresh runs in the background
+        await asyncio.sleep(0.06)
+        assert await cache.get("binance", fetch) == 1
+        await asyncio.sleep(0.02)
+        assert await cache.get("binance", fetch) == 2
+
+    asyncio.run(run())
+    stats = cache.stats()
+    assert len(calls) == 2
+    assert stats["misses"] == 1
+    assert stats["coalesced"] == 9
+    assert stats["hits"] == 2
+    assert stats["stale_hits"] == 1
+
+
+def test_repeated_requests_hit_the_cache(exchange_client):
+    for _ in range(3):
+        assert exchange_client.get("/api/binance").status_code == 200
+    stats = exchange_client.get("/api/cache/quotes").json()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 2
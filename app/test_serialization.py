@@ -0,0 +1,97 @@
+import io
+import json
+from datetime import date
+
+import pytest
+
+from app import serialization, store
+from app.serialization import dumps, encode_rows, negotiate_format
+from app.store import PRICE_COLUMNS, PriceColumns
+
+
+def make_columns() -> PriceColumns:
+    return PriceColumns(
+        [date(2020, 1, 1), date(2020, 1, 2)],
+        [[1.5, 1.75], [2.0, 2.5], [1.0, 1.5], [1.75, 2.25], [None, 2.25], [10, 20]],
+    )
+
+
+def test_encode_rows_matches_row_dicts_and_is_memoized():
+    data = make_columns()
+    body = encode_rows(data, 0, 2)
+    assert json.loads(body) == data.to_dicts(0, 2)
+    assert json.loads(body)[0]["adj_close"] is None
+    assert encode_rows(data, 0, 2) is body
+
+
+def test_encoded_rows_are_bounded_by_bytes(monkeypatch):
+    body = encode_rows(make_columns(), 0, 2)
+    # Room for one body of this size: encoding another range evicts it
+    monkeypatch.setattr(store, "MEMO_BYTES", len(body) + 1)
+    data = make_columns()
+    encode_rows(data, 0, 2)
+    kept = encode_rows(data, 1, 2)
+    assert list(data._memo) == [("encoded_rows", "json", 1, 2, PRICE_COLUMNS)]
+    assert data._memo_bytes == len(kept)
+    # A body larger than the whole budget is returned without being kept
+    monkeypatch.setattr(store, "MEMO_BYTES", len(body) - 1)
+    data = make_columns()
+    assert encode_rows(data, 0, 2) == body and not data._memo and data._memo_bytes == 0
+
+
+def test_stdlib_fallback_produces_same_json(monkeypatch):
+    rows = make_columns().to_dicts()
+    fast = dumps(rows)
+    monkeypatch.setattr(serialization, "orjson", None)
+    assert json.loads(dumps(rows)) == json.loads(fast)
+
+
+def test_row_endpoints_report_server_timing(client):
+    response = client.get("/api/prices/2020")
+    assert "serialize;dur=" in response.headers["server-timing"]
+    assert len(response.json()) == 366
+
+    halving = client.get("/api/prices/halving/3").json()
+    assert halving["halving_number"] == 3
+    assert halving["prices"][0]["date"] == "2020-02-01"
+
+
+def test_negotiate_format():
+    assert negotiate_format("csv", "application/json") == "csv"
+    assert negotiate_format(None, None) == "json"
+    assert negotiate_format(None, "*/*") == "json"
+    assert negotiate_format(None, "text/csv;q=0.5, application/vnd.apache.parquet") == "parquet"
+    assert negotiate_format(None, "text/csv;q=0") == "json"
+
+
+def test_csv_via_accept_header(client):
+    response = client.get("/api/prices/2020", headers={"Accept": "text/csv"})
+    assert response.headers["content-type"].startswith("text/csv")
+    assert "Accept" in response.headers["vary"].split(", ")
+    lines = response.text.splitlines()
+    assert lines[0] == "date,open,high,low,close,adj_close,volume"
+    assert len(lines) == 367
+    assert response.headers["etag"] != client.get("/api/prices/2020").headers["etag"]
+
+
+def test_arrow_and_parquet_round_trip(client):
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    expected = client.get("/api/prices/2016").json()
+    arrow = client.get("/api/prices/2016", params={"format": "arrow"})
+    table = pa.ipc.open_stream(arrow.content).read_all()
+    assert table.num_rows == len(expected)
+    assert table.column("close").to_pylist() == [row["close"] for row in expected]
+    assert str(table.column("date")[0]) == expected[0]["date"]
+
+    parquet = client.get("/api/prices/halving/2", params={"format": "parquet"})
+    assert pq.read_table(io.BytesIO(parquet.content)).num_rows == len(
+        client.get("/api/prices/halving/2").json()["prices"]
+    )
+
+
+def test_arrow_without_pyarrow_is_not_acceptable(client, monkeypatch):
+    monkeypatch.setattr(serialization, "pa", None)
+    assert client.get("/api/prices/2016", params={"format": "arrow"}).status_code == 406
+    assert client.get("/api/prices/", params={"format": "csv", "limit": 10}).status_code == 400
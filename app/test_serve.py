@@ -0,0 +1,44 @@
+import gc
+import os
+
+from app.config import settings
+from app.database import get_engine
+from app.serve import disable_per_process_jobs, gunicorn_options, preload, worker_count
+from app.store import price_store
+
+
+def test_worker_configuration():
+    assert worker_count(3) == 3
+    assert worker_count(0) >= 1
+    options = gunicorn_options("0.0.0.0", 8000, 4)
+    assert options["workers"] == 4 and options["preload_app"] is True
+    assert options["worker_class"] == "uvicorn.workers.UvicornWorker"
+
+
+def test_preload_needs_no_database_without_the_store(monkeypatch):
+    # No database configured: with the store disabled preload must not need one
+    get_engine.cache_clear()
+    for name in ("database_url", "database_username", "database_password", "database_hostname", "database_port", "database_name"):
+        monkeypatch.setattr(settings, name, None)
+    monkeypatch.setattr(price_store, "enabled", False)
+    monkeypatch.setattr(price_store, "max_age", 300)
+    try:
+        preload()
+    finally:
+        gc.unfreeze()
+    assert get_engine.cache_info().currsize == 0
+    # Workers keep checking for new days rather than serving the fork-time snapshot forever
+    assert price_store.max_age == 300
+
+
+def test_per_process_jobs_are_off_with_several_workers(monkeypatch):
+    monkeypatch.setattr(settings, "ingest_interval", 86400)
+    monkeypatch.setattr(settings, "live_poll_interval", 5)
+    monkeypatch.setenv("LIVE_POLL_INTERVAL", "5")
+    monkeypatch.setenv("INGEST_INTERVAL", "86400")
+    disable_per_process_jobs(1)
+    assert settings.live_poll_interval == 5
+    disable_per_process_jobs(4)
+    # The workers read their settings again from the environment
+    assert settings.ingest_interval == 0 and os.environ["INGEST_INTERVAL"] == "0"
+    assert settings.live_poll_interval == 0 and os.environ["LIVE_POLL_INTERVAL"] == "0"
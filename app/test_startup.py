@@ -0,0 +1,47 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Generous enough for a cold CI runner; importing the app takes well under a second locally
+IMPORT_TIME_BUDGET = float(os.environ.get("IMPORT_TIME_BUDGET", "3.0"))
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import app.main
+seconds = time.perf_counter() - started
+pandas, requests = "pandas" in sys.modules, "requests" in sys.modules
+# Imported by the lifespan only when INGEST_INTERVAL is set; its job is built lazily too
+import app.incremental
+from app.config import get_settings
+from app.database import get_engine
+print(json.dumps({
+    "seconds": seconds,
+    "pandas": pandas,
+    "requests": requests,
+    "engines": get_engine.cache_info().currsize,
+    "settings": get_settings.cache_info().currsize,
+}))
+"""
+
+
+def test_importing_the_app_is_fast_and_side_effect_free(tmp_path):
+    # No database settings at all: importing must neither need nor open a connection
+    env = {name: value for name, value in os.environ.items() if not name.startswith("DATABASE_")}
+    env["PYTHONPATH"] = str(Path(__file__).resolve().parent.parent)
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=tmp_path, env=env, capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    lines = result.stdout.splitlines()
+    # Nothing but the probe's own report is printed
+    assert len(lines) == 1, result.stdout
+    report = json.loads(lines[0])
+    assert report["engines"] == 0
+    # Neither .env nor the environment is read until a setting is first used
+    assert report["settings"] == 0
+    assert not report["pandas"]
+    assert not report["requests"]
+    assert report["seconds"] < IMPORT_TIME_BUDGET
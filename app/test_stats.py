@@ -0,0 +1,67 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from app.models.bitcoin_price import BitcoinPrice
+from app.stats import group_keys, price_statistics
+from app.store import PriceStore
+
+
+@pytest.fixture
+def store(db):
+    store = PriceStore()
+    store.ensure_loaded(db)
+    return store
+
+
+def test_statistics_match_sql_aggregates(client, db):
+    body = client.get("/api/historical/prices/statistics").json()
+    rows = db.query(BitcoinPrice).all()
+    closes = np.array([row.close for row in rows])
+    assert body["min_price"] == min(row.low for row in rows)
+    assert body["max_price"] == max(row.high for row in rows)
+    assert body["avg_price"] == pytest.approx(closes.mean())
+    assert body["median_price"] == pytest.approx(np.median(closes))
+    assert body["total_entries"] == len(rows)
+    assert body["total_volume"] == sum(row.volume for row in rows)
+    assert body["daily_volatility"] == pytest.approx(np.diff(np.log(closes)).std(ddof=1))
+
+
+def test_statistics_range_and_grouping(client):
+    body = client.get(
+        "/api/historical/prices/statistics",
+        params={"start": "2020-01-01", "end": "2021-12-31", "group_by": "year"},
+    ).json()
+    assert body["group_by"] == "year"
+    assert [group["period"] for group in body["groups"]] == ["2020", "2021"]
+    assert [group["total_entries"] for group in body["groups"]] == [366, 365]
+
+    months = client.get("/api/historical/prices/statistics", params={"start": "2020-01-15", "end": "2020-03-01", "group_by": "month"}).json()
+    assert [(g["period"], g["total_entries"]) for g in months["groups"]] == [("2020-01", 17), ("2020-02", 29), ("2020-03", 1)]
+
+
+def test_week_groups_start_on_monday(store):
+    days = store.snapshot().days
+    weeks = group_keys(days, "week").astype("datetime64[D]").astype(object)
+    assert all(day.weekday() == 0 for day in set(weeks))
+
+
+def test_statistics_are_memoized_per_snapshot(store, db):
+    data = store.snapshot()
+    lo, hi = data.range_indices(date(2015, 1, 1), date(2015, 12, 31))
+    first = price_statistics(data, lo, hi, "month")
+    assert price_statistics(data, lo, hi, "month") is first
+
+    db.add(BitcoinPrice(date=date(2025, 1, 1), open=1, high=1, low=1, close=1, adj_close=1, volume=1))
+    db.commit()
+    store.invalidate()
+    store.ensure_loaded(db)
+    assert store.snapshot() is not data
+    assert price_statistics(store.snapshot(), lo, hi, "month") is not first
+
+
+def test_empty_range_statistics(client):
+    body = client.get("/api/historical/prices/statistics", params={"start": "1990-01-01", "end": "1990-12-31"}).json()
+    assert body["total_entries"] == 0
+    assert body["min_price"] is None
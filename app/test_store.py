@@ -0,0 +1,71 @@
+from datetime import date
+
+from app.models.bitcoin_price import BitcoinPrice
+from app.store import PriceStore, price_store
+
+
+def test_store_matches_orm_rows(db):
+    store = PriceStore()
+    store.ensure_loaded(db)
+    expected = [price.to_dict() for price in db.query(BitcoinPrice).order_by(BitcoinPrice.date).all()]
+    assert store.to_dicts() == expected
+
+
+def test_store_range_is_inclusive(db):
+    store = PriceStore()
+    store.ensure_loaded(db)
+    lo, hi = store.range_indices(date(2020, 1, 1), date(2020, 12, 31))
+    rows = store.to_dicts(lo, hi)
+    assert len(rows) == 366
+    assert rows[0]["date"] == "2020-01-01"
+    assert rows[-1]["date"] == "2020-12-31"
+    lo, hi = store.range_indices(date(1990, 1, 1), date(1990, 12, 31))
+    assert store.to_dicts(lo, hi) == []
+
+
+def test_store_reloads_after_committed_change(db):
+    price_store.ensure_loaded(db)
+    version = price_store.version
+    db.add(BitcoinPrice(date=date(2025, 1, 1), open=1, high=1, low=1, close=1, adj_close=None, volume=1))
+    db.commit()
+    assert price_store.is_stale
+    price_store.ensure_loaded(db)
+    assert price_store.version == version + 1
+    assert price_store.to_dicts(len(price_store) - 1)[0]["adj_close"] is None
+
+
+def test_expired_store_reloads_only_when_the_table_changed(db):
+    store = PriceStore(max_age=60)
+    store.ensure_loaded(db)
+    snapshot = store.snapshot()
+    store._loaded_at -= 120
+    assert store.is_stale
+    store.ensure_loaded(db)
+    # Unchanged: the same snapshot is kept and the expiry restarts
+    assert store.snapshot() is snapshot and store.version == 1 and not store.is_stale
+    # A day written by another process is not seen by the ORM listeners, only by the check
+    db.execute(BitcoinPrice.__table__.insert().values(date=date(2025, 1, 1), open=1, high=1, low=1, close=1, volume=1))
+    db.commit()
+    store.ensure_loaded(db)
+    assert store.version == 1
+    store._loaded_at -= 120
+    store.ensure_loaded(db)
+    assert store.version == 2 and store.to_dicts(len(store) - 1)[0]["date"] == "2025-01-01"
+
+
+def test_year_endpoint_served_from_store(client):
+    response = client.get("/api/prices/2016")
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body) == 366
+    assert body[0]["date"] == "2016-01-01"
+
+
+def test_halving_endpoint_window(client):
+    response = client.get("/api/prices/halving/3")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["halving_number"] == 3
+    assert body["prices"][0]["date"] == "2020-02-01"
+    assert body["prices"][-1]["date"] == "2020-08-31"
+    assert client.get("/api/prices/halving/9").status_code == 404
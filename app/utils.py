@@ -1,6 +1,12 @@
 from datetime import datetime
-from typing import List, Dict, Any
-import requests
+from typing import List, Dict, Any, Optional
+import logging
+
+import httpx
+
+from app.exchanges import SOURCES, fetch_source_json, get_http_client
+
+logger = logging.getLogger(__name__)
 
 # Function to parse a date string to a datetime object
 def parse_date(date_str: str) -> datetime:
@@ -23,7 +29,7 @@ def validate_required_fields(data: Dict[str, Any], required_fields: List[str]) -
 def data_to_dict(data: Any, keys: List[str]) -> Dict[str, Any]:
     return {key: getattr(data, key, None) for key in keys}
 
-# Function to calculate percentage change
+# Function to calculate percentage change; app.analytics.percentage_changes does the same over a whole series
 def calculate_percentage_change(old_value: float, new_value: float) -> float:
     if old_value == 0:
         raise ValueError("Old value cannot be zero for percentage change calculation.")
@@ -50,38 +56,24 @@ def ensure_date_format(data: Dict[str, Any], date_key: str) -> None:
 def handle_error(message: str) -> Dict[str, Any]:
     return {"error": message}
 
-def fetch_bybit_price():
+async def fetch_exchange_price(name: str, client: Optional[httpx.AsyncClient] = None) -> Optional[Any]:
+    """Fetch one exchange's price through the shared pooled client, returning None on failure."""
+    source = SOURCES[name]
     try:
-        response = requests.get("https://api.bybit.com/v2/public/tickers?symbol=BTCUSD")
-        data = response.json()
-        return data.get("result", [{}])[0].get("last_price")
+        data = await fetch_source_json(client or get_http_client(), source)
+        return source.parse_price(data)
     except Exception as e:
-        # Log the error or handle it as needed
+        logger.warning(f"Failed to fetch the {name} price: {e}")
         return None
 
-def fetch_binance_price():
-    try:
-        response = requests.get("https://api.binance.com/api/v3/ticker/price?symbol=BTCUSDT")
-        data = response.json()
-        return data.get("price")
-    except Exception as e:
-        # Log the error or handle it as needed
-        return None
+async def fetch_bybit_price(client: Optional[httpx.AsyncClient] = None):
+    return await fetch_exchange_price("bybit", client)
 
-def fetch_coinbase_price():
-    try:
-        response = requests.get("https://api.coinbase.com/v2/prices/bitcoin-usd/spot")
-        data = response.json()
-        return data.get("data", {}).get("amount")
-    except Exception as e:
-        # Log the error or handle it as needed
-        return None
+async def fetch_binance_price(client: Optional[httpx.AsyncClient] = None):
+    return await fetch_exchange_price("binance", client)
 
-def fetch_kucoin_price():
-    try:
-        response = requests.get("https://api.kucoin.com/api/v1/market/orderbook/level1?symbol=BTC-USDT")
-        data = response.json()
-        return data.get("data", {}).get("price")
-    except Exception as e:
-        # Log the error or handle it as needed
-        return None
+async def fetch_coinbase_price(client: Optional[httpx.AsyncClient] = None):
+    return await fetch_exchange_price("coinbase", client)
+
+async def fetch_kucoin_price(client: Optional[httpx.AsyncClient] = None):
+    return await fetch_exchange_price("kucoin", client)
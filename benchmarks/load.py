@@ -0,0 +1,61 @@
+import asyncio
+import time
+from typing import Dict, List, Sequence
+
+import httpx
+import numpy as np
+
+# Endpoints driven by the load generator; /api/aggregate is answered by stubbed exchanges
+SCENARIOS = (
+    "/api/prices/",
+    "/api/prices/2021",
+    "/api/prices/halving/3",
+    "/api/historical/prices/statistics",
+    "/api/historical/prices/statistics?group_by=month",
+    "/api/aggregate",
+)
+WARMUP_REQUESTS = 3
+
+
+def summarize_latencies(latencies: List[float], elapsed: float, errors: int) -> Dict[str, float]:
+    timings = np.array(latencies) * 1000
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed > 0 else 0.0,
+        "p50_ms": float(np.percentile(timings, 50)),
+        "p99_ms": float(np.percentile(timings, 99)),
+        "max_ms": float(timings.max()),
+    }
+
+
+async def run_scenario(client: httpx.AsyncClient, path: str, requests: int, concurrency: int) -> Dict[str, float]:
+    """Send requests GETs to path from concurrency workers sharing one queue of work."""
+    for _ in range(WARMUP_REQUESTS):
+        await client.get(path)
+
+    latencies: List[float] = []
+    errors = 0
+    pending = iter(range(requests))
+
+    async def worker() -> None:
+        nonlocal errors
+        for _ in pending:
+            started = time.perf_counter()
+            try:
+                response = await client.get(path)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize_latencies(latencies, time.perf_counter() - started, errors)
+
+
+async def run_load(
+    client: httpx.AsyncClient, requests: int, concurrency: int, scenarios: Sequence[str] = SCENARIOS
+) -> Dict[str, Dict[str, float]]:
+    return {path: await run_scenario(client, path, requests, concurrency) for path in scenarios}
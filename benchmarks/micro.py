@@ -0,0 +1,66 @@
+import json
+import time
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from app import serialization
+from app.models.bitcoin_price import BitcoinPrice, BitcoinPriceResponse
+from app.serialization import dumps, encode_rows
+from app.stats import summarize
+from app.store import PRICE_COLUMNS, load_columns
+
+
+def time_call(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Run fn repeat times (after one warm-up call) and summarize the wall-clock timings in milliseconds."""
+    fn()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings = np.array(timings)
+    return {
+        "runs": repeat,
+        "mean_ms": float(timings.mean()),
+        "p50_ms": float(np.percentile(timings, 50)),
+        "p99_ms": float(np.percentile(timings, 99)),
+        "min_ms": float(timings.min()),
+    }
+
+
+def micro_benchmarks(session_factory: sessionmaker, repeat: int = 20) -> Dict[str, Dict[str, float]]:
+    """
+    Time each stage of serving the full history, old path and new path side by side.
+
+    ORM query -> to_dict -> Pydantic validation -> json is what the handlers used
+    to do per request; columns -> encode_rows is what they do now.
+    """
+    with session_factory() as db:
+        def orm_query() -> List[BitcoinPrice]:
+            db.expunge_all()  # hydrate fresh objects every run instead of reusing the identity map
+            return db.execute(select(BitcoinPrice).order_by(BitcoinPrice.date)).scalars().all()
+
+        rows = orm_query()
+        dicts = [row.to_dict() for row in rows]
+        data = load_columns(db)
+        validator = TypeAdapter(List[BitcoinPriceResponse])
+        encode_json = serialization._ENCODERS["json"]
+
+        cases: Dict[str, Callable[[], Any]] = {
+            "query_orm": orm_query,
+            "query_columns": lambda: load_columns(db),
+            "to_dict_orm": lambda: [row.to_dict() for row in rows],
+            "to_dicts_columns": lambda: data.to_dicts(),
+            "validate_pydantic": lambda: validator.validate_python(dicts),
+            "serialize_stdlib_json": lambda: json.dumps(dicts).encode(),
+            "serialize_dumps": lambda: dumps(dicts),
+            "encode_rows_cold": lambda: encode_json(data, 0, len(data), PRICE_COLUMNS),
+            "encode_rows_memoized": lambda: encode_rows(data, 0, len(data)),
+            "statistics": lambda: summarize(data, 0, len(data)),
+        }
+        return {name: time_call(fn, repeat) for name, fn in cases.items()}
+
@@ -0,0 +1,136 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import httpx
+
+DEFAULT_SQLITE_PATH = Path(tempfile.gettempdir()) / "bitcoin_price_bench.db"
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def seed_database() -> None:
+    """Create the schema and upsert the bundled Yahoo Finance CSV into the configured database."""
+    from app.database import Base, get_engine
+    from app.ingest import DEFAULT_CSV_PATH, load_csv
+
+    Base.metadata.create_all(bind=get_engine())
+    load_csv(get_engine(), DEFAULT_CSV_PATH)
+
+
+async def drive_app(args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+    from app.exchanges import get_http_client
+    from app.main import app
+    from benchmarks.load import run_load
+    from benchmarks.stubs import stub_exchange_client
+
+    stub = stub_exchange_client(args.exchange_latency)
+    app.dependency_overrides[get_http_client] = lambda: stub
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=60)
+    else:
+        # In-process: the app runs on this event loop, so results measure the server's own cost
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+    try:
+        async with client:
+            return await run_load(client, args.requests, args.concurrency)
+    finally:
+        app.dependency_overrides.clear()
+        await stub.aclose()
+
+
+def format_change(current: float, baseline: Optional[float], higher_is_better: bool = False) -> str:
+    if not baseline:
+        return ""
+    change = (current - baseline) / baseline * 100
+    better = change > 0 if higher_is_better else change < 0
+    return f"  ({change:+.1f}% {'better' if better else 'worse'})"
+
+
+def print_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> None:
+    baseline = baseline or {}
+    print(f"commit {report['meta']['commit']}  database {report['meta']['database']}  "
+          f"price store {'on' if report['meta']['price_store'] else 'off'}  orjson {'on' if report['meta']['orjson'] else 'off'}")
+    print("\nMicro-benchmarks (ms per call over the full history)")
+    for name, result in report["micro"].items():
+        previous = baseline.get("micro", {}).get(name, {})
+        print(f"  {name:<24} mean {result['mean_ms']:9.3f}  p50 {result['p50_ms']:9.3f}  p99 {result['p99_ms']:9.3f}"
+              f"{format_change(result['mean_ms'], previous.get('mean_ms'))}")
+    print(f"\nLoad ({report['meta']['requests']} requests per endpoint, concurrency {report['meta']['concurrency']})")
+    for path, result in report["load"].items():
+        previous = baseline.get("load", {}).get(path, {})
+        print(f"  {path:<50} {result['rps']:9.1f} req/s  p50 {result['p50_ms']:8.2f}ms  p99 {result['p99_ms']:8.2f}ms"
+              f"  errors {result['errors']}{format_change(result['rps'], previous.get('rps'), higher_is_better=True)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks and a concurrent load test for the API.")
+    parser.add_argument("--database-url", help="Database to seed and query (default: a fresh SQLite file).")
+    parser.add_argument("--url", help="Load-test a running server instead of the in-process app.")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint.")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients.")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per micro-benchmark.")
+    parser.add_argument("--exchange-latency", type=float, default=0.02, help="Simulated exchange latency in seconds.")
+    parser.add_argument("--no-store", action="store_true", help="Disable the in-memory price store.")
+    parser.add_argument("--output", help="Write the report as JSON to this path.")
+    parser.add_argument("--compare", help="Baseline JSON report to compare against.")
+    args = parser.parse_args()
+
+    # The app reads its settings on first use, so configure the environment first
+    if args.database_url:
+        database_url = args.database_url
+    else:
+        DEFAULT_SQLITE_PATH.unlink(missing_ok=True)
+        database_url = f"sqlite:///{DEFAULT_SQLITE_PATH}"
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["PRICE_STORE_ENABLED"] = "false" if args.no_store else "true"
+    # Every simulated client shares one address, so the rate limiter would answer most requests with 429
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+    from app import serialization
+    from app.database import get_sessionmaker
+    from benchmarks.micro import micro_benchmarks
+
+    seed_database()
+    report: Dict[str, Any] = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "database": database_url.split(":", 1)[0],
+            "price_store": not args.no_store,
+            "orjson": serialization.orjson is not None,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "micro": micro_benchmarks(get_sessionmaker(), args.repeat),
+        "load": asyncio.run(drive_app(args)),
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+import asyncio
+import json
+
+import httpx
+
+# Canned ticker payloads keyed by exchange host, in each exchange's response shape
+PAYLOADS = {
+    "api.coingecko.com": {"bitcoin": {"usd": 100.0, "usd_24h_vol": 1000.0}},
+    "api.coincap.io": {"data": {"priceUsd": "102.0", "volumeUsd24Hr": "3060.0"}},
+    "api.binance.com": {"price": "101.00000000"},
+    "api.kraken.com": {"result": {"XXBTZUSD": {"c": ["99.0", "1"], "v": ["5", "20"]}}},
+    "api.bybit.com": {"result": [{"last_price": "100.2"}]},
+    "api.coinbase.com": {"data": {"amount": "100.5"}},
+    "api.kucoin.com": {"data": {"price": "100.0"}},
+}
+
+
+def stub_exchange_client(latency: float = 0.0) -> httpx.AsyncClient:
+    """An HTTP client answering every exchange from PAYLOADS after a simulated network delay."""
+    bodies = {host: json.dumps(payload).encode() for host, payload in PAYLOADS.items()}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if latency:
+            await asyncio.sleep(latency)
+        return httpx.Response(200, content=bodies[request.url.host])
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
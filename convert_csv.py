@@ -1,11 +1,17 @@
+import sys
+from pathlib import Path
+
 import pandas as pd
 
+DATA_DIR = Path(__file__).resolve().parent / "data"
+source = Path(sys.argv[1]) if len(sys.argv) > 1 else DATA_DIR / "BTC-USD Yahoo Finance - Max Yrs.csv"
+target = source.with_name(f"{source.stem}_updated{source.suffix}")
+
 # Load the CSV file
-df = pd.read_csv('C:/Users/USER/Downloads/Bitcoin-Price-Analysis-API/data/BTC-USD Yahoo Finance - Max Yrs.csv')
+df = pd.read_csv(source)
 
-# Convert scientific notation to integers
-df['Volume'] = df['Volume'].apply(lambda x: int(float(x)))
+# Convert scientific notation to integers in one vectorized pass
+df['Volume'] = pd.to_numeric(df['Volume']).astype('int64')
 
 # Save the updated CSV
-df.to_csv('C:/Users/USER/Downloads/Bitcoin-Price-Analysis-API/data/BTC-USD Yahoo Finance - Max Yrs_updated.csv', index=False)
-
+df.to_csv(target, index=False)